@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import numpy as np
+
+import synth
+import ingest
+import derived
+import hostinfo
+
+# Timing of the analysis path (ingest, derived metrics, aggregation, rendering) on synthetic
+# campaigns at multiples of today's grid. Results are JSON so runs can be kept
+# and compared: `bench.py --compare old.json` fails when a stage got slower.
+
+SCALES = [1, 10, 100]
+STAGES = ['ingest_cold', 'ingest_warm', 'derive', 'aggregate', 'render']
+# A stage regressed when its median time exceeds the baseline by this factor
+# and by at least MIN_DELTA_S seconds (stages of a few ms differ by noise alone)
+TOLERANCE = 1.25
+MIN_DELTA_S = 0.05
+# Environment fields a baseline must share with the current run to be compared
+COMPARABLE = ('scales', 'resamples', 'host', 'cpu_model')
+
+
+def _timed(func, setup, repeat):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# Stage name -> (setup, timed function) for one campaign directory
+def stage_functions(results_dir, resamples, plots_dir):
+    import plot
+    index_path = os.path.join(results_dir, ingest.INDEX_NAME)
+    raw = ingest.load(results_dir)
+    table = derived.evaluate(raw)
+
+    def drop_index():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    def aggregate():
+        plot.Summaries(table, resamples)
+        plot.stats_rows(table, plot.metrics, resamples, plot.CONFIDENCE_LEVEL, None)
+
+    summaries = plot.Summaries(table, resamples)
+    plot._pyplot()  # keep the matplotlib import out of the render time
+
+    def render():
+        plot.save_all(plot.figure_specs(summaries, plot.PLOT_KINDS), plots_dir, 'png', plot.DRAFT_DPI)
+
+    return table, {
+        'ingest_cold': (drop_index, lambda: ingest.load(results_dir)),
+        'ingest_warm': (None, lambda: ingest.load(results_dir)),
+        'derive': (None, lambda: derived.evaluate(raw)),
+        'aggregate': (None, aggregate),
+        'render': (None, render),
+    }
+
+
+def bench_scale(scale, work_dir, stages, repeat, resamples, log):
+    results_dir = os.path.join(work_dir, f'x{scale}')
+    if not os.path.isdir(results_dir):
+        log(f"Generating the {scale}x grid in {results_dir}...")
+        synth.generate(results_dir, **synth.grid(scale))
+    files = sum(1 for name in os.listdir(results_dir) if ingest.parse_name(name))
+    plots_dir = os.path.join(work_dir, f'plots_x{scale}')
+    table, functions = stage_functions(results_dir, resamples, plots_dir)
+    records = []
+    for stage in stages:
+        setup, func = functions[stage]
+        times = _timed(func, setup, repeat)
+        record = {'scale': scale, 'stage': stage, 'files': files, 'values': len(table),
+                  'best_s': min(times), 'median_s': statistics.median(times), 'times_s': times}
+        log(f"  {scale:>4}x {stage:<12} best {record['best_s']:8.3f}s  median {record['median_s']:8.3f}s")
+        records.append(record)
+    shutil.rmtree(plots_dir, ignore_errors=True)
+    return records
+
+
+def environment(repeat, resamples, scales):
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': socket.gethostname(),
+        'scales': sorted(scales),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'cpu_model': hostinfo._cpuinfo('model name'),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'resamples': resamples,
+    }
+
+
+# (field, baseline value, current value) for every COMPARABLE field that differs
+def incomparable(current, baseline):
+    return [(key, baseline.get(key), current.get(key)) for key in COMPARABLE
+            if baseline.get(key) != current.get(key)]
+
+
+# (scale, stage, baseline median, current median) for every stage slower than
+# tolerance and min_delta allow
+def regressions(results, baseline, tolerance=TOLERANCE, min_delta=MIN_DELTA_S):
+    before = {(r['scale'], r['stage']): r['median_s'] for r in baseline['results']}
+    slower = []
+    for r in results['results']:
+        old = before.get((r['scale'], r['stage']))
+        if old is not None and r['median_s'] > old * tolerance and r['median_s'] - old >= min_delta:
+            slower.append((r['scale'], r['stage'], old, r['median_s']))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ingest, derived metrics, aggregation and rendering on synthetic results.')
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, help='grid multiples to time')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3, help='timed repetitions per stage')
+    parser.add_argument('--resamples', type=int, default=2000, help='bootstrap resamples')
+    parser.add_argument('--work-dir', help='keep the synthetic campaigns here and reuse them (default: temporary)')
+    parser.add_argument('--output', help='write the JSON results here (default: stdout)')
+    parser.add_argument('--compare', metavar='JSON', help='baseline results; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f'allowed slowdown against the baseline (default: {TOLERANCE})')
+    parser.add_argument('--min-delta', type=float, default=MIN_DELTA_S, metavar='SECONDS',
+                        help=f'ignore slowdowns smaller than this (default: {MIN_DELTA_S})')
+    args = parser.parse_args(argv)
+
+    def log(message):
+        print(message, file=sys.stderr)
+
+    env = environment(args.repeat, args.resamples, args.scales)
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            sys.exit(f"error: could not read the baseline: {e}")
+        differences = incomparable(env, baseline.get('environment', {}))
+        if differences:
+            sys.exit("error: the baseline was recorded with other settings or on another host ("
+                     + ', '.join(f'{key} {old} vs {new}' for key, old, new in differences) + ")")
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='fs_bench_')
+    try:
+        records = []
+        for scale in args.scales:
+            records += bench_scale(scale, work_dir, args.stages, args.repeat, args.resamples, log)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    results = {'environment': env, 'results': records}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+            f.write('\n')
+    else:
+        json.dump(results, sys.stdout, indent=1)
+        print()
+
+    if baseline is not None:
+        slower = regressions(results, baseline, args.tolerance, args.min_delta)
+        for scale, stage, old, new in slower:
+            log(f"REGRESSION {scale}x {stage}: {old:.3f}s -> {new:.3f}s ({new / old:.2f}x)")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,8 @@ TARGET_GOOD=./bin/good.exe
 SRC_GOOD=./src/good_coherency.cpp
 TARGET_BAD=./bin/bad.exe
 SRC_BAD=./src/bad_coherency.cpp
+TARGET_COUNTER=./bin/counter.exe
+SRC_COUNTER=./src/shared_counter.cpp
 
 # Compile the good program
 printf "Compiling $SRC_GOOD...\n"
@@ -25,4 +27,11 @@ if ! $CXX $CXXFLAGS $SRC_BAD -o $TARGET_BAD; then
     printf "Failed to compile $SRC_BAD.\n"
     exit 1
 fi
+
+# Compile the shared counter suite
+printf "Compiling $SRC_COUNTER...\n"
+if ! $CXX $CXXFLAGS $SRC_COUNTER -o $TARGET_COUNTER; then
+    printf "Failed to compile $SRC_COUNTER.\n"
+    exit 1
+fi
 printf "\nCompilation finished.\n"
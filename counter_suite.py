@@ -0,0 +1,210 @@
+import os
+import re
+import sys
+import csv
+import argparse
+import subprocess
+import numpy as np
+
+import stats
+import topology
+import shm_bench
+
+# Designs for one logical counter shared by every thread (src/shared_counter.cpp):
+# a single atomic, padded per-thread shards, one shard per L3 domain and a
+# batched flush into one atomic. Each run gives the write time of all the
+# increments and the cost of one read taken while the writers run, over the
+# thread counts and placement modes of run_tests.sh.
+#
+# The two numbers come from separate phases of a run: the writers alone, then
+# the writers again with a reader pinned to a CPU none of them use (its write
+# time is kept as reader_write_ms, the slowdown the reader causes).
+
+BINARY = './bin/counter.exe'
+RESULTS_NAME = 'counters.csv'
+IMPLS = ['atomic', 'sharded', 'ccd', 'batched64']
+FIELDS = ['impl', 'threads', 'size', 'mode', 'run', 'write_ms', 'read_ns', 'reads', 'reader_cpu', 'reader_write_ms']
+
+_TIME = re.compile(r'^Time for \S+ counter \(mode \d+\): ([0-9.eE+-]+) ms$', re.M)
+_READ = re.compile(r'^Read cost for \S+ counter \(mode \d+\): ([0-9.eE+-]+) ns over (\d+) reads '
+                   r'on CPU (-?\d+), writers took ([0-9.eE+-]+) ms$', re.M)
+
+
+# CPU for the reader: the first allowed one that runs no writer, None if all do
+def reader_cpu(cpus):
+    free = sorted(os.sched_getaffinity(0) - set(cpus))
+    return free[0] if free else None
+
+
+# One run, returns (write_ms, read_ns, reads, reader_cpu, reader_write_ms)
+def run_once(binary, impl, threads, size, mode, cpus, domains, reader=None):
+    env = dict(os.environ, BENCH_CPUS=','.join(map(str, cpus)), BENCH_L3=','.join(map(str, domains)))
+    if reader is not None:
+        env['BENCH_READER_CPU'] = str(reader)
+    result = subprocess.run([binary, impl, str(threads), str(size), str(mode)],
+                            capture_output=True, text=True, env=env)
+    time_match, read_match = _TIME.search(result.stdout), _READ.search(result.stdout)
+    if result.returncode != 0 or not time_match or not read_match:
+        raise RuntimeError(f'{impl} with {threads} threads failed: {result.stderr.strip() or result.stdout.strip()}')
+    return (float(time_match.group(1)), float(read_match.group(1)), int(read_match.group(2)),
+            int(read_match.group(3)), float(read_match.group(4)))
+
+
+def load(path):
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for name in ('threads', 'size', 'mode', 'run', 'reads', 'reader_cpu'):
+            row[name] = int(row[name])
+        for name in ('write_ms', 'read_ns', 'reader_write_ms'):
+            row[name] = float(row[name])
+    return rows
+
+
+# Grid of runs appended to results_dir/counters.csv. Configurations that
+# already have `runs` rows are skipped, so an interrupted campaign resumes.
+def campaign(results_dir, binary, impls, threads, sizes, modes, runs, topo):
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, RESULTS_NAME)
+    done = {}
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            if next(csv.reader(f), FIELDS) != FIELDS:
+                raise ValueError(f'{path} has other columns than {", ".join(FIELDS)}; use a new results directory')
+        for row in load(path):
+            key = (row['impl'], row['threads'], row['size'], row['mode'])
+            done[key] = done.get(key, 0) + 1
+    new_file = not os.path.exists(path)
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(FIELDS)
+        for num_threads in threads:
+            for mode in modes:
+                if mode == 1 and num_threads != 2:
+                    continue
+                try:
+                    cpus = shm_bench.mode_cpus(topo, mode, num_threads)
+                except ValueError as e:
+                    print(f"Skipping mode {mode} with {num_threads} threads: {e}")
+                    continue
+                domains = [topo.cpu(c).l3 for c in cpus]
+                reader = reader_cpu(cpus)
+                if reader is None:
+                    print(f"No CPU left for the reader with {num_threads} threads in mode {mode}, it runs unpinned")
+                for size in sizes:
+                    for impl in impls:
+                        key = (impl, num_threads, size, mode)
+                        if done.get(key, 0) >= runs:
+                            print(f"Already completed: {impl}, {num_threads} threads, mode {mode}, {size} executions")
+                            continue
+                        for run in range(done.get(key, 0), runs):
+                            values = run_once(binary, impl, num_threads, size, mode, cpus, domains, reader)
+                            writer.writerow([impl, num_threads, size, mode, run, *values])
+                            f.flush()
+                        print(f"Completed {impl}, {num_threads} threads, mode {mode}, {size} executions")
+    return path
+
+
+# {(impl, mode, threads): (throughput Summary in Mops/s, read cost Summary in ns)}
+# at the largest execution count of every configuration
+def summarize(rows, resamples=2000, confidence=0.95):
+    largest = {}
+    for row in rows:
+        key = (row['impl'], row['mode'], row['threads'])
+        largest[key] = max(largest.get(key, 0), row['size'])
+    throughput, read_cost = {}, {}
+    for row in rows:
+        key = (row['impl'], row['mode'], row['threads'])
+        if row['size'] != largest[key]:
+            continue
+        # Every thread does size // threads increments
+        ops = row['size'] // row['threads'] * row['threads']
+        throughput.setdefault(key, []).append(ops / (row['write_ms'] * 1e3) if row['write_ms'] > 0 else np.nan)
+        read_cost.setdefault(key, []).append(row['read_ns'])
+    writes = stats.summarize(throughput, resamples, confidence)
+    reads = stats.summarize(read_cost, resamples, confidence)
+    return {key: (writes[key], reads[key]) for key in writes}
+
+
+def print_summary(summary, out=sys.stdout):
+    print(f"{'impl':<12} {'mode':>4} {'threads':>7} {'Mops/s':>10} {'95% CI':>21} {'read ns':>10} {'95% CI':>21}", file=out)
+    for (impl, mode, threads), (w, r) in sorted(summary.items(), key=lambda item: (item[0][1], item[0][0], item[0][2])):
+        print(f"{impl:<12} {mode:>4} {threads:>7} {w.mean:>10.2f} {f'[{w.lo:.2f}, {w.hi:.2f}]':>21} "
+              f"{r.mean:>10.1f} {f'[{r.lo:.1f}, {r.hi:.1f}]':>21}", file=out)
+
+
+# Write throughput and read cost against the thread count, one figure per mode
+def figure_mode(summary, mode):
+    import plot
+    plt = plot._pyplot()
+    present = {impl for impl, m, _ in summary if m == mode}
+    impls = [impl for impl in IMPLS if impl in present] + sorted(present - set(IMPLS))
+    if not impls:
+        return None
+    fig, (ax_w, ax_r) = plt.subplots(1, 2, figsize=(16, 7))
+    for impl, color in zip(impls, plot.COMPARISON_COLORS * 2):
+        threads = sorted(t for i, m, t in summary if i == impl and m == mode)
+        writes = [summary[(impl, mode, t)][0] for t in threads]
+        reads = [summary[(impl, mode, t)][1] for t in threads]
+        ax_w.errorbar(threads, [s.mean for s in writes], yerr=stats.yerr(writes), label=impl, color=color,
+                      marker='o', markersize=7, linewidth=2, capsize=4)
+        ax_r.errorbar(threads, [s.mean for s in reads], yerr=stats.yerr(reads), label=impl, color=color,
+                      marker='o', markersize=7, linewidth=2, capsize=4)
+    mode_name = plot.mode_names.get(mode, f'Mode {mode}')
+    for ax, ylabel, title in ((ax_w, 'Increments (millions / second)', 'Write Throughput'),
+                              (ax_r, 'Read Cost (ns)', 'Read Cost During Writes')):
+        ax.set_xlabel('Number of Threads', fontsize=12, fontweight='bold')
+        ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+        ax.set_title(f'{title}\n({mode_name})', fontsize=14, fontweight='bold')
+        ax.legend(fontsize=11)
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scaling of shared counter designs: write throughput and read cost.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('campaign', help=f'run the grid and append to RESULTS_DIR/{RESULTS_NAME}')
+    p.add_argument('results_dir')
+    p.add_argument('--binary', default=BINARY)
+    p.add_argument('--impls', nargs='+', default=IMPLS, help='atomic, sharded, ccd, batched<B>')
+    p.add_argument('--threads', type=int, nargs='+', default=list(range(1, 11)))
+    p.add_argument('--sizes', type=int, nargs='+', default=[100000000], help='total increments per run')
+    p.add_argument('--modes', type=int, nargs='+', default=[0, 2, 3, 1])
+    p.add_argument('--runs', type=int, default=11)
+    p.add_argument('--topology', metavar='JSON', help='topology.json for the CPU placement (default: sysfs)')
+
+    for name, text in (('summary', 'print throughput and read cost with bootstrap CIs'),
+                       ('plot', 'draw throughput and read cost against the thread count per mode')):
+        p = sub.add_parser(name, help=text)
+        p.add_argument('results_dir')
+        p.add_argument('--resamples', type=int, default=2000)
+        if name == 'plot':
+            p.add_argument('--out-dir', default='results/plots/counters')
+            p.add_argument('--format', default='png')
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'campaign':
+            topo = topology.load_json(args.topology) if args.topology else topology.read_topology()
+            campaign(args.results_dir, args.binary, args.impls, args.threads, args.sizes, args.modes, args.runs, topo)
+            return
+        summary = summarize(load(os.path.join(args.results_dir, RESULTS_NAME)), args.resamples)
+    except (OSError, ValueError, RuntimeError) as e:
+        sys.exit(f"error: {e}")
+    if args.command == 'summary':
+        print_summary(summary)
+        return
+    import plot
+    os.makedirs(args.out_dir, exist_ok=True)
+    for mode in sorted({m for _, m, _ in summary}):
+        fig = figure_mode(summary, mode)
+        if fig is not None:
+            print(plot.save_figure(fig, args.out_dir, f'counters_mode{mode}', args.format))
+
+
+if __name__ == '__main__':
+    main()
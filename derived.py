@@ -0,0 +1,126 @@
+import numpy as np
+from collections import namedtuple
+
+import ingest
+
+# Registry of the metrics plot.py shows. Each one is an expression over the raw
+# values of one run (time, energy and the counters of ingest.PERF_EVENTS) and
+# the configuration columns threads, size (total operations) and mode. They are
+# evaluated on the whole table at once, so a new counter only needs its perf
+# event in ingest.PERF_EVENTS and a line here (perfplan.py schedules it).
+#
+# plot=True metrics are drawn in the per-thread figures; the others are only
+# available to `plot.py stats --metric`. Metrics whose counters were not
+# recorded are left out.
+Metric = namedtuple('Metric', ['name', 'expr', 'unit', 'title', 'plot'])
+
+METRICS = [
+    Metric('time', 'time', 'seconds', 'Time', True),
+    Metric('energy', 'energy', 'joules', 'Energy', True),
+    Metric('remote_cache_fills', 'remote_cache_fills', 'fills', 'Demand/Remote Cache Fills', True),
+    # L1: accesses = l1_fills (all L1 misses are accesses to L2)
+    Metric('l1_accesses', 'l1_fills', 'accesses', 'L1 Cache Accesses', True),
+    Metric('l1_miss_rate', 'rate(l1_fills - l1_l2_hits, l1_fills)', '%', 'L1 Cache Miss Rate', True),
+    # L2: accesses = l2_requests, miss rate = l2_misses / l2_requests
+    Metric('l2_accesses', 'l2_requests', 'accesses', 'L2 Cache Accesses', True),
+    Metric('l2_miss_rate', 'rate(l2_misses, l2_requests)', '%', 'L2 Cache Miss Rate', True),
+    Metric('l3_accesses', 'l3_accesses', 'accesses', 'L3 Cache Accesses', True),
+    Metric('l3_miss_rate', 'rate(l3_misses, l3_accesses)', '%', 'L3 Cache Miss Rate', True),
+    # Normalized by the work done, so execution counts can be compared
+    Metric('remote_fills_per_mop', 'remote_cache_fills / size * 1e6', 'fills / M ops',
+           'Remote Fills per Million Ops', True),
+    Metric('remote_fill_share', 'rate(remote_cache_fills, l1_fills)', '%', 'Demand Fills from Remote Caches', True),
+    Metric('energy_per_op', 'energy / size * 1e9', 'nJ / op', 'Energy per Operation', False),
+    # Needs the 'core' perf group (cycles, instructions)
+    Metric('cycles_per_op', 'cycles / size', 'cycles / op', 'Cycles per Operation', True),
+    Metric('ipc', 'instructions / cycles', 'instructions / cycle', 'Instructions per Cycle', True),
+]
+
+BY_NAME = {m.name: m for m in METRICS}
+
+# Columns identifying one run; the raw values of a run share them. Run numbers
+# are unique per campaign in merged tables (ingest.concat).
+#
+# Every perf group is a separate execution (perfplan.py), and the time comes
+# from the first one. A metric over values of different executions (e.g.
+# remote_fill_share when its counters did not fit one group) is a ratio of
+# separate runs paired by run number. ingest.parse_file keeps failed runs as NaN
+# so that pairing never shifts.
+RUN_KEY = ('host', 'alloc', 'impl', 'threads', 'size', 'mode', 'variant', 'run')
+CONFIG = ('threads', 'size', 'mode')
+
+
+# Percentage num / den: 0 for a zero denominator, NaN for a missing one
+def rate(num, den):
+    with np.errstate(all='ignore'):
+        return np.where(np.isfinite(den), np.where(den > 0, num / den * 100, 0.0), np.nan)
+
+
+# Functions expressions may call
+FUNCTIONS = {'rate': rate, 'where': np.where, 'log': np.log, 'sqrt': np.sqrt, 'abs': np.abs}
+
+
+def _compile(metric):
+    code = compile(metric.expr, f'<metric {metric.name}>', 'eval')
+    return code, [name for name in code.co_names if name not in FUNCTIONS]
+
+
+# Run index of every row, and the first row of each run
+def _runs(table):
+    cols = [table[name] for name in RUN_KEY]
+    order = np.lexsort(cols[::-1])
+    change = np.zeros(len(order), dtype=bool)
+    change[0] = True
+    for col in cols:
+        sorted_col = col[order]
+        change[1:] |= sorted_col[1:] != sorted_col[:-1]
+    run_ids = np.empty(len(order), dtype=np.int64)
+    run_ids[order] = np.cumsum(change) - 1
+    return run_ids, order[change]
+
+
+# Add the rows of every registry metric that can be computed from the table.
+# Metrics already present as raw values are kept as they are.
+def evaluate(table, metrics=METRICS):
+    raw = table.categories['metric']
+    pending = [(m,) + _compile(m) for m in metrics if m.name not in raw]
+    if not pending or not len(table):
+        return table
+    run_ids, firsts = _runs(table)
+    n_runs = len(firsts)
+    # Wide view: one array per raw value over all runs, NaN where a run lacks it
+    values, present = {}, {}
+    metric_col = table['metric']
+    for code, name in enumerate(raw):
+        rows = metric_col == code
+        if not rows.any():
+            continue
+        values[name] = np.full(n_runs, np.nan)
+        values[name][run_ids[rows]] = table['value'][rows]
+        present[name] = np.zeros(n_runs, dtype=bool)
+        present[name][run_ids[rows]] = True
+    for name in CONFIG:
+        values[name] = table[name][firsts].astype(float)
+        present[name] = np.ones(n_runs, dtype=bool)
+
+    categories = dict(table.categories, metric=list(raw))
+    chunks = {name: [table[name]] for name in ingest.COLUMNS}
+    for metric, code, inputs in pending:
+        if not all(name in values for name in inputs):
+            continue
+        keep = np.logical_and.reduce([present[name] for name in inputs])
+        if not keep.any():
+            continue
+        with np.errstate(all='ignore'):
+            result = np.broadcast_to(eval(code, {'__builtins__': {}}, dict(FUNCTIONS, **values)), n_runs)
+        categories['metric'].append(metric.name)
+        rows = firsts[keep]
+        for name in ingest.COLUMNS:
+            if name == 'metric':
+                chunks[name].append(np.full(len(rows), len(categories['metric']) - 1, dtype=ingest.DTYPES[name]))
+            elif name == 'value':
+                chunks[name].append(np.asarray(result[keep], dtype=float))
+            else:
+                chunks[name].append(table[name][rows])
+    columns = {name: np.concatenate(parts) for name, parts in chunks.items()}
+    return ingest.ResultsTable(columns, categories, table.hosts)
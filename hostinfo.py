@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import socket
+import argparse
+import datetime
+import platform
+
+import topology
+
+# Metadata of the machine a campaign ran on, saved as <results dir>/host.json so
+# result directories from different hosts can be merged without mixing them.
+
+HOST_FILE = 'host.json'
+
+
+def _cpuinfo(field):
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key.strip() == field:
+                    return value.strip()
+    except OSError:
+        pass
+    return 'unknown'
+
+
+# Frequency governor of every CPU ("performance", or "mixed: ..." when they differ)
+def _governor(sysfs_root):
+    cpu_dir = os.path.join(sysfs_root, 'cpu')
+    governors = set()
+    for name in os.listdir(cpu_dir):
+        path = os.path.join(cpu_dir, name, 'cpufreq', 'scaling_governor')
+        if name[3:].isdigit() and os.path.exists(path):
+            with open(path) as f:
+                governors.add(f.read().strip())
+    if not governors:
+        return 'unknown'
+    return governors.pop() if len(governors) == 1 else 'mixed: ' + ','.join(sorted(governors))
+
+
+def collect(name=None, sysfs_root=topology.SYSFS_ROOT):
+    topo = topology.read_topology(sysfs_root)
+    hostname = socket.gethostname()
+    return {
+        'host': name or hostname,
+        'hostname': hostname,
+        'cpu_model': _cpuinfo('model name'),
+        'microcode': _cpuinfo('microcode'),
+        'kernel': platform.release(),
+        'governor': _governor(sysfs_root),
+        'cpus': len(topo.cpus),
+        'l3_domains': len(topo.l3_domains),
+        'numa_nodes': len(topo.numa_nodes),
+        'captured': datetime.datetime.now().isoformat(timespec='seconds'),
+        'topology': topo.to_dict(),
+    }
+
+
+def write(results_dir, info):
+    path = os.path.join(results_dir, HOST_FILE)
+    with open(path, 'w') as f:
+        json.dump(info, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return path
+
+
+# Metadata of a campaign directory, or None for campaigns recorded before host.json
+def load(results_dir):
+    try:
+        with open(os.path.join(results_dir, HOST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record the host metadata of a results campaign.')
+    parser.add_argument('results_dir', help='campaign folder, e.g. results/raw')
+    parser.add_argument('--name', help='host key used when merging campaigns (default: hostname)')
+    parser.add_argument('--sysfs', default=topology.SYSFS_ROOT)
+    args = parser.parse_args(argv)
+    try:
+        info = collect(args.name, args.sysfs)
+    except OSError as e:
+        sys.exit(f"error: {e}")
+    print(f"Host metadata written to {write(args.results_dir, info)} ({info['host']}, {info['cpu_model']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+import hostinfo
+
+# Path to the raw results folder
+RESULTS_DIR = 'results/raw'
+
+# Cached index, stored next to the raw files it was built from. Bump the version
+# whenever build() changes what it stores so old indexes are rebuilt.
+INDEX_NAME = '.index.npz'
+INDEX_VERSION = 4
+
+# Host key for campaigns recorded before host.json existed. When several are
+# merged each one is keyed by its directory instead (see load_many).
+UNKNOWN_HOST = 'local'
+
+# Optional _<part><value> pieces of a file name between the mode and the variant,
+# with the value used for files without them: the counter allocation mode
+# (src/counter_storage.h) and the benchmark implementation (C++, or shm_bench.py
+# tagged with its strides when they are not the default ones)
+NAME_PARTS = {'alloc': 'main', 'impl': 'cpp'}
+
+# Column names of the hand-picked perf_<group> files of older campaigns, in the
+# order run_tests.sh wrote them. Metrics computed from them are declared in derived.py.
+PERF_COLUMNS = {
+    'cache': ['any_remote_fills', 'remote_cache_fills', 'stli_other', 'cache_misses'],
+    'l1': ['l1_fills', 'l1_l2_hits'],
+    'l2': ['l2_requests', 'l2_hits', 'l2_misses'],
+    'l3': ['l3_accesses', 'l3_misses'],
+    'core': ['cycles', 'instructions'],
+}
+
+# perf event of every counter. Planned groups (perf_group<N> files, see perfplan.py)
+# hold any mix of them; their header line names the events of each column.
+PERF_EVENTS = {
+    'any_remote_fills': 'ls_any_fills_from_sys.remote_cache',
+    'remote_cache_fills': 'ls_dmnd_fills_from_sys.remote_cache',
+    'stli_other': 'ls_bad_status2.stli_other',
+    'cache_misses': 'cache-misses',
+    'l1_fills': 'ls_dmnd_fills_from_sys.all',
+    'l1_l2_hits': 'ls_dmnd_fills_from_sys.local_l2',
+    'l2_requests': 'l2_cache_req_stat.all',
+    'l2_hits': 'l2_cache_req_stat.ic_dc_hit_in_l2',
+    'l2_misses': 'l2_cache_req_stat.ic_dc_miss_in_l2',
+    'l3_accesses': 'ls_dmnd_fills_from_sys.local_ccx',
+    'l3_misses': 'ls_dmnd_fills_from_sys.dram_io_all',
+    'cycles': 'cycles',
+    'instructions': 'instructions',
+    'energy': 'power/energy-pkg/',
+}
+EVENT_COUNTERS = {event: counter for counter, event in PERF_EVENTS.items()}
+PLANNED_GROUP = 'group'
+
+
+# Column dtypes. String columns are categorical: small integer codes into a
+# per-table list of labels, so merged tables of many hosts stay compact.
+DTYPES = {
+    'host': np.int16,
+    'alloc': np.int16,
+    'impl': np.int16,
+    'threads': np.int16,
+    'size': np.int64,
+    'mode': np.int16,
+    'variant': np.int16,
+    'metric': np.int16,
+    'run': np.int32,
+    'value': np.float64,
+}
+COLUMNS = tuple(DTYPES)
+CATEGORICAL = ('host', 'alloc', 'impl', 'variant', 'metric')
+
+
+def _float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def _planned(group):
+    return group.startswith(PLANNED_GROUP) and group[len(PLANNED_GROUP):].isdigit()
+
+
+# Split a result file name into (kind, threads, size, mode, variant, parts), where
+# kind is 'time', 'energy' or a perf group ('cache', 'l1', ..., 'group1') and parts maps
+# every NAME_PARTS key to its value. Returns None for files that are not results.
+def parse_name(filename):
+    pieces = os.path.splitext(filename)[0].split('_')
+    if pieces[0] == 'perf' and len(pieces) >= 6 and (pieces[1] in PERF_COLUMNS or _planned(pieces[1])):
+        kind, rest = pieces[1], pieces[2:]
+    elif pieces[0] in ('time', 'energy') and len(pieces) >= 5:
+        kind, rest = pieces[0], pieces[1:]
+    else:
+        return None
+    parts = dict(NAME_PARTS)
+    for piece in rest[3:-1]:
+        key = next((k for k in NAME_PARTS if piece.startswith(k) and len(piece) > len(k)), None)
+        if key is None:
+            return None
+        parts[key] = piece[len(key):]
+    thread, size, mode, variant = rest[0], rest[1], rest[2], rest[-1]
+    if not mode.startswith('mode') or variant not in ('good', 'bad'):
+        return None
+    return kind, int(thread), int(size), int(mode[4:]), variant, parts
+
+
+# Parse one result file into {metric: array of per-run values}. Line i is run i
+# of every file of a configuration, so empty or malformed lines (a failed run)
+# are kept as NaN: dropping them would pair later runs with the wrong ones of
+# the other files in derived.py.
+def parse_file(filepath, kind):
+    with open(filepath, 'r') as f:
+        lines = [line.strip() for line in f]
+    while lines and not lines[-1]:
+        lines.pop()
+    if kind in ('time', 'energy'):
+        # Each line is a float
+        return {kind: np.array([_float(line) for line in lines])}
+    # Header line of event names, then one comma-separated value per counter.
+    # Events without a counter name keep the event name.
+    if kind in PERF_COLUMNS:
+        names = PERF_COLUMNS[kind]
+    else:
+        names = [EVENT_COUNTERS.get(event.strip(), event.strip()) for event in lines[0].split(',')] if lines else []
+    rows = [[_float(x.strip()) for x in line.split(',')] for line in lines[1:]]
+    rows = [row if len(row) == len(names) else [np.nan] * len(names) for row in rows]
+    counters = np.array(rows, dtype=float).reshape(len(rows), len(names))
+    return {name: counters[:, i] for i, name in enumerate(names)}
+
+
+class ResultsTable:
+    """Long-format results: one row per (host, configuration, metric, run).
+
+    Categorical columns hold codes into self.categories[name]; select(), groups()
+    and unique() take and return the labels."""
+
+    def __init__(self, columns, categories, hosts=None):
+        self.columns = columns
+        self.categories = categories
+        self.hosts = hosts or {}  # host label -> host.json metadata (or {})
+
+    def __len__(self):
+        return len(self.columns['value'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def unique(self, name):
+        codes = np.unique(self.columns[name]).tolist()
+        if name in self.categories:
+            return [self.categories[name][c] for c in codes]
+        return codes
+
+    def _encode(self, name, value):
+        if name not in self.categories:
+            return value
+        labels = self.categories[name]
+        return labels.index(value) if value in labels else -1
+
+    # Rows matching every column == value filter (a list/set matches any member)
+    def select(self, **filters):
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                mask &= np.isin(self.columns[name], [self._encode(name, v) for v in value])
+            else:
+                mask &= self.columns[name] == self._encode(name, value)
+        return ResultsTable({name: col[mask] for name, col in self.columns.items()},
+                            self.categories, self.hosts)
+
+    # {key tuple: values} grouping rows by the given columns. Runs keep file order.
+    def groups(self, by):
+        if not len(self):
+            return {}
+        cols = [self.columns[name] for name in by]
+        order = np.lexsort(cols[::-1])
+        sorted_cols = [col[order] for col in cols]
+        change = np.zeros(len(order), dtype=bool)
+        change[0] = True
+        for col in sorted_cols:
+            change[1:] |= col[1:] != col[:-1]
+        starts = np.flatnonzero(change)
+        values = np.split(self.columns['value'][order], starts[1:])
+        key_cols = []
+        for name, col in zip(by, sorted_cols):
+            keys = col[starts].tolist()
+            if name in self.categories:
+                labels = self.categories[name]
+                keys = [labels[k] for k in keys]
+            key_cols.append(keys)
+        return dict(zip(zip(*key_cols), values))
+
+
+# Stack tables, merging their category labels. Run numbers are shifted past the
+# previous tables' so runs of different campaigns never share a run key.
+def concat(tables):
+    tables = [t for t in tables if t is not None]
+    categories = {}
+    for name in CATEGORICAL:
+        labels = []
+        for t in tables:
+            labels += [l for l in t.categories.get(name, []) if l not in labels]
+        categories[name] = labels
+    columns = {name: [] for name in COLUMNS}
+    hosts = {}
+    run_offset = 0
+    for t in tables:
+        hosts.update(t.hosts)
+        for name in COLUMNS:
+            col = t.columns[name]
+            if name == 'run':
+                col = col + DTYPES['run'](run_offset)
+            elif name in CATEGORICAL:
+                remap = np.array([categories[name].index(l) for l in t.categories[name]] or [0],
+                                 dtype=DTYPES[name])
+                col = remap[col]
+            columns[name].append(col)
+        if len(t):
+            run_offset += int(t.columns['run'].max()) + 1
+    columns = {name: np.concatenate(parts) if parts else np.array([], dtype=DTYPES[name])
+               for name, parts in columns.items()}
+    return ResultsTable(columns, categories, hosts)
+
+
+def _result_files(results_dir):
+    entries = []
+    for entry in os.scandir(results_dir):
+        if entry.name.endswith('.txt') and entry.is_file():
+            st = entry.stat()
+            entries.append((entry.name, st.st_size, st.st_mtime_ns))
+    return sorted(entries)
+
+
+def _fingerprint(entries):
+    h = hashlib.sha1(f'v{INDEX_VERSION}\n'.encode())
+    for name, size, mtime in entries:
+        h.update(f'{name}\0{size}\0{mtime}\n'.encode())
+    return h.hexdigest()
+
+
+# Parse every result file in results_dir into a ResultsTable (host code 0)
+def build(results_dir, entries=None):
+    if entries is None:
+        entries = _result_files(results_dir)
+    chunks = {name: [] for name in COLUMNS}
+    labels = {'host': [UNKNOWN_HOST], 'variant': ['good', 'bad'], 'metric': []}
+    labels.update({key: [default] for key, default in NAME_PARTS.items()})
+    for filename, _, _ in entries:
+        info = parse_name(filename)
+        if info is None:
+            continue
+        kind, thread, size, mode, variant, parts = info
+        for key, value in parts.items():
+            if value not in labels[key]:
+                labels[key].append(value)
+        for metric, values in parse_file(os.path.join(results_dir, filename), kind).items():
+            if metric not in labels['metric']:
+                labels['metric'].append(metric)
+            n = len(values)
+            row = {'host': 0, 'threads': thread, 'size': size, 'mode': mode,
+                   'variant': labels['variant'].index(variant), 'metric': labels['metric'].index(metric)}
+            row.update({key: labels[key].index(value) for key, value in parts.items()})
+            for name, value in row.items():
+                chunks[name].append(np.full(n, value, dtype=DTYPES[name]))
+            chunks['run'].append(np.arange(n, dtype=DTYPES['run']))
+            chunks['value'].append(np.asarray(values, dtype=float))
+    columns = {name: np.concatenate(parts) if parts else np.array([], dtype=DTYPES[name])
+               for name, parts in chunks.items()}
+    return ResultsTable(columns, labels)
+
+
+def save(table, index_path, fingerprint=''):
+    arrays = {f'col_{name}': col for name, col in table.columns.items()}
+    arrays.update({f'cat_{name}': np.array(labels, dtype=str) for name, labels in table.categories.items()})
+    tmp_path = index_path + '.tmp.npz'
+    np.savez(tmp_path, fingerprint=np.array(fingerprint), hosts=np.array(json.dumps(table.hosts)), **arrays)
+    os.replace(tmp_path, index_path)
+
+
+def read_index(index_path):
+    with np.load(index_path) as f:
+        columns = {name: f[f'col_{name}'] for name in COLUMNS}
+        categories = {name: f[f'cat_{name}'].tolist() for name in CATEGORICAL}
+        return ResultsTable(columns, categories, json.loads(str(f['hosts']))), str(f['fingerprint'])
+
+
+# Load the index for one campaign directory, rebuilding it when any result file
+# changed. Rows are tagged with the host named in the campaign's host.json.
+def load(results_dir=RESULTS_DIR, use_cache=True):
+    entries = _result_files(results_dir)
+    fingerprint = _fingerprint(entries)
+    index_path = os.path.join(results_dir, INDEX_NAME)
+    table = None
+    if use_cache and os.path.exists(index_path):
+        try:
+            cached, cached_fingerprint = read_index(index_path)
+            if cached_fingerprint == fingerprint:
+                table = cached
+        except (KeyError, ValueError, OSError):
+            table = None  # old or broken index, rebuild it
+    if table is None:
+        table = build(results_dir, entries)
+        if use_cache:
+            save(table, index_path, fingerprint)
+    # The host label is not cached so editing host.json never needs a rebuild
+    meta = hostinfo.load(results_dir) or {}
+    table.categories['host'] = [meta.get('host', UNKNOWN_HOST)]
+    table.hosts = {table.categories['host'][0]: meta}
+    return table
+
+
+# Host key of a campaign without host.json in a merge: its directory (results/raw -> results_raw)
+def _directory_label(results_dir):
+    return os.path.relpath(os.path.abspath(results_dir)).replace(os.sep, '_')
+
+
+# Load and merge several campaign directories (each keeps its own cached index).
+# Campaigns without a host in host.json are keyed by their directory, so they
+# are never pooled under one host.
+def load_many(results_dirs, use_cache=True):
+    seen = set()
+    for d in results_dirs:
+        path = os.path.realpath(d)
+        if path in seen:
+            raise ValueError(f"campaign directory {d} is given twice")
+        seen.add(path)
+    tables = [load(d, use_cache) for d in results_dirs]
+    if len(tables) > 1:
+        for d, table in zip(results_dirs, tables):
+            meta = table.hosts[table.categories['host'][0]]
+            if 'host' not in meta:
+                label = _directory_label(d)
+                table.categories['host'] = [label]
+                table.hosts = {label: meta}
+    return concat(tables)
+
+
+# A merged index written by `plot.py ingest --merged`: one file for many hosts
+def load_merged(index_path):
+    return read_index(index_path)[0]
@@ -0,0 +1,396 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from collections import namedtuple
+
+import ingest
+import derived
+import hostinfo
+
+# perf event groups for run_tests.sh. The counters the requested metrics need
+# (derived.py) are looked up in the events the host offers (perf list) and
+# packed into as few groups as fit the core PMU's counters. Every group is one
+# benchmark execution per run, and none of them has to be multiplexed.
+
+PERF_LIST = 'perf_list.output'
+LOG_NAME = 'multiplexing.log'
+# A saved list is only valid for the CPU it was taken on: its vendor and NMI
+# watchdog state are kept next to it (perf_list.output -> perf_list.json)
+LIST_HOST_SUFFIX = '.json'
+
+# General-purpose core counters per hardware thread: 6 on Zen, 4 on Intel with
+# SMT (8 without, which this does not detect)
+GP_COUNTERS = {'AuthenticAMD': 6, 'GenuineIntel': 4}
+DEFAULT_COUNTERS = 4
+# Events Intel counts on fixed counters, next to the general-purpose ones
+FIXED_EVENTS = {'GenuineIntel': {'cycles', 'cpu-cycles', 'instructions', 'ref-cycles'}}
+# PMUs whose events share the counters above
+CORE_PMUS = ('cpu', 'cpu_core', 'cpu_atom')
+# Package-wide PMUs. They get a run of their own like the old METRICS_ENERGY group,
+# since perf counts them per package rather than per task.
+PACKAGE_PMUS = ('power', 'power_core', 'amd_iommu')
+# Generic names perf accepts without listing them
+ALIASES = {'cycles': 'cpu-cycles', 'branches': 'branch-instructions'}
+# Groups of the hand-picked runner (energy, cache, l1, l2, l3), for the report
+HAND_PICKED_RUNS = 5
+
+Group = namedtuple('Group', ['name', 'events'])
+
+
+def _entry_pmu(name, alias, description):
+    for candidate in (name, alias):
+        m = re.match(r'^([a-z0-9_]+)/[^/]+/$', candidate or '')
+        if m:
+            return m.group(1)
+    m = re.search(r'Unit:\s*([\w-]+)', description)
+    if m:
+        return m.group(1)
+    if 'Hardware event' in description or 'Hardware cache event' in description:
+        return 'cpu'
+    if 'Software event' in description or 'Tool event' in description:
+        return 'software'
+    return None  # a metric or metric group, not an event
+
+
+# {event name: pmu} of `perf list` output. Names after OR and the event part of
+# pmu/event/ are listed too.
+def parse_perf_list(text):
+    entries = []
+    for line in text.splitlines():
+        if line.startswith('   ') and entries:
+            entries[-1][2] += ' ' + line.strip()
+            continue
+        m = re.match(r'^  (\S+?)(?: OR (\S+?))?\s*(\[.*)?$', line)
+        if m:
+            entries.append([m.group(1), m.group(2), m.group(3) or ''])
+    events = {}
+    for name, alias, description in entries:
+        pmu = _entry_pmu(name, alias, description)
+        if pmu is None:
+            continue
+        for candidate in (name, alias):
+            if candidate:
+                events[candidate] = pmu
+                m = re.match(r'^[a-z0-9_]+/([^/]+)/$', candidate)
+                if m and pmu in CORE_PMUS:
+                    events.setdefault(m.group(1), pmu)
+    return events
+
+
+def _run_perf_list(perf):
+    return subprocess.run([perf, 'list'], capture_output=True, text=True, check=True).stdout
+
+
+def read_perf_list(path=None, perf='perf'):
+    if path:
+        with open(path) as f:
+            return parse_perf_list(f.read())
+    return parse_perf_list(_run_perf_list(perf))
+
+
+def list_host_path(path):
+    return os.path.splitext(path)[0] + LIST_HOST_SUFFIX
+
+
+def _nmi_watchdog():
+    try:
+        with open('/proc/sys/kernel/nmi_watchdog') as f:
+            return f.read().strip() == '1'
+    except OSError:
+        return False
+
+
+# {'vendor', 'nmi_watchdog'} of the host a saved list was taken on, None if unknown
+def read_list_host(path):
+    try:
+        with open(list_host_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Save `perf list` of this host with its vendor and NMI watchdog state
+def save_perf_list(path, perf='perf'):
+    text = _run_perf_list(perf)
+    with open(path, 'w') as f:
+        f.write(text)
+    with open(list_host_path(path), 'w') as f:
+        json.dump({'vendor': hostinfo._cpuinfo('vendor_id'), 'nmi_watchdog': _nmi_watchdog()}, f, indent=1)
+        f.write('\n')
+    return parse_perf_list(text)
+
+
+def event_pmu(events, event):
+    return events.get(event, events.get(ALIASES.get(event)))
+
+
+# General-purpose counters one task can use: the vendor's count, less the one
+# the NMI watchdog holds while it is enabled
+def counter_limit(vendor=None, nmi_watchdog=None):
+    if vendor is None:
+        vendor = hostinfo._cpuinfo('vendor_id')
+    if nmi_watchdog is None:
+        nmi_watchdog = _nmi_watchdog()
+    counters = GP_COUNTERS.get(vendor, DEFAULT_COUNTERS)
+    return counters - 1 if nmi_watchdog else counters
+
+
+# Counters the metrics read, each metric's counters as one bundle (kept in one
+# group when they fit, so ratios come from the same execution)
+def metric_bundles(metric_names):
+    bundles = []
+    for name in metric_names:
+        _, inputs = derived._compile(derived.BY_NAME[name])
+        bundle = [counter for counter in inputs if counter in ingest.PERF_EVENTS]
+        if bundle:
+            bundles.append(bundle)
+    return bundles
+
+
+def _components(bundles):
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for bundle in bundles:
+        for item in bundle:
+            parent.setdefault(item, item)
+        for item in bundle[1:]:
+            parent[find(item)] = find(bundle[0])
+    components = {}
+    for item in parent:
+        components.setdefault(find(item), []).append(item)
+    return list(components.values())
+
+
+# First-fit decreasing over the bundles, each bundle split into pieces of at most
+# `limit` items
+def _pack(bundles, limit):
+    pieces = []
+    for component in _components(bundles):
+        pieces += [component[i:i + limit] for i in range(0, len(component), limit)]
+    bins = []
+    for piece in sorted(pieces, key=len, reverse=True):
+        target = next((b for b in bins if len(b) + len(piece) <= limit), None)
+        if target is None:
+            bins.append(list(piece))
+        else:
+            target += piece
+    return bins
+
+
+class Plan:
+    """Event groups for a set of counters, with what could not be scheduled."""
+
+    def __init__(self, groups, limit, lower_bound, missing):
+        self.groups = groups            # [Group], event names in file column order
+        self.limit = limit              # general-purpose counters per group
+        self.lower_bound = lower_bound  # groups the core counters need at least
+        self.missing = missing          # [(counter, event)] this host does not offer
+
+
+# Groups for the bundles of counter names (ingest.PERF_EVENTS keys or raw event
+# names). Core events fill `limit` counters per group; fixed-counter and other
+# per-task events (msr, software) join the first group for free; package-wide
+# events get a group of their own.
+def plan(bundles, events, limit, fixed=()):
+    if limit < 1:
+        raise ValueError('the counter limit must be at least 1')
+    core, free, package, missing = [], [], [], []
+    resolved = []
+    for bundle in bundles:
+        kept = []
+        for counter in bundle:
+            event = ingest.PERF_EVENTS.get(counter, counter)
+            if any(event in group for group in (core, free, package)):
+                kept.append(event)
+                continue
+            pmu = event_pmu(events, event)
+            if pmu is None:
+                if (counter, event) not in missing:
+                    missing.append((counter, event))
+                continue
+            if pmu in PACKAGE_PMUS:
+                package.append(event)
+            elif pmu in CORE_PMUS and event not in fixed:
+                core.append(event)
+                kept.append(event)
+            else:
+                free.append(event)
+        resolved.append(kept)
+    core_bundles = [[e for e in bundle if e in core] for bundle in resolved]
+    core_bundles = [b for b in core_bundles if b] + [[e] for e in core if not any(e in b for b in core_bundles)]
+    lower_bound = -(-len(core) // limit)
+    bins = _pack(core_bundles, limit)
+    if len(bins) > lower_bound:
+        # Keeping bundles whole costs a group: fill the groups in bundle order instead
+        flat = [e for b in sorted(bins, key=len, reverse=True) for e in b]
+        bins = [flat[i:i + limit] for i in range(0, len(flat), limit)]
+    if free:
+        if not bins:
+            bins.append([])
+        bins[0] += free
+    if package:
+        bins.append(package)
+    groups = [Group(f'{ingest.PLANNED_GROUP}{i}', tuple(b)) for i, b in enumerate(bins, 1)]
+    return Plan(groups, limit, lower_bound, missing)
+
+
+def format_plan(result):
+    lines = [f"Counter limit: {result.limit} general-purpose counters per group"]
+    for group in result.groups:
+        counters = [ingest.EVENT_COUNTERS.get(e, e) for e in group.events]
+        lines.append(f"  {group.name}: {', '.join(counters)}")
+        lines.append(f"    {','.join(group.events)}")
+    lines.append(f"{len(result.groups)} executions per run (core counters need at least "
+                 f"{result.lower_bound}; the hand-picked groups took {HAND_PICKED_RUNS})")
+    for counter, event in result.missing:
+        lines.append(f"Not available on this host, skipped: {counter} ({event})")
+    return '\n'.join(lines)
+
+
+# Event name as given to -e, from the name perf prints (cpu/x/ and :u modifiers dropped)
+def _event_key(name):
+    name = name.strip()
+    m = re.match(r'^(cpu[a-z_]*)/([^/]+)/[a-z]*$', name)
+    if m:
+        name = m.group(2)
+    if '/' not in name:
+        name = name.split(':')[0]
+    return name
+
+
+# Values of `perf stat -x,` output in the order of `events` (NaN when not counted),
+# and (event, problem) for every event that was not counted the whole run
+def parse_stat(text, events):
+    wanted = {_event_key(e): i for i, e in enumerate(events)}
+    values = [float('nan')] * len(events)
+    issues = []
+    seen = set()
+    for line in text.splitlines():
+        fields = line.split(',')
+        if len(fields) < 3:
+            continue
+        key = _event_key(fields[2])
+        if key not in wanted:
+            continue
+        i = wanted[key]
+        seen.add(i)
+        if fields[0].startswith('<'):
+            issues.append((events[i], fields[0].strip('<>')))
+            continue
+        try:
+            values[i] = float(fields[0])
+        except ValueError:
+            issues.append((events[i], f'unreadable value {fields[0]!r}'))
+            continue
+        if len(fields) > 4 and fields[4]:
+            try:
+                running = float(fields[4])
+            except ValueError:
+                continue
+            if running < 100.0:
+                issues.append((events[i], f'counted {running:.2f}% of the time, scaled'))
+    for i, event in enumerate(events):
+        if i not in seen:
+            issues.append((event, 'missing from the perf output'))
+    return values, issues
+
+
+def _format_value(value):
+    if value != value:
+        return 'NaN'
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Plan perf event groups that fit the core counters without multiplexing.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('plan', help='print the event groups for the requested metrics')
+    p.add_argument('--perf-list', metavar='FILE', default=PERF_LIST,
+                   help=f'saved `perf list` output (default: {PERF_LIST})')
+    p.add_argument('--live', action='store_true', help='run `perf list` instead of reading --perf-list')
+    p.add_argument('--perf', default='perf', help='perf binary for --live')
+    p.add_argument('--metrics', nargs='+', choices=list(derived.BY_NAME),
+                   help='metrics to measure (default: every counter in ingest.PERF_EVENTS)')
+    p.add_argument('--event', action='append', default=[], help='extra raw perf event, may repeat')
+    p.add_argument('--vendor', help='vendor_id of the CPU the events are for, e.g. AuthenticAMD (default: this '
+                                    'host with --live, else the vendor saved next to --perf-list)')
+    p.add_argument('--counters', type=int, help='general-purpose counters per group (default: from the CPU vendor)')
+    p.add_argument('--shell', metavar='FILE', help='also write "name events" lines for run_tests.sh')
+
+    p = sub.add_parser('save', help='save `perf list` of this host with its CPU vendor for later plans')
+    p.add_argument('--perf-list', metavar='FILE', default=PERF_LIST, help=f'output file (default: {PERF_LIST})')
+    p.add_argument('--perf', default='perf', help='perf binary')
+
+    p = sub.add_parser('parse', help='turn `perf stat -x,` output (stdin) into a perf file row')
+    p.add_argument('events', help='comma-separated events, as passed to -e')
+    p.add_argument('--label', default='run', help='run label for the log')
+    p.add_argument('--log', help=f'append scaled or uncounted events here (e.g. results/raw/{LOG_NAME})')
+
+    args = parser.parse_args(argv)
+    if args.command == 'parse':
+        events = args.events.split(',')
+        values, issues = parse_stat(sys.stdin.read(), events)
+        print(','.join(_format_value(v) for v in values))
+        messages = [f"{args.label}: {event} {problem}" for event, problem in issues]
+        for message in messages:
+            print(f"warning: {message}", file=sys.stderr)
+        if messages and args.log:
+            with open(args.log, 'a') as f:
+                f.writelines(message + '\n' for message in messages)
+        return
+
+    if args.command == 'save':
+        try:
+            events = save_perf_list(args.perf_list, args.perf)
+        except (OSError, subprocess.CalledProcessError) as e:
+            sys.exit(f"error: could not save the perf event list: {e}")
+        print(f"{len(events)} events saved to {args.perf_list}, CPU vendor to {list_host_path(args.perf_list)}")
+        return
+
+    try:
+        events = read_perf_list(None if args.live else args.perf_list, args.perf)
+    except (OSError, subprocess.CalledProcessError) as e:
+        sys.exit(f"error: could not read the perf event list: {e}")
+    # The vendor (fixed counters, counter limit) must be that of the list's CPU
+    if args.live:
+        vendor, nmi_watchdog = hostinfo._cpuinfo('vendor_id'), _nmi_watchdog()
+    else:
+        host = read_list_host(args.perf_list) or {}
+        # Without the saved state, assume the watchdog holds a counter
+        vendor, nmi_watchdog = host.get('vendor'), host.get('nmi_watchdog', True)
+    vendor = args.vendor or vendor
+    if vendor is None:
+        sys.exit(f"error: the CPU vendor of {args.perf_list} is unknown; pass --vendor, plan with --live "
+                 f"or save the list with `perfplan.py save`")
+    if args.metrics:
+        bundles = metric_bundles(args.metrics)
+    else:
+        bundles = metric_bundles(list(derived.BY_NAME)) + [[c] for c in ingest.PERF_EVENTS]
+    bundles += [[event] for event in args.event]
+    limit = args.counters if args.counters else counter_limit(vendor, nmi_watchdog)
+    try:
+        result = plan(bundles, events, limit, FIXED_EVENTS.get(vendor, ()))
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    if not result.groups:
+        sys.exit("error: none of the requested events is available")
+    print(f"Events of {'this host' if args.live else args.perf_list} ({vendor})")
+    print(format_plan(result))
+    if args.shell:
+        os.makedirs(os.path.dirname(args.shell) or '.', exist_ok=True)
+        with open(args.shell, 'w') as f:
+            f.writelines(f"{group.name} {','.join(group.events)}\n" for group in result.groups)
+
+
+if __name__ == '__main__':
+    main()
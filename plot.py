@@ -1,27 +1,39 @@
 import os
-import glob
+import sys
+import csv
+import argparse
+import itertools
 import numpy as np
-import matplotlib.pyplot as plt
-from collections import defaultdict
+
+import ingest
+import derived
+import stats
+import topology
 
 # Path to the raw results folder
-results_dir = 'results/raw'
+results_dir = ingest.RESULTS_DIR
+# Where the figures are written
+plots_dir = 'results/plots'
+
+# Statistics settings: bars show the mean with a bootstrap percentile CI
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+# Robust z-score above which a run is dropped as an outlier (e.g. a preempted
+# run in mode 0). None keeps every run.
+OUTLIER_MAD_THRESHOLD = None
 
 # Color palette - pastel green and red tones
-GOOD_COLOR = '#21674f' 
-BAD_COLOR = '#CC6666'  
+GOOD_COLOR = '#21674f'
+BAD_COLOR = '#CC6666'
 
 # Color gradients for time_vs_executions graphs
 GOOD_COLORS = ['#21674f', '#3f907a', '#75b9a0', '#b7dbbf']  # Light to medium green pastels
 BAD_COLORS = ['#CC6666', '#D17A7A', '#D98F8F', '#E3A3A3']   # Light to medium red/pink pastels
 
-# Metrics to plot
-metrics = ['time', 'energy', 'remote_cache_fills',
-           'l1_accesses', 'l1_miss_rate',
-           'l2_accesses', 'l2_miss_rate',
-           'l3_accesses', 'l3_miss_rate']
+# Metrics to plot, declared with their units and titles in derived.py
+metrics = [m.name for m in derived.METRICS if m.plot]
 
-# Mode names mapping
+# Mode names mapping (see topology_labels for the names of one host)
 mode_names = {
     0: 'Default',
     1: 'Same core',
@@ -29,881 +41,897 @@ mode_names = {
     3: 'Different CCDs'
 }
 
-# Units for each metric
-metric_units = {
-    'time': 'seconds',
-    'energy': 'joules',
-    'remote_cache_fills': 'fills',
-    'l1_accesses': 'accesses',
-    'l1_miss_rate': '%',
-    'l2_accesses': 'accesses',
-    'l2_miss_rate': '%',
-    'l3_accesses': 'accesses',
-    'l3_miss_rate': '%'
-}
+# Units and titles for each metric
+metric_units = {m.name: m.unit for m in derived.METRICS}
+metric_titles = {m.name: m.title for m in derived.METRICS}
+
+# Modes whose label gets the CCD (L3 domain) ids from the host topology
+TOPOLOGY_MODES = {2: 'Same CCD', 3: 'Different CCDs'}
+
+# Plot families selectable with `plot --only` ('hosts' compares campaigns of several hosts,
+# 'allocs' the counter allocation modes of src/counter_storage.h, 'impls' the C++
+# binaries with shm_bench.py)
+PLOT_KINDS = ['thread', 'modes', 'executions', 'hosts', 'allocs', 'impls']
+
+# Results are never pooled across these columns: every value gets its own figures
+FACETS = ('host', 'alloc', 'impl')
+
+# Plot family comparing the values of a facet column, and its name in titles
+COMPARISONS = {'host': ('hosts', 'Host'), 'alloc': ('allocs', 'Allocation Mode'),
+               'impl': ('impls', 'Implementation')}
+
+# Line colors for the per-host / per-allocation comparisons
+COMPARISON_COLORS = ['#21674f', '#CC6666', '#4a6fa5', '#d4a017', '#7b4f9d', '#3f907a', '#8c564b', '#e377c2']
 
-# Metric titles (custom names for display)
-metric_titles = {
-    'time': 'Time',
-    'energy': 'Energy',
-    'remote_cache_fills': 'Demand/Remote Cache Fills',
-    'l1_accesses': 'L1 Cache Accesses',
-    'l1_miss_rate': 'L1 Cache Miss Rate',
-    'l2_accesses': 'L2 Cache Accesses',
-    'l2_miss_rate': 'L2 Cache Miss Rate',
-    'l3_accesses': 'L3 Cache Accesses',
-    'l3_miss_rate': 'L3 Cache Miss Rate'
+
+# matplotlib is only imported by the subcommands that render
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.rcParams.update(STYLE)
+    return plt
+
+
+# Mode names with the real CCD ids the modes ran on, e.g. "Same CCD (CCD 1)"
+def topology_labels(topo, threads=10):
+    labels = dict(mode_names)
+    if topo is None:
+        return labels
+    for mode, name in TOPOLOGY_MODES.items():
+        try:
+            domains = topology.placement_domains(topo, mode, threads)
+        except ValueError:
+            continue
+        labels[mode] = f'{name} (CCD {topology.format_cpu_list(domains)})'
+    return labels
+
+
+# ============================================================================
+# Statistics: bootstrap every configuration in one batched pass
+# ============================================================================
+
+class Summaries:
+    """Bootstrap summaries of a results table, computed once and shared by all plots."""
+
+    def __init__(self, table, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE_LEVEL,
+                 outliers=OUTLIER_MAD_THRESHOLD, labels=None):
+        self.resamples = resamples
+        self.confidence = confidence
+        self.outliers = outliers
+        # Mode names of the table's host (topology_labels)
+        self.mode_names = labels or mode_names
+        # Metric groups keyed by (thread, mode, metric, goodbad), all sizes merged
+        metric_runs = table.select(metric=metrics).groups(('threads', 'mode', 'metric', 'variant'))
+        # Time runs per (thread, size, mode, goodbad), used by the time_vs_* plots
+        self.time_runs = table.select(metric='time').groups(('threads', 'size', 'mode', 'variant'))
+        self.metric = self.summarize(metric_runs)
+        self.metric_names = {key[2] for key in self.metric}
+        self.metric_ratio = self.summarize_ratio(metric_runs)
+        self.time = self.summarize(self.time_runs)
+        self.time_ratio = self.summarize_ratio(self.time_runs)
+
+    def summarize(self, groups):
+        return stats.summarize(groups, self.resamples, self.confidence, self.outliers)
+
+    # Bad/good ratio CI for {(..., goodbad): values} groups, keyed without goodbad
+    def summarize_ratio(self, groups):
+        bad = {key[:-1]: v for key, v in groups.items() if key[-1] == 'bad'}
+        good = {key[:-1]: v for key, v in groups.items() if key[-1] == 'good'}
+        return stats.bootstrap_ratio(bad, good, self.resamples, self.confidence, self.outliers)
+
+    # Execution counts available per thread and mode
+    def sizes_per_thread_mode(self):
+        sizes = {}
+        for thread, size, mode, goodbad in self.time_runs:
+            sizes.setdefault(thread, {}).setdefault(mode, set()).add(size)
+        return sizes
+
+    # Report how many runs the outlier filter removed per configuration
+    def print_exclusions(self, out=sys.stdout):
+        if self.outliers is None:
+            return
+        excluded = stats.exclusion_report(self.time) + stats.exclusion_report(self.metric)
+        print(f"Outlier filter (MAD threshold {self.outliers}): "
+              f"{sum(e for _, _, e in excluded)} run(s) excluded in {len(excluded)} configuration(s)",
+              file=out)
+        for key, n, e in sorted(excluded, key=str):
+            print(f"  {key}: excluded {e}, kept {n}", file=out)
+
+
+# Means for plotting (missing configurations are drawn as 0)
+def summary_means(summaries):
+    return [s.mean if s is not None and np.isfinite(s.mean) else 0 for s in summaries]
+
+def ratio_text(r):
+    if r is None or not np.isfinite(r.ratio) or r.ratio <= 0:
+        return ''
+    return f'{r.ratio:.2f}x [{r.lo:.2f}, {r.hi:.2f}]'
+
+
+# ============================================================================
+# Figure output
+# ============================================================================
+
+# Resolution of the figures written by `plot` (fast to render, fine on screen)
+FIGURE_DPI = 150
+# Preview resolution for `plot --draft`
+DRAFT_DPI = 72
+# Publication quality, used by `publish` for selected panels only
+PUBLISH_DPI = 600
+
+# Shared styling for every figure (PNG, SVG and the HTML report)
+STYLE = {
+    'font.size': 10,
+    'legend.fontsize': 9,
+    # Keep text as text in SVG output so the report stays small and searchable
+    'svg.fonttype': 'none',
 }
 
-# Function to parse a file based on metric
-def parse_file(filepath, metric):
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    if metric in ['time', 'energy']:
-        # Each line is a float
-        return [float(line.strip()) for line in lines if line.strip()]
-    elif metric == 'perf_cache':
-        # Skip header, each line has 4 comma-separated values: remote_fills,demand_remote_fills,conflicts,cache_misses
-        data = []
-        for line in lines[1:]:  # Skip header
-            if line.strip():
-                values = [int(x.strip()) if x.strip() != 'NaN' else 0 for x in line.split(',')]
-                data.append(values)
-        return data
-    elif metric == 'perf_l1':
-        # Skip header, each line has 2 comma-separated values: l1_fills,l1_l2_hits
-        data = []
-        for line in lines[1:]:  # Skip header
-            if line.strip():
-                values = [int(x.strip()) if x.strip() != 'NaN' else 0 for x in line.split(',')]
-                data.append(values)
-        return data
-    elif metric == 'perf_l2':
-        # Skip header, each line has 3 comma-separated values: l2_all,l2_hits,l2_misses
-        data = []
-        for line in lines[1:]:  # Skip header
-            if line.strip():
-                values = [int(x.strip()) if x.strip() != 'NaN' else 0 for x in line.split(',')]
-                data.append(values)
-        return data
-    elif metric == 'perf_l3':
-        # Skip header, each line has 2 comma-separated values: l3_accesses,l3_misses
-        data = []
-        for line in lines[1:]:  # Skip header
-            if line.strip():
-                values = [int(x.strip()) if x.strip() != 'NaN' else 0 for x in line.split(',')]
-                data.append(values)
-        return data
-    return []
-
-# Collect all data
-data = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(list))))
-
-# Get all txt files
-files = glob.glob(os.path.join(results_dir, '*.txt'))
-
-for file in files:
-    filename = os.path.basename(file)
-    parts = filename.split('_')
-    if len(parts) < 5:
-        continue
-    
-    # Handle perf_* files
-    if parts[0] == 'perf' and len(parts) > 1:
-        if parts[1] == 'cache':
-            metric = 'perf_cache'
-            thread_idx = 2
-        elif parts[1] == 'l1':
-            metric = 'perf_l1'
-            thread_idx = 2
-        elif parts[1] == 'l2':
-            metric = 'perf_l2'
-            thread_idx = 2
-        elif parts[1] == 'l3':
-            metric = 'perf_l3'
-            thread_idx = 2
+
+def save_figure(fig, out_dir, name, fmt='png', dpi=FIGURE_DPI):
+    plt = _pyplot()
+    path = os.path.join(out_dir, f'{name}.{fmt}')
+    fig.savefig(path, dpi=dpi, bbox_inches='tight', format=fmt)
+    plt.close(fig)
+    return path
+
+
+# ============================================================================
+# Plots: one figure per thread count with every metric
+# ============================================================================
+
+# Modes with data per thread count for the per-thread figures
+def thread_modes(S):
+    modes_per_thread = {}
+    for thread, mode, metric, goodbad in S.metric:
+        modes_per_thread.setdefault(thread, set()).add(mode)
+    return {thread: sorted(modes) for thread, modes in modes_per_thread.items()}
+
+
+def draw_thread_metric(ax, S, thread, modes, metric):
+    good_summaries = [S.metric.get((thread, mode, metric, 'good')) for mode in modes]
+    bad_summaries = [S.metric.get((thread, mode, metric, 'bad')) for mode in modes]
+    good_means = summary_means(good_summaries)
+    bad_means = summary_means(bad_summaries)
+    # Bootstrap confidence intervals instead of the standard error of the mean
+    good_stds = stats.yerr(good_summaries)
+    bad_stds = stats.yerr(bad_summaries)
+
+    x = np.arange(len(modes))
+    width = 0.35
+
+    bars1 = ax.bar(x - width/2, good_means, width, label='Good', color=GOOD_COLOR, yerr=good_stds, capsize=5)
+    bars2 = ax.bar(x + width/2, bad_means, width, label='Bad', color=BAD_COLOR, yerr=bad_stds, capsize=5)
+
+    # Add value labels on top of bars
+    for bar, value in zip(bars1, good_means):
+        if value > 0:
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + bar.get_y(),
+                   f'{value:.2f}', ha='center', va='bottom', fontsize=8)
+
+    for bar, value in zip(bars2, bad_means):
+        if value > 0:
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + bar.get_y(),
+                   f'{value:.2f}', ha='center', va='bottom', fontsize=8)
+
+    # Calculate ratios for each mode and create labels
+    mode_labels = []
+    for idx, mode in enumerate(modes):
+        mode_label = S.mode_names.get(mode, f'Mode {mode}')
+        label = ratio_text(S.metric_ratio.get((thread, mode, metric)))
+        if label:
+            mode_labels.append(f'{mode_label}\n({label})')
         else:
-            continue
-    else:
-        metric = parts[0]
-        thread_idx = 1
-    
-    if metric not in ['time', 'energy', 'perf_cache', 'perf_l1', 'perf_l2', 'perf_l3']:
-        continue
-    
-    thread = int(parts[thread_idx])
-    size = int(parts[thread_idx + 1])
-    mode = int(parts[thread_idx + 2][4:])  # modeX -> X
-    goodbad = parts[thread_idx + 3].split('.')[0]  # good or bad
-    
-    parsed = parse_file(file, metric)
-    if metric == 'perf_cache':
-        # For each run, extract the perf cache metrics
-        for run in parsed:
-            remote_fills, demand_remote_fills, conflicts, cache_misses = run
-            # Use demand_remote_fills as the main remote cache fills metric
-            data[thread][mode][goodbad]['remote_cache_fills'].append(demand_remote_fills)
-            data[thread][mode][goodbad]['_cache_misses_raw'].append(cache_misses)
-            data[thread][mode][goodbad]['_cache_references_raw'].append(cache_misses)  # Will be updated with actual references
-    elif metric == 'perf_l1':
-        # For each run, extract L1 metrics
-        for run in parsed:
-            l1_fills, l1_l2_hits = run
-            data[thread][mode][goodbad]['l1_fills'].append(l1_fills)
-            data[thread][mode][goodbad]['l1_l2_hits'].append(l1_l2_hits)
-    elif metric == 'perf_l2':
-        # For each run, extract L2 metrics
-        for run in parsed:
-            l2_requests, l2_hits, l2_misses = run
-            data[thread][mode][goodbad]['l2_requests'].append(l2_requests)
-            data[thread][mode][goodbad]['l2_hits'].append(l2_hits)
-            data[thread][mode][goodbad]['l2_misses'].append(l2_misses)
-    elif metric == 'perf_l3':
-        # For each run, extract L3 metrics
-        for run in parsed:
-            l3_accesses, l3_misses = run
-            data[thread][mode][goodbad]['l3_accesses'].append(l3_accesses)
-            data[thread][mode][goodbad]['l3_misses'].append(l3_misses)
-    else:
-        data[thread][mode][goodbad][metric].extend(parsed)
-
-# Calculate cache access counts and miss rates for L1, L2, L3
-for thread in data:
-    for mode in data[thread]:
-        for goodbad in data[thread][mode]:
-            # L1: accesses = l1_fills (all L1 misses are accesses to L2)
-            # L1 miss rate = (l1_fills - l1_l2_hits) / l1_fills * 100
-            if 'l1_fills' in data[thread][mode][goodbad]:
-                l1_fills = data[thread][mode][goodbad]['l1_fills']
-                l1_l2_hits = data[thread][mode][goodbad].get('l1_l2_hits', [0] * len(l1_fills))
-                
-                data[thread][mode][goodbad]['l1_accesses'] = l1_fills
-                
-                l1_miss_rates = []
-                for i in range(len(l1_fills)):
-                    if l1_fills[i] > 0:
-                        # L1 misses that didn't hit in L2 = l1_fills - l1_l2_hits
-                        l1_misses = l1_fills[i] - l1_l2_hits[i]
-                        miss_rate = (l1_misses / l1_fills[i]) * 100
-                        l1_miss_rates.append(miss_rate)
-                    else:
-                        l1_miss_rates.append(0)
-                data[thread][mode][goodbad]['l1_miss_rate'] = l1_miss_rates
-            
-            # L2: accesses = l2_requests, miss rate = l2_misses / l2_requests * 100
-            if 'l2_requests' in data[thread][mode][goodbad] and 'l2_misses' in data[thread][mode][goodbad]:
-                l2_reqs = data[thread][mode][goodbad]['l2_requests']
-                l2_misses = data[thread][mode][goodbad]['l2_misses']
-                
-                data[thread][mode][goodbad]['l2_accesses'] = l2_reqs
-                
-                l2_miss_rates = []
-                for i in range(len(l2_reqs)):
-                    if l2_reqs[i] > 0:
-                        miss_rate = (l2_misses[i] / l2_reqs[i]) * 100
-                        l2_miss_rates.append(miss_rate)
-                    else:
-                        l2_miss_rates.append(0)
-                data[thread][mode][goodbad]['l2_miss_rate'] = l2_miss_rates
-            
-            # L3: accesses = l3_accesses, miss rate = l3_misses / l3_accesses * 100
-            if 'l3_accesses' in data[thread][mode][goodbad] and 'l3_misses' in data[thread][mode][goodbad]:
-                l3_accs = data[thread][mode][goodbad]['l3_accesses']
-                l3_misses = data[thread][mode][goodbad]['l3_misses']
-                
-                l3_miss_rates = []
-                for i in range(len(l3_accs)):
-                    if l3_accs[i] > 0:
-                        miss_rate = (l3_misses[i] / l3_accs[i]) * 100
-                        l3_miss_rates.append(miss_rate)
-                    else:
-                        l3_miss_rates.append(0)
-                data[thread][mode][goodbad]['l3_miss_rate'] = l3_miss_rates
-
-# Now, for each thread, compute means and stds
-for thread in range(1, 11):
-    if thread not in data:
-        continue
-    
-    # Get all modes for this thread
-    modes = sorted(data[thread].keys())
-    
-    # Prepare figure - now we have 9 metrics
-    # Using 3 rows x 3 columns = 9 subplots (perfect fit)
-    fig, axes = plt.subplots(3, 3, figsize=(18, 15))
+            mode_labels.append(mode_label)
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(mode_labels, fontsize=9)
+
+    # Calculate global ratio (worst vs best)
+    all_values = good_means + bad_means
+    valid_values = [v for v in all_values if v > 0]
+    global_ratio_text = ""
+    if valid_values:
+        max_val = max(valid_values)
+        min_val = min(valid_values)
+        if min_val > 0:
+            global_ratio = max_val / min_val
+            global_ratio_text = f'\nGlobal Ratio (Max/Min): {global_ratio:.2f}x'
+
+    # Use custom title if available, otherwise format the metric name
+    title = metric_titles.get(metric, metric.replace("_", " ").title())
+    ax.set_title(f'{title} ({metric_units[metric]}){global_ratio_text}', fontsize=10)
+    ax.legend(loc='best')
+    ax.grid(True, alpha=0.3)
+
+
+def figure_thread(S, thread, modes):
+    plt = _pyplot()
+    # One subplot per metric with data, 3 per row
+    shown = [metric for metric in metrics if metric in S.metric_names]
+    rows = max(1, -(-len(shown) // 3))
+    fig, axes = plt.subplots(rows, 3, figsize=(18, 5 * rows), squeeze=False)
     axes = axes.flatten()
-    
-    for i, metric in enumerate(metrics):
-        ax = axes[i]
-        
-        good_means = []
-        good_stds = []
-        bad_means = []
-        bad_stds = []
-        
-        for mode in modes:
-            if 'good' in data[thread][mode] and metric in data[thread][mode]['good']:
-                good_values = data[thread][mode]['good'][metric]
-                if len(good_values) > 1:
-                    good_means.append(np.mean(good_values))
-                    # Use standard error of the mean instead of standard deviation
-                    good_stds.append(np.std(good_values, ddof=1) / np.sqrt(len(good_values)))
-                else:
-                    good_means.append(np.mean(good_values) if good_values else 0)
-                    good_stds.append(0)
-            else:
-                good_means.append(0)
-                good_stds.append(0)
-            
-            if 'bad' in data[thread][mode] and metric in data[thread][mode]['bad']:
-                bad_values = data[thread][mode]['bad'][metric]
-                if len(bad_values) > 1:
-                    bad_means.append(np.mean(bad_values))
-                    # Use standard error of the mean instead of standard deviation
-                    bad_stds.append(np.std(bad_values, ddof=1) / np.sqrt(len(bad_values)))
-                else:
-                    bad_means.append(np.mean(bad_values) if bad_values else 0)
-                    bad_stds.append(0)
-            else:
-                bad_means.append(0)
-                bad_stds.append(0)
-        
-        x = np.arange(len(modes))
-        width = 0.35
-        
-        bars1 = ax.bar(x - width/2, good_means, width, label='Good', color=GOOD_COLOR, yerr=good_stds, capsize=5)
-        bars2 = ax.bar(x + width/2, bad_means, width, label='Bad', color=BAD_COLOR, yerr=bad_stds, capsize=5)
-        
-        # Add value labels on top of bars
-        for bar, value in zip(bars1, good_means):
-            if value > 0:
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + bar.get_y(), 
-                       f'{value:.2f}', ha='center', va='bottom', fontsize=8)
-        
-        for bar, value in zip(bars2, bad_means):
-            if value > 0:
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + bar.get_y(), 
-                       f'{value:.2f}', ha='center', va='bottom', fontsize=8)
-        
-        # Calculate ratios for each mode and create labels
-        mode_labels = []
-        ratios = []
-        for idx, mode in enumerate(modes):
-            mode_label = mode_names.get(mode, f'Mode {mode}')
-            if good_means[idx] > 0:
-                ratio = bad_means[idx] / good_means[idx]
-                ratios.append(ratio)
-                mode_labels.append(f'{mode_label}\n({ratio:.2f}x)')
-            else:
-                mode_labels.append(mode_label)
-        
-        ax.set_xticks(x)
-        ax.set_xticklabels(mode_labels, fontsize=9)
-        
-        # Calculate global ratio (worst vs best)
-        all_values = good_means + bad_means
-        valid_values = [v for v in all_values if v > 0]
-        global_ratio_text = ""
-        if valid_values:
-            max_val = max(valid_values)
-            min_val = min(valid_values)
-            if min_val > 0:
-                global_ratio = max_val / min_val
-                global_ratio_text = f'\nGlobal Ratio (Max/Min): {global_ratio:.2f}x'
-        
-        # Use custom title if available, otherwise format the metric name
-        title = metric_titles.get(metric, metric.replace("_", " ").title())
-        ax.set_title(f'{title} ({metric_units[metric]}){global_ratio_text}', fontsize=10)
-        ax.legend(loc='best')
-        ax.grid(True, alpha=0.3)
-    
-    plt.suptitle(f'Results for {thread} Thread(s)', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    # High resolution for cropping individual subplots without pixelation
-    plt.savefig(f'results/plots/plot_thread_{thread}.png', dpi=600, bbox_inches='tight')
-    plt.close()
+    for ax, metric in zip(axes, shown):
+        draw_thread_metric(ax, S, thread, modes, metric)
+    for ax in axes[len(shown):]:
+        ax.set_visible(False)
+    fig.suptitle(f'Results for {thread} Thread(s)', fontsize=16, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+# Largest execution count measured for a mode on any thread count
+def largest_size_for_mode(sizes_per_thread_mode, current_mode):
+    largest_size_mode = 0
+    for thread in range(1, 11):
+        if thread in sizes_per_thread_mode and current_mode in sizes_per_thread_mode[thread]:
+            sizes = sizes_per_thread_mode[thread][current_mode]
+            if sizes:
+                largest_size_mode = max(largest_size_mode, max(sizes))
+    return largest_size_mode
+
+
+# Modes for the time_vs_* plots (mode 1, Same core, only has 2 threads)
+def time_plot_modes(S):
+    all_modes = set()
+    for modes in S.sizes_per_thread_mode().values():
+        all_modes.update(modes)
+    return [m for m in sorted(all_modes) if m != 1]
+
 
 # ============================================================================
-# Additional Plot 1: Time vs Number of Threads (Mode 0, largest execution count)
+# Time vs Number of Threads for a mode (largest execution count)
 # ============================================================================
 
-# Find the largest execution count available
-all_sizes = set()
-for thread in data:
-    for mode in data[thread]:
-        for goodbad in data[thread][mode]:
-            # Get the size from the file names (we need to track this)
-            pass
-
-# We need to get sizes from the files again
-sizes_per_thread_mode = defaultdict(lambda: defaultdict(set))
-for file in files:
-    filename = os.path.basename(file)
-    parts = filename.split('_')
-    if len(parts) < 5:
-        continue
-    
-    if parts[0] == 'time':
-        thread = int(parts[1])
-        size = int(parts[2])
-        mode = int(parts[3][4:])
-        sizes_per_thread_mode[thread][mode].add(size)
-
-# Find the largest common size for mode 0
-largest_size = 0
-for thread in range(1, 11):
-    if thread in sizes_per_thread_mode and 0 in sizes_per_thread_mode[thread]:
-        sizes = sizes_per_thread_mode[thread][0]
-        if sizes:
-            largest_size = max(largest_size, max(sizes))
-
-# Collect time data for mode 0 with largest size
-thread_time_data = defaultdict(lambda: {'good': [], 'bad': []})
-for file in files:
-    filename = os.path.basename(file)
-    parts = filename.split('_')
-    if len(parts) < 5 or parts[0] != 'time':
-        continue
-    
-    thread = int(parts[1])
-    size = int(parts[2])
-    mode = int(parts[3][4:])
-    goodbad = parts[4].split('.')[0]
-    
-    if mode == 0 and size == largest_size:
-        parsed = parse_file(file, 'time')
-        thread_time_data[thread][goodbad].extend(parsed)
-
-# Plot time vs threads
-if thread_time_data:
-    threads = sorted(thread_time_data.keys())
-    good_means = []
-    good_stds = []
-    bad_means = []
-    bad_stds = []
-    ratios = []
-    
-    for t in threads:
-        if 'good' in thread_time_data[t] and thread_time_data[t]['good']:
-            good_vals = thread_time_data[t]['good']
-            good_means.append(np.mean(good_vals))
-            good_stds.append(np.std(good_vals, ddof=1) / np.sqrt(len(good_vals)))
-        else:
-            good_means.append(0)
-            good_stds.append(0)
-        
-        if 'bad' in thread_time_data[t] and thread_time_data[t]['bad']:
-            bad_vals = thread_time_data[t]['bad']
-            bad_means.append(np.mean(bad_vals))
-            bad_stds.append(np.std(bad_vals, ddof=1) / np.sqrt(len(bad_vals)))
-        else:
-            bad_means.append(0)
-            bad_stds.append(0)
-        
-        # Calculate ratio
-        if good_means[-1] > 0:
-            ratios.append(bad_means[-1] / good_means[-1])
-        else:
-            ratios.append(0)
-    
+def figure_time_vs_threads(S, current_mode):
+    plt = _pyplot()
+    mode_name = S.mode_names.get(current_mode, f'Mode {current_mode}')
+    largest_size_mode = largest_size_for_mode(S.sizes_per_thread_mode(), current_mode)
+    threads = sorted({t for t, s, m, gb in S.time_runs if m == current_mode and s == largest_size_mode})
+    if largest_size_mode == 0 or not threads:
+        return None
+
+    good_summaries = [S.time.get((t, largest_size_mode, current_mode, 'good')) for t in threads]
+    bad_summaries = [S.time.get((t, largest_size_mode, current_mode, 'bad')) for t in threads]
+    good_means = summary_means(good_summaries)
+    bad_means = summary_means(bad_summaries)
+    good_stds = stats.yerr(good_summaries)
+    bad_stds = stats.yerr(bad_summaries)
+    ratios = [ratio_text(S.time_ratio.get((t, largest_size_mode, current_mode))) for t in threads]
+
     fig, ax = plt.subplots(figsize=(12, 8))
-    
+
     x = np.array(threads)
-    ax.errorbar(x, good_means, yerr=good_stds, label='Good', color=GOOD_COLOR, 
+    ax.errorbar(x, good_means, yerr=good_stds, label='Good', color=GOOD_COLOR,
                 marker='o', markersize=8, linewidth=2, capsize=5)
-    ax.errorbar(x, bad_means, yerr=bad_stds, label='Bad', color=BAD_COLOR, 
+    ax.errorbar(x, bad_means, yerr=bad_stds, label='Bad', color=BAD_COLOR,
                 marker='s', markersize=8, linewidth=2, capsize=5)
-    
+
     # Add ratio labels for each point
     for i, (t, ratio) in enumerate(zip(threads, ratios)):
-        if ratio > 0:
+        if ratio:
             # Position the ratio label above the bad (red) line
             y_pos = max(bad_means[i], good_means[i]) * 1.05
-            ax.text(t, y_pos, f'{ratio:.2f}x', ha='center', va='bottom', 
+            ax.text(t, y_pos, ratio, ha='center', va='bottom',
                    fontsize=9, fontweight='bold', color='#CC6666')
-    
+
     ax.set_xlabel('Number of Threads', fontsize=12, fontweight='bold')
     ax.set_ylabel('Execution Time (seconds)', fontsize=12, fontweight='bold')
-    mode_name = mode_names.get(0, 'Mode 0')
-    ax.set_title(f'Execution Time vs Number of Threads\n({mode_name}, {largest_size} executions)', 
+    ax.set_title(f'Execution Time vs Number of Threads\n({mode_name}, {largest_size_mode} executions)',
                 fontsize=14, fontweight='bold')
     ax.set_xticks(threads)
     ax.legend(fontsize=11)
     ax.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig(f'results/plots/time_vs_threads_mode0.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
+    return fig
+
 
 # ============================================================================
-# Additional Plot 2: Time vs Number of Executions (Mode 0, varying threads)
+# Time vs Number of Executions for a mode (varying threads)
 # ============================================================================
 
-# Collect time data organized by size
-size_time_data = defaultdict(lambda: defaultdict(lambda: {'good': [], 'bad': []}))
-available_sizes = set()
-
-for file in files:
-    filename = os.path.basename(file)
-    parts = filename.split('_')
-    if len(parts) < 5 or parts[0] != 'time':
-        continue
-    
-    thread = int(parts[1])
-    size = int(parts[2])
-    mode = int(parts[3][4:])
-    goodbad = parts[4].split('.')[0]
-    
-    if mode == 0:  # Only mode 0
-        parsed = parse_file(file, 'time')
-        size_time_data[size][thread][goodbad].extend(parsed)
-        available_sizes.add(size)
-
-# Plot time vs executions for different thread counts (combined good and bad)
-if size_time_data and available_sizes:
-    sizes = sorted(available_sizes)
-    
+def figure_time_vs_executions(S, current_mode):
+    plt = _pyplot()
+    mode_name = S.mode_names.get(current_mode, f'Mode {current_mode}')
+    sizes = sorted({s for t, s, m, gb in S.time_runs if m == current_mode})
+    if not sizes:
+        return None
+
     # Select a few thread counts to display (2, 3, 5, 7)
-    selected_threads = [t for t in [2, 3, 5, 7] if any(t in size_time_data[s] for s in sizes)]
-    
+    selected_threads = [t for t in [2, 3, 5, 7]
+                        if any((t, s, current_mode, gb) in S.time_runs for s in sizes for gb in ('good', 'bad'))]
+
     # Use the pastel color gradients defined at the top
     markers = ['o', 's', '^', 'd']
-    
+
     fig, ax = plt.subplots(figsize=(14, 8))
-    
+
     # Plot both Good and Bad on the same graph
     for idx, t in enumerate(selected_threads):
         # Good implementation
-        good_means = []
-        good_stds = []
-        for s in sizes:
-            if t in size_time_data[s] and 'good' in size_time_data[s][t]:
-                vals = size_time_data[s][t]['good']
-                if vals:
-                    good_means.append(np.mean(vals))
-                    good_stds.append(np.std(vals, ddof=1) / np.sqrt(len(vals)))
-                else:
-                    good_means.append(0)
-                    good_stds.append(0)
-            else:
-                good_means.append(0)
-                good_stds.append(0)
-        
+        good_summaries = [S.time.get((t, s, current_mode, 'good')) for s in sizes]
+        good_means = summary_means(good_summaries)
+        good_stds = stats.yerr(good_summaries)
+
         if good_means:
-            ax.errorbar(sizes, good_means, yerr=good_stds, label=f'{t} threads (Good)', 
-                       color=GOOD_COLORS[idx % len(GOOD_COLORS)], 
+            ax.errorbar(sizes, good_means, yerr=good_stds, label=f'{t} threads (Good)',
+                       color=GOOD_COLORS[idx % len(GOOD_COLORS)],
                        marker=markers[idx % len(markers)],
                        markersize=8, linewidth=2, capsize=5, linestyle='-')
-        
+
         # Bad implementation
-        bad_means = []
-        bad_stds = []
-        for s in sizes:
-            if t in size_time_data[s] and 'bad' in size_time_data[s][t]:
-                vals = size_time_data[s][t]['bad']
-                if vals:
-                    bad_means.append(np.mean(vals))
-                    bad_stds.append(np.std(vals, ddof=1) / np.sqrt(len(vals)))
-                else:
-                    bad_means.append(0)
-                    bad_stds.append(0)
-            else:
-                bad_means.append(0)
-                bad_stds.append(0)
-        
+        bad_summaries = [S.time.get((t, s, current_mode, 'bad')) for s in sizes]
+        bad_means = summary_means(bad_summaries)
+        bad_stds = stats.yerr(bad_summaries)
+
         if bad_means:
-            ax.errorbar(sizes, bad_means, yerr=bad_stds, label=f'{t} threads (Bad)', 
-                       color=BAD_COLORS[idx % len(BAD_COLORS)], 
+            ax.errorbar(sizes, bad_means, yerr=bad_stds, label=f'{t} threads (Bad)',
+                       color=BAD_COLORS[idx % len(BAD_COLORS)],
                        marker=markers[idx % len(markers)],
                        markersize=8, linewidth=2, capsize=5, linestyle='--')
-    
+
     ax.set_xlabel('Number of Executions', fontsize=12, fontweight='bold')
     ax.set_ylabel('Execution Time (seconds)', fontsize=12, fontweight='bold')
-    mode_name = mode_names.get(0, 'Mode 0')
-    ax.set_title(f'Execution Time vs Number of Executions\n({mode_name})', 
+    ax.set_title(f'Execution Time vs Number of Executions\n({mode_name})',
                 fontsize=14, fontweight='bold')
     ax.legend(fontsize=9, ncol=2)
     ax.grid(True, alpha=0.3)
     ax.ticklabel_format(style='scientific', axis='x', scilimits=(0,0))
-    
-    plt.tight_layout()
-    plt.savefig('results/plots/time_vs_executions_mode0.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
+    return fig
+
 
 # ============================================================================
-# Generate Time vs Threads and Time vs Executions for ALL modes (except mode 1)
+# Time vs Mode Comparison
 # ============================================================================
 
-# Get all available modes
-all_modes = set()
-for thread in sizes_per_thread_mode:
-    all_modes.update(sizes_per_thread_mode[thread].keys())
-all_modes = sorted(all_modes)
-
-# For each mode, generate both graphs (skip mode 1)
-for current_mode in all_modes:
-    if current_mode == 1:  # Skip mode 1 (Same core)
-        continue
-    mode_name = mode_names.get(current_mode, f'Mode {current_mode}')
-    
-    # Find the largest common size for this mode
-    largest_size_mode = 0
-    for thread in range(1, 11):
-        if thread in sizes_per_thread_mode and current_mode in sizes_per_thread_mode[thread]:
-            sizes = sizes_per_thread_mode[thread][current_mode]
-            if sizes:
-                largest_size_mode = max(largest_size_mode, max(sizes))
-    
-    if largest_size_mode == 0:
-        continue
-    
-    # ========================================================================
-    # Time vs Threads for this mode
-    # ========================================================================
-    thread_time_data_mode = defaultdict(lambda: {'good': [], 'bad': []})
-    for file in files:
-        filename = os.path.basename(file)
-        parts = filename.split('_')
-        if len(parts) < 5 or parts[0] != 'time':
-            continue
-        
-        thread = int(parts[1])
-        size = int(parts[2])
-        mode = int(parts[3][4:])
-        goodbad = parts[4].split('.')[0]
-        
-        if mode == current_mode and size == largest_size_mode:
-            parsed = parse_file(file, 'time')
-            thread_time_data_mode[thread][goodbad].extend(parsed)
-    
-    if thread_time_data_mode:
-        threads = sorted(thread_time_data_mode.keys())
-        good_means = []
-        good_stds = []
-        bad_means = []
-        bad_stds = []
-        ratios = []
-        
-        for t in threads:
-            if 'good' in thread_time_data_mode[t] and thread_time_data_mode[t]['good']:
-                good_vals = thread_time_data_mode[t]['good']
-                good_means.append(np.mean(good_vals))
-                good_stds.append(np.std(good_vals, ddof=1) / np.sqrt(len(good_vals)))
-            else:
-                good_means.append(0)
-                good_stds.append(0)
-            
-            if 'bad' in thread_time_data_mode[t] and thread_time_data_mode[t]['bad']:
-                bad_vals = thread_time_data_mode[t]['bad']
-                bad_means.append(np.mean(bad_vals))
-                bad_stds.append(np.std(bad_vals, ddof=1) / np.sqrt(len(bad_vals)))
-            else:
-                bad_means.append(0)
-                bad_stds.append(0)
-            
-            # Calculate ratio
-            if good_means[-1] > 0:
-                ratios.append(bad_means[-1] / good_means[-1])
-            else:
-                ratios.append(0)
-        
-        fig, ax = plt.subplots(figsize=(12, 8))
-        
-        x = np.array(threads)
-        ax.errorbar(x, good_means, yerr=good_stds, label='Good', color=GOOD_COLOR, 
-                    marker='o', markersize=8, linewidth=2, capsize=5)
-        ax.errorbar(x, bad_means, yerr=bad_stds, label='Bad', color=BAD_COLOR, 
-                    marker='s', markersize=8, linewidth=2, capsize=5)
-        
-        # Add ratio labels for each point
-        for i, (t, ratio) in enumerate(zip(threads, ratios)):
-            if ratio > 0:
-                y_pos = max(bad_means[i], good_means[i]) * 1.05
-                ax.text(t, y_pos, f'{ratio:.2f}x', ha='center', va='bottom', 
-                       fontsize=9, fontweight='bold', color='#CC6666')
-        
-        ax.set_xlabel('Number of Threads', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Execution Time (seconds)', fontsize=12, fontweight='bold')
-        ax.set_title(f'Execution Time vs Number of Threads\n({mode_name}, {largest_size_mode} executions)', 
-                    fontsize=14, fontweight='bold')
-        ax.set_xticks(threads)
-        ax.legend(fontsize=11)
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'results/plots/time_vs_threads_mode{current_mode}.png', dpi=300, bbox_inches='tight')
-        plt.close()
-    
-    # ========================================================================
-    # Time vs Executions for this mode
-    # ========================================================================
-    size_time_data_mode = defaultdict(lambda: defaultdict(lambda: {'good': [], 'bad': []}))
-    available_sizes_mode = set()
-    
-    for file in files:
-        filename = os.path.basename(file)
-        parts = filename.split('_')
-        if len(parts) < 5 or parts[0] != 'time':
-            continue
-        
-        thread = int(parts[1])
-        size = int(parts[2])
-        mode = int(parts[3][4:])
-        goodbad = parts[4].split('.')[0]
-        
-        if mode == current_mode:
-            parsed = parse_file(file, 'time')
-            size_time_data_mode[size][thread][goodbad].extend(parsed)
-            available_sizes_mode.add(size)
-    
-    if size_time_data_mode and available_sizes_mode:
-        sizes = sorted(available_sizes_mode)
-        selected_threads = [t for t in [2, 3, 5, 7] if any(t in size_time_data_mode[s] for s in sizes)]
-        
-        markers = ['o', 's', '^', 'd']
-        
-        fig, ax = plt.subplots(figsize=(14, 8))
-        
-        for idx, t in enumerate(selected_threads):
-            # Good implementation
-            good_means = []
-            good_stds = []
-            for s in sizes:
-                if t in size_time_data_mode[s] and 'good' in size_time_data_mode[s][t]:
-                    vals = size_time_data_mode[s][t]['good']
-                    if vals:
-                        good_means.append(np.mean(vals))
-                        good_stds.append(np.std(vals, ddof=1) / np.sqrt(len(vals)))
-                    else:
-                        good_means.append(0)
-                        good_stds.append(0)
-                else:
-                    good_means.append(0)
-                    good_stds.append(0)
-            
-            if good_means:
-                ax.errorbar(sizes, good_means, yerr=good_stds, label=f'{t} threads (Good)', 
-                           color=GOOD_COLORS[idx % len(GOOD_COLORS)], 
-                           marker=markers[idx % len(markers)],
-                           markersize=8, linewidth=2, capsize=5, linestyle='-')
-            
-            # Bad implementation
-            bad_means = []
-            bad_stds = []
-            for s in sizes:
-                if t in size_time_data_mode[s] and 'bad' in size_time_data_mode[s][t]:
-                    vals = size_time_data_mode[s][t]['bad']
-                    if vals:
-                        bad_means.append(np.mean(vals))
-                        bad_stds.append(np.std(vals, ddof=1) / np.sqrt(len(vals)))
-                    else:
-                        bad_means.append(0)
-                        bad_stds.append(0)
-                else:
-                    bad_means.append(0)
-                    bad_stds.append(0)
-            
-            if bad_means:
-                ax.errorbar(sizes, bad_means, yerr=bad_stds, label=f'{t} threads (Bad)', 
-                           color=BAD_COLORS[idx % len(BAD_COLORS)], 
-                           marker=markers[idx % len(markers)],
-                           markersize=8, linewidth=2, capsize=5, linestyle='--')
-        
-        ax.set_xlabel('Number of Executions', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Execution Time (seconds)', fontsize=12, fontweight='bold')
-        ax.set_title(f'Execution Time vs Number of Executions\n({mode_name})', 
-                    fontsize=14, fontweight='bold')
-        ax.legend(fontsize=9, ncol=2)
-        ax.grid(True, alpha=0.3)
-        ax.ticklabel_format(style='scientific', axis='x', scilimits=(0,0))
-        
-        plt.tight_layout()
-        plt.savefig(f'results/plots/time_vs_executions_mode{current_mode}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+class ModeComparison:
+    """Data shared by every subplot of the time vs modes figure."""
 
-# ============================================================================
-# Additional Plot: Time vs Mode Comparison
-# ============================================================================
+    def __init__(self, S):
+        sizes_per_thread_mode = S.sizes_per_thread_mode()
+
+        # Find the largest common size across all modes
+        self.size = 0
+        for thread in range(1, 11):
+            if thread in sizes_per_thread_mode:
+                common_sizes = None
+                for mode in sizes_per_thread_mode[thread]:
+                    if common_sizes is None:
+                        common_sizes = sizes_per_thread_mode[thread][mode].copy()
+                    else:
+                        common_sizes = common_sizes.intersection(sizes_per_thread_mode[thread][mode])
+                if common_sizes:
+                    self.size = max(self.size, max(common_sizes))
+
+        # Modes with time data per thread count (using largest execution count)
+        self.modes = {}
+        for thread, size, mode, goodbad in S.time_runs:
+            if size == self.size:
+                self.modes.setdefault(thread, set()).add(mode)
+        self.modes = {thread: sorted(modes) for thread, modes in self.modes.items()}
+        # Get all available thread counts (1-10)
+        self.thread_counts = [t for t in range(1, 11) if t in self.modes]
 
-# Collect time data for each mode (using largest execution count, various threads)
-mode_comparison_data = defaultdict(lambda: defaultdict(lambda: {'good': [], 'bad': []}))
-
-# Find the largest common size across all modes
-largest_common_size = 0
-for thread in range(1, 11):
-    if thread in sizes_per_thread_mode:
-        common_sizes = None
-        for mode in sizes_per_thread_mode[thread]:
-            if common_sizes is None:
-                common_sizes = sizes_per_thread_mode[thread][mode].copy()
-            else:
-                common_sizes = common_sizes.intersection(sizes_per_thread_mode[thread][mode])
-        if common_sizes:
-            largest_common_size = max(largest_common_size, max(common_sizes))
-
-# Collect data for mode comparison
-for file in files:
-    filename = os.path.basename(file)
-    parts = filename.split('_')
-    if len(parts) < 5 or parts[0] != 'time':
-        continue
-    
-    thread = int(parts[1])
-    size = int(parts[2])
-    mode = int(parts[3][4:])
-    goodbad = parts[4].split('.')[0]
-    
-    if size == largest_common_size:
-        parsed = parse_file(file, 'time')
-        mode_comparison_data[mode][thread][goodbad].extend(parsed)
-
-# Create comparison plots for ALL thread counts
-if mode_comparison_data:
-    # Get all available thread counts (1-10)
-    all_thread_counts = [t for t in range(1, 11) 
-                        if any(t in mode_comparison_data[m] for m in mode_comparison_data)]
-    
-    if all_thread_counts:
-        # Create a figure with subplots for each thread count (2 rows x 5 columns for 10 threads)
-        n_threads = len(all_thread_counts)
-        fig, axes = plt.subplots(2, 5, figsize=(24, 10))
-        axes = axes.flatten()
-        
         # Collect all values to determine global y-axis scale
-        all_good_values = []
-        all_bad_values = []
-        
-        for thread_count in all_thread_counts:
-            modes_with_data = sorted([m for m in mode_comparison_data 
-                                     if thread_count in mode_comparison_data[m]])
-            for mode in modes_with_data:
-                if 'good' in mode_comparison_data[mode][thread_count]:
-                    good_vals = mode_comparison_data[mode][thread_count]['good']
-                    if good_vals:
-                        all_good_values.append(np.mean(good_vals))
-                
-                if 'bad' in mode_comparison_data[mode][thread_count]:
-                    bad_vals = mode_comparison_data[mode][thread_count]['bad']
-                    if bad_vals:
-                        all_bad_values.append(np.mean(bad_vals))
-        
+        self.values = []
+        for thread_count in self.thread_counts:
+            for mode in self.modes[thread_count]:
+                for goodbad in ('good', 'bad'):
+                    s = S.time.get((thread_count, self.size, mode, goodbad))
+                    if s is not None and np.isfinite(s.mean):
+                        self.values.append(s.mean)
+
         # Determine global y-axis limits
-        if all_good_values or all_bad_values:
-            all_values = all_good_values + all_bad_values
-            y_max = max(all_values) * 1.15  # Add 15% padding at top
-            y_min = 0
-        else:
-            y_max = 1
-            y_min = 0
-        
-        for idx, thread_count in enumerate(all_thread_counts):
-            ax = axes[idx]
-            
-            # Get all modes that have data for this thread count
-            modes_with_data = sorted([m for m in mode_comparison_data 
-                                     if thread_count in mode_comparison_data[m]])
-            
-            if not modes_with_data:
-                continue
-            
-            good_means = []
-            good_stds = []
-            bad_means = []
-            bad_stds = []
-            mode_labels = []
-            ratios = []
-            
-            for mode in modes_with_data:
-                mode_labels.append(mode_names.get(mode, f'Mode {mode}'))
-                
-                if 'good' in mode_comparison_data[mode][thread_count]:
-                    good_vals = mode_comparison_data[mode][thread_count]['good']
-                    if good_vals:
-                        good_means.append(np.mean(good_vals))
-                        good_stds.append(np.std(good_vals, ddof=1) / np.sqrt(len(good_vals)))
-                    else:
-                        good_means.append(0)
-                        good_stds.append(0)
-                else:
-                    good_means.append(0)
-                    good_stds.append(0)
-                
-                if 'bad' in mode_comparison_data[mode][thread_count]:
-                    bad_vals = mode_comparison_data[mode][thread_count]['bad']
-                    if bad_vals:
-                        bad_means.append(np.mean(bad_vals))
-                        bad_stds.append(np.std(bad_vals, ddof=1) / np.sqrt(len(bad_vals)))
-                    else:
-                        bad_means.append(0)
-                        bad_stds.append(0)
-                else:
-                    bad_means.append(0)
-                    bad_stds.append(0)
-                
-                # Calculate ratio
-                if good_means[-1] > 0:
-                    ratios.append(bad_means[-1] / good_means[-1])
-                else:
-                    ratios.append(0)
-            
-            x = np.arange(len(modes_with_data))
-            width = 0.35
-            
-            bars1 = ax.bar(x - width/2, good_means, width, label='Good', color=GOOD_COLOR, 
-                          yerr=good_stds, capsize=5)
-            bars2 = ax.bar(x + width/2, bad_means, width, label='Bad', color=BAD_COLOR, 
-                          yerr=bad_stds, capsize=5)
-            
-            # Add value labels on top of bars
-            for bar, value in zip(bars1, good_means):
-                if value > 0:
-                    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height(), 
-                           f'{value:.2f}', ha='center', va='bottom', fontsize=8)
-            
-            for bar, value in zip(bars2, bad_means):
-                if value > 0:
-                    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height(), 
-                           f'{value:.2f}', ha='center', va='bottom', fontsize=8)
-            
-            # Add ratio labels below mode names
-            mode_labels_with_ratio = []
-            for i, (label, ratio) in enumerate(zip(mode_labels, ratios)):
-                if ratio > 0:
-                    mode_labels_with_ratio.append(f'{label}\n({ratio:.2f}x)')
-                else:
-                    mode_labels_with_ratio.append(label)
-            
-            ax.set_xticks(x)
-            ax.set_xticklabels(mode_labels_with_ratio, fontsize=8)
-            ax.set_ylabel('Time (s)', fontsize=9, fontweight='bold')
-            ax.set_title(f'{thread_count} Thread(s)', fontsize=10, fontweight='bold')
-            ax.legend(fontsize=8)
-            ax.grid(True, alpha=0.3, axis='y')
-            
-            # Set the same y-axis scale for all subplots
-            ax.set_ylim(y_min, y_max)
-        
-        # Hide unused subplots if less than 10 thread counts
-        for j in range(len(all_thread_counts), len(axes)):
-            axes[j].set_visible(False)
-        
-        # Calculate global ratio (best/worst across all modes and threads)
-        all_values_global = all_good_values + all_bad_values
-        if all_values_global:
-            best_value = min(all_values_global)
-            worst_value = max(all_values_global)
-            if best_value > 0:
-                global_ratio = worst_value / best_value
-                title_text = f'Execution Time Comparison Across Modes\n({largest_common_size} executions)\nGlobal Ratio (Worst/Best): {global_ratio:.2f}x'
-            else:
-                title_text = f'Execution Time Comparison Across Modes\n({largest_common_size} executions)'
+        self.y_max = max(self.values) * 1.15 if self.values else 1  # Add 15% padding at top
+        self.y_min = 0
+
+
+def draw_mode_comparison(ax, S, C, thread_count):
+    modes_with_data = C.modes[thread_count]
+    mode_labels = [S.mode_names.get(mode, f'Mode {mode}') for mode in modes_with_data]
+    good_summaries = [S.time.get((thread_count, C.size, mode, 'good')) for mode in modes_with_data]
+    bad_summaries = [S.time.get((thread_count, C.size, mode, 'bad')) for mode in modes_with_data]
+    good_means = summary_means(good_summaries)
+    bad_means = summary_means(bad_summaries)
+    good_stds = stats.yerr(good_summaries)
+    bad_stds = stats.yerr(bad_summaries)
+    ratios = [ratio_text(S.time_ratio.get((thread_count, C.size, mode))) for mode in modes_with_data]
+
+    x = np.arange(len(modes_with_data))
+    width = 0.35
+
+    bars1 = ax.bar(x - width/2, good_means, width, label='Good', color=GOOD_COLOR,
+                  yerr=good_stds, capsize=5)
+    bars2 = ax.bar(x + width/2, bad_means, width, label='Bad', color=BAD_COLOR,
+                  yerr=bad_stds, capsize=5)
+
+    # Add value labels on top of bars
+    for bar, value in zip(bars1, good_means):
+        if value > 0:
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height(),
+                   f'{value:.2f}', ha='center', va='bottom', fontsize=8)
+
+    for bar, value in zip(bars2, bad_means):
+        if value > 0:
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height(),
+                   f'{value:.2f}', ha='center', va='bottom', fontsize=8)
+
+    # Add ratio labels below mode names
+    mode_labels_with_ratio = []
+    for label, ratio in zip(mode_labels, ratios):
+        if ratio:
+            mode_labels_with_ratio.append(f'{label}\n({ratio})')
         else:
-            title_text = f'Execution Time Comparison Across Modes\n({largest_common_size} executions)'
-        
-        plt.suptitle(title_text, fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        # High resolution for cropping individual subplots without pixelation
-        plt.savefig('results/plots/time_vs_modes.png', dpi=600, bbox_inches='tight')
-        plt.close()
-
-print("Plots generated successfully!")
\ No newline at end of file
+            mode_labels_with_ratio.append(label)
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(mode_labels_with_ratio, fontsize=8)
+    ax.set_ylabel('Time (s)', fontsize=9, fontweight='bold')
+    ax.set_title(f'{thread_count} Thread(s)', fontsize=10, fontweight='bold')
+    ax.legend(fontsize=8)
+    ax.grid(True, alpha=0.3, axis='y')
+
+    # Set the same y-axis scale for all subplots
+    ax.set_ylim(C.y_min, C.y_max)
+
+
+def figure_time_vs_modes(S):
+    plt = _pyplot()
+    C = ModeComparison(S)
+    if not C.thread_counts:
+        return None
+
+    # Create a figure with subplots for each thread count (2 rows x 5 columns for 10 threads)
+    fig, axes = plt.subplots(2, 5, figsize=(24, 10))
+    axes = axes.flatten()
+    for ax, thread_count in zip(axes, C.thread_counts):
+        draw_mode_comparison(ax, S, C, thread_count)
+
+    # Hide unused subplots if less than 10 thread counts
+    for j in range(len(C.thread_counts), len(axes)):
+        axes[j].set_visible(False)
+
+    # Calculate global ratio (best/worst across all modes and threads)
+    title_text = f'Execution Time Comparison Across Modes\n({C.size} executions)'
+    if C.values and min(C.values) > 0:
+        global_ratio = max(C.values) / min(C.values)
+        title_text += f'\nGlobal Ratio (Worst/Best): {global_ratio:.2f}x'
+
+    fig.suptitle(title_text, fontsize=16, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+# ============================================================================
+# Bad/good time ratio vs threads, one line per host or allocation mode
+# ============================================================================
+
+class Comparison:
+    """Bad/good time ratios per value of a facet column, normalizing away absolute speed."""
+
+    def __init__(self, table, column, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE_LEVEL,
+                 outliers=OUTLIER_MAD_THRESHOLD):
+        self.column = column
+        runs = table.select(metric='time').groups((column, 'threads', 'size', 'mode', 'variant'))
+        bad = {key[:-1]: v for key, v in runs.items() if key[-1] == 'bad'}
+        good = {key[:-1]: v for key, v in runs.items() if key[-1] == 'good'}
+        self.ratio = stats.bootstrap_ratio(bad, good, resamples, confidence, outliers)
+        self.labels = table.unique(column)
+        self.modes = sorted({key[3] for key in self.ratio if key[3] != 1})
+        # Largest execution count per (label, mode)
+        self.size = {}
+        for label, thread, size, mode in self.ratio:
+            self.size[(label, mode)] = max(self.size.get((label, mode), 0), size)
+
+
+def figure_ratio_comparison(C, current_mode):
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(12, 8))
+    plotted = False
+    for idx, label in enumerate(C.labels):
+        size = C.size.get((label, current_mode))
+        points = sorted((t, r) for (l, t, s, m), r in C.ratio.items()
+                        if l == label and m == current_mode and s == size and np.isfinite(r.ratio))
+        if not points:
+            continue
+        threads = [t for t, _ in points]
+        ratios = [r.ratio for _, r in points]
+        yerr = [[max(0.0, r.ratio - r.lo) for _, r in points], [max(0.0, r.hi - r.ratio) for _, r in points]]
+        ax.errorbar(threads, ratios, yerr=yerr, label=f'{label} ({size} executions)',
+                    color=COMPARISON_COLORS[idx % len(COMPARISON_COLORS)], marker='o', markersize=7,
+                    linewidth=2, capsize=5)
+        plotted = True
+    if not plotted:
+        plt.close(fig)
+        return None
+    ax.axhline(1.0, color='#888888', linestyle=':', linewidth=1)
+    ax.set_xlabel('Number of Threads', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Bad / Good Time Ratio', fontsize=12, fontweight='bold')
+    ax.set_title(f'False Sharing Penalty per {COMPARISONS[C.column][1]}\n'
+                 f'({mode_names.get(current_mode, f"Mode {current_mode}")})',
+                 fontsize=14, fontweight='bold')
+    ax.legend(fontsize=9)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def comparison_figure_specs(C):
+    kind = COMPARISONS[C.column][0]
+    return [(f'ratio_vs_threads_{kind}_mode{mode}', lambda m=mode: figure_ratio_comparison(C, m))
+            for mode in C.modes]
+
+
+# ============================================================================
+# Figure sets and single panels
+# ============================================================================
+
+# (file name, figure factory) for every figure of the selected plot families
+def figure_specs(S, kinds):
+    specs = []
+    if 'thread' in kinds:
+        for thread, modes in sorted(thread_modes(S).items()):
+            specs.append((f'plot_thread_{thread}', lambda t=thread, m=modes: figure_thread(S, t, m)))
+        for mode in time_plot_modes(S):
+            specs.append((f'time_vs_threads_mode{mode}', lambda m=mode: figure_time_vs_threads(S, m)))
+    if 'executions' in kinds:
+        for mode in time_plot_modes(S):
+            specs.append((f'time_vs_executions_mode{mode}', lambda m=mode: figure_time_vs_executions(S, m)))
+    if 'modes' in kinds:
+        specs.append(('time_vs_modes', lambda: figure_time_vs_modes(S)))
+    return specs
+
+
+PANEL_HELP = ('thread:T[:METRIC], threads:MODE, executions:MODE or modes[:T], '
+              'e.g. thread:4:time or modes:8')
+
+
+# Figure for one panel spec: a whole figure or a single subplot of it
+def figure_panel(S, spec):
+    plt = _pyplot()
+    parts = spec.split(':')
+    kind, args = parts[0], parts[1:]
+    try:
+        if kind == 'thread' and len(args) == 1:
+            thread = int(args[0])
+            return f'plot_thread_{thread}', figure_thread(S, thread, thread_modes(S)[thread])
+        if kind == 'thread' and len(args) == 2 and args[1] in metrics:
+            thread, metric = int(args[0]), args[1]
+            fig, ax = plt.subplots(figsize=(7, 5.5))
+            draw_thread_metric(ax, S, thread, thread_modes(S)[thread], metric)
+            fig.tight_layout()
+            return f'plot_thread_{thread}_{metric}', fig
+        if kind == 'threads' and len(args) == 1:
+            return f'time_vs_threads_mode{args[0]}', figure_time_vs_threads(S, int(args[0]))
+        if kind == 'executions' and len(args) == 1:
+            return f'time_vs_executions_mode{args[0]}', figure_time_vs_executions(S, int(args[0]))
+        if kind == 'modes' and not args:
+            return 'time_vs_modes', figure_time_vs_modes(S)
+        if kind == 'modes' and len(args) == 1:
+            C = ModeComparison(S)
+            thread_count = int(args[0])
+            if thread_count not in C.modes:
+                return None, None
+            fig, ax = plt.subplots(figsize=(6, 5))
+            draw_mode_comparison(ax, S, C, thread_count)
+            fig.tight_layout()
+            return f'time_vs_modes_{thread_count}', fig
+    except (ValueError, KeyError):
+        return None, None
+    raise ValueError(f'unknown panel {spec!r}, expected {PANEL_HELP}')
+
+
+# ============================================================================
+# Stats tables
+# ============================================================================
+
+STATS_HEADER = ['host', 'alloc', 'impl', 'threads', 'size', 'mode', 'metric',
+                'good_mean', 'good_lo', 'good_hi', 'good_n', 'bad_mean', 'bad_lo', 'bad_hi', 'bad_n',
+                'ratio', 'ratio_lo', 'ratio_hi', 'excluded']
+
+
+# One row per (host, alloc, impl, threads, size, mode, metric) with both variants and the bad/good ratio
+def stats_rows(table, metric_list, resamples, confidence, outliers):
+    runs = table.select(metric=metric_list).groups(('host', 'alloc', 'impl', 'threads', 'size', 'mode', 'metric', 'variant'))
+    summary = stats.summarize(runs, resamples, confidence, outliers)
+    bad = {key[:-1]: v for key, v in runs.items() if key[-1] == 'bad'}
+    good = {key[:-1]: v for key, v in runs.items() if key[-1] == 'good'}
+    ratio = stats.bootstrap_ratio(bad, good, resamples, confidence, outliers)
+    rows = []
+    for key in sorted({key[:-1] for key in runs}):
+        g = summary.get(key + ('good',))
+        b = summary.get(key + ('bad',))
+        r = ratio.get(key)
+        row = list(key)
+        for s in (g, b):
+            row += [s.mean, s.lo, s.hi, s.n] if s is not None else [np.nan, np.nan, np.nan, 0]
+        row += [r.ratio, r.lo, r.hi] if r is not None else [np.nan, np.nan, np.nan]
+        row.append(sum(s.excluded for s in (g, b) if s is not None))
+        rows.append(row)
+    return rows
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return 'nan' if not np.isfinite(value) else f'{value:.4g}'
+    return str(value)
+
+
+def print_stats(rows, fmt='text', out=sys.stdout):
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(STATS_HEADER)
+        writer.writerows([[_fmt(float(v)) if isinstance(v, np.floating) else v for v in row]
+                          for row in rows])
+        return
+    cells = [STATS_HEADER] + [[_fmt(float(v) if isinstance(v, np.floating) else v) for v in row]
+                              for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(STATS_HEADER))]
+    for row in cells:
+        print('  '.join(cell.rjust(w) for cell, w in zip(row, widths)), file=out)
+
+
+# ============================================================================
+# Command line
+# ============================================================================
+
+def _check_dirs(dirs):
+    for d in dirs:
+        if not os.path.isdir(d):
+            sys.exit(f"error: results directory {d} does not exist")
+
+
+def load_table(args):
+    if args.index:
+        if not os.path.isfile(args.index):
+            sys.exit(f"error: index {args.index} does not exist")
+        table = ingest.load_merged(args.index)
+    else:
+        _check_dirs(args.results_dir)
+        try:
+            table = ingest.load_many(args.results_dir, use_cache=not args.no_cache)
+        except ValueError as e:
+            sys.exit(f"error: {e}")
+    if args.host:
+        table = table.select(host=args.host)
+    if args.alloc:
+        table = table.select(alloc=args.alloc)
+    if args.impl:
+        table = table.select(impl=args.impl)
+    return derived.evaluate(table)
+
+
+def summaries(args, table, labels=None):
+    return Summaries(table, args.resamples, args.confidence, args.outliers, labels)
+
+
+# Topology used for a host's mode labels: --topology, then the host metadata,
+# then the topology.json of a single campaign directory
+def host_topology(args, table, host):
+    if args.topology:
+        return topology.load_optional(args.topology)
+    meta = table.hosts.get(host) or {}
+    if 'topology' in meta:
+        return topology.Topology.from_dict(meta['topology'])
+    if len(args.results_dir) == 1 and not args.index:
+        return topology.load_optional(os.path.join(args.results_dir[0], 'topology.json'))
+    return None
+
+
+# Folder name of a facet value: hosts by name, others as <column>_<value> (e.g. alloc_node1)
+def facet_dir(column, value):
+    return value if column == 'host' else f'{column}_{value}'
+
+
+# (labels, folder parts, sub-table) for every combination of the given facet
+# columns that has data. Only columns with several values get a folder level.
+def facets(table, columns):
+    values = [table.unique(column) for column in columns]
+    split = [i for i, v in enumerate(values) if len(v) > 1]
+    for combo in itertools.product(*values):
+        sub = table.select(**{columns[i]: combo[i] for i in split}) if split else table
+        if len(sub):
+            yield dict(zip(columns, combo)), [facet_dir(columns[i], combo[i]) for i in split], sub
+
+
+# (host, folder parts, Summaries) per host, allocation mode and implementation,
+# each with its host's mode labels
+def summary_facets(args, table):
+    for labels, parts, sub in facets(table, FACETS):
+        mode_labels = topology_labels(host_topology(args, table, labels['host']))
+        yield labels['host'], parts, summaries(args, sub, mode_labels)
+
+
+# (folder parts, Comparison) for the selected cross-host / allocation / implementation families,
+# one per value of the other facet columns
+def comparisons(args, table, kinds):
+    for column, (kind, _) in COMPARISONS.items():
+        if kind not in kinds:
+            continue
+        for labels, parts, sub in facets(table, [c for c in FACETS if c != column]):
+            if len(sub.unique(column)) > 1:
+                yield parts, Comparison(sub, column, args.resamples, args.confidence, args.outliers)
+
+
+def save_all(specs, out_dir, fmt='png', dpi=FIGURE_DPI):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, factory in specs:
+        fig = factory()
+        if fig is not None:
+            save_figure(fig, out_dir, name, fmt, dpi)
+
+
+def cmd_ingest(args):
+    dirs = args.dirs or args.results_dir
+    _check_dirs(dirs)
+    try:
+        table = ingest.load_many(dirs, use_cache=not args.no_cache)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    for host in table.unique('host'):
+        part = table.select(host=host)
+        print(f"{host}: {len(part)} values "
+              f"({len(part.unique('metric'))} metrics, {len(part.unique('threads'))} thread counts, "
+              f"alloc {', '.join(part.unique('alloc'))}, impl {', '.join(part.unique('impl'))})")
+    if args.merged:
+        ingest.save(table, args.merged)
+        print(f"Merged index of {len(dirs)} campaign(s) written to {args.merged}")
+
+
+def cmd_stats(args):
+    table = load_table(args)
+    rows = stats_rows(table, args.metric or ['time'], args.resamples, args.confidence, args.outliers)
+    print_stats(rows, args.format)
+
+
+def cmd_plot(args):
+    table = load_table(args)
+    kinds = args.only or PLOT_KINDS
+    dpi = DRAFT_DPI if args.draft else args.dpi
+    for host, parts, S in summary_facets(args, table):
+        S.print_exclusions()
+        save_all(figure_specs(S, kinds), os.path.join(args.plots_dir, *parts), args.format, dpi)
+    for parts, C in comparisons(args, table, kinds):
+        save_all(comparison_figure_specs(C), os.path.join(args.plots_dir, *parts), args.format, dpi)
+    print("Plots generated successfully!")
+
+
+# Publication-quality rasters for the selected panels only
+def cmd_publish(args):
+    table = load_table(args)
+    for column in FACETS:
+        values = table.unique(column)
+        if len(values) > 1:
+            sys.exit(f"error: results of several {column} values ({', '.join(values)}), "
+                     f"choose one with --{column}")
+    hosts = table.unique('host')
+    S = summaries(args, table, topology_labels(host_topology(args, table, hosts[0]) if hosts else None))
+    os.makedirs(args.plots_dir, exist_ok=True)
+    for spec in args.panels:
+        try:
+            name, fig = figure_panel(S, spec)
+        except ValueError as e:
+            sys.exit(f"error: {e}")
+        if fig is None:
+            print(f"No data for panel '{spec}'", file=sys.stderr)
+            continue
+        print(save_figure(fig, args.plots_dir, name, args.format, args.dpi))
+
+
+HOST_FIELDS = ['host', 'cpu_model', 'cpus', 'l3_domains', 'numa_nodes', 'kernel', 'governor', 'microcode', 'captured']
+
+
+# Single HTML page with every chart as inline SVG and sortable ratio tables
+def cmd_report(args):
+    import report
+    table = load_table(args)
+    plt = _pyplot()
+    kinds = args.only or PLOT_KINDS
+
+    def fmt(value):
+        return _fmt(float(value) if isinstance(value, np.floating) else value)
+
+    # Flag configurations whose whole ratio CI lies above 1 (bad is reliably slower)
+    def highlight(name, value):
+        return name == 'ratio_lo' and np.isfinite(value) and value > 1
+
+    hosts = table.unique('host')
+    host_rows = [[host] + [(table.hosts.get(host) or {}).get(f, '') for f in HOST_FIELDS[1:]] for host in hosts]
+    tables = [('Hosts', report.table_html(HOST_FIELDS, host_rows, fmt))]
+    for title, metric_list in (('Time ratios', ['time']), ('All metrics', metrics)):
+        rows = stats_rows(table, metric_list, args.resamples, args.confidence, args.outliers)
+        tables.append((title, report.table_html(STATS_HEADER, rows, fmt, highlight)))
+
+    def title(parts, name):
+        return ''.join(f'{part} / ' for part in parts) + name.replace('_', ' ')
+
+    figures = []
+    for parts, C in comparisons(args, table, kinds):
+        figures += [(title(parts, name), factory) for name, factory in comparison_figure_specs(C)]
+    for host, parts, S in summary_facets(args, table):
+        S.print_exclusions()
+        figures += [(title(parts, name), factory) for name, factory in figure_specs(S, kinds)]
+
+    sources = [args.index] if args.index else args.results_dir
+    meta = [('Results', ', '.join(sources)),
+            ('Hosts', ', '.join(hosts)),
+            ('Allocation modes', ', '.join(table.unique('alloc'))),
+            ('Implementations', ', '.join(table.unique('impl'))),
+            ('Bootstrap', f'{args.resamples} resamples, {args.confidence:.0%} CI'),
+            ('Outlier filter', 'off' if args.outliers is None else f'MAD z > {args.outliers}')]
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    report.write_report(args.output, 'False sharing results', meta, tables, figures, close=plt.close)
+    print(f"Report written to {args.output}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Analyse and plot the false sharing results.')
+    parser.add_argument('--results-dir', action='append', metavar='DIR',
+                        help=f'raw results folder of a campaign (repeatable, default: {results_dir})')
+    parser.add_argument('--index', metavar='NPZ', help='merged index written by `ingest --merged`')
+    parser.add_argument('--host', action='append', help='only use these hosts (repeatable)')
+    parser.add_argument('--alloc', action='append',
+                        help='only use these counter allocation modes, e.g. main or node1 (repeatable)')
+    parser.add_argument('--impl', action='append',
+                        help='only use the C++ binaries (cpp) or shm_bench.py results (python, or '
+                             'python-stride<B>-<G> with other strides) (repeatable)')
+    parser.add_argument('--no-cache', action='store_true', help='ignore and do not write the cached index')
+    parser.add_argument('--resamples', type=int, default=BOOTSTRAP_RESAMPLES, help='bootstrap resamples')
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE_LEVEL, help='confidence level of the CIs')
+    parser.add_argument('--outliers', type=float, default=OUTLIER_MAD_THRESHOLD, metavar='Z',
+                        help='drop runs whose MAD z-score exceeds Z (default: keep all runs)')
+    parser.add_argument('--topology', metavar='JSON',
+                        help='host topology for mode labels (default: from host.json or topology.json)')
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('ingest', help='parse the raw results of one or more campaigns into cached indexes')
+    p.add_argument('dirs', nargs='*', metavar='DIR', help='campaign folders (default: --results-dir)')
+    p.add_argument('--merged', metavar='NPZ', help='also write one merged index of every campaign')
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser('stats', help='print bad/good ratios without rendering anything')
+    p.add_argument('--format', choices=['text', 'csv'], default='text')
+    p.add_argument('--metric', action='append', choices=list(derived.BY_NAME),
+                   help='metric to summarize (repeatable, default: time)')
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('plot', help='render figures (one subfolder per host / allocation mode / implementation when there are several)')
+    p.add_argument('--only', action='append', choices=PLOT_KINDS,
+                   help='plot family to render (repeatable, default: all)')
+    p.add_argument('--plots-dir', default=plots_dir)
+    p.add_argument('--format', choices=['png', 'svg'], default='png')
+    p.add_argument('--dpi', type=int, default=FIGURE_DPI)
+    p.add_argument('--draft', action='store_true', help=f'fast preview at {DRAFT_DPI} dpi')
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser('publish', help=f'render selected panels at publication quality ({PUBLISH_DPI} dpi)')
+    p.add_argument('panels', nargs='+', metavar='PANEL', help=PANEL_HELP)
+    p.add_argument('--plots-dir', default=os.path.join(plots_dir, 'publish'))
+    p.add_argument('--format', choices=['png', 'svg', 'pdf'], default='png')
+    p.add_argument('--dpi', type=int, default=PUBLISH_DPI)
+    p.set_defaults(func=cmd_publish)
+
+    p = sub.add_parser('report', help='single HTML page with every chart and the ratio tables')
+    p.add_argument('--only', action='append', choices=PLOT_KINDS,
+                   help='plot family to include (repeatable, default: all)')
+    p.add_argument('--output', default='results/report.html')
+    p.set_defaults(func=cmd_report)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # Plain `python plot.py` keeps rendering everything
+        args = parser.parse_args(argv + ['plot'])
+    args.results_dir = args.results_dir or [results_dir]
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
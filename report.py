@@ -0,0 +1,103 @@
+import io
+import re
+import html
+import datetime
+
+# Self-contained HTML report: inline SVG charts and sortable tables, no external assets
+
+CSS = """
+body { font-family: sans-serif; margin: 2em auto; max-width: 1400px; color: #222; }
+h1 { border-bottom: 2px solid #21674f; padding-bottom: .3em; }
+h2 { margin-top: 2em; color: #21674f; }
+dl { display: grid; grid-template-columns: max-content auto; gap: .2em 1em; }
+dt { font-weight: bold; }
+table { border-collapse: collapse; font-size: 13px; margin: 1em 0; }
+th, td { border: 1px solid #ccc; padding: 3px 8px; text-align: right; }
+th { background: #eef5f1; cursor: pointer; user-select: none; position: sticky; top: 0; }
+th.asc::after { content: " \\25B2"; } th.desc::after { content: " \\25BC"; }
+tr:nth-child(even) td { background: #fafafa; }
+td.bad { color: #CC6666; font-weight: bold; }
+figure { margin: 1.5em 0; } figure svg { max-width: 100%; height: auto; }
+figcaption { font-size: 12px; color: #666; }
+nav a { margin-right: 1em; }
+"""
+
+# Click a header to sort by that column (numeric when every cell parses as a number)
+SORT_JS = """
+document.querySelectorAll('table.sortable').forEach(function (table) {
+  table.querySelectorAll('th').forEach(function (th, col) {
+    th.addEventListener('click', function () {
+      var body = table.tBodies[0], rows = Array.from(body.rows);
+      var asc = !th.classList.contains('asc');
+      table.querySelectorAll('th').forEach(function (h) { h.classList.remove('asc', 'desc'); });
+      th.classList.add(asc ? 'asc' : 'desc');
+      var num = rows.every(function (r) { var t = r.cells[col].textContent; return t === 'nan' || !isNaN(parseFloat(t)); });
+      rows.sort(function (a, b) {
+        var x = a.cells[col].textContent, y = b.cells[col].textContent;
+        if (num) { x = parseFloat(x); y = parseFloat(y); x = isNaN(x) ? -Infinity : x; y = isNaN(y) ? -Infinity : y; }
+        return (x < y ? -1 : x > y ? 1 : 0) * (asc ? 1 : -1);
+      });
+      rows.forEach(function (r) { body.appendChild(r); });
+    });
+  });
+});
+"""
+
+
+# SVG markup of a matplotlib figure, without the XML prologue so it can be inlined
+def figure_svg(fig):
+    buf = io.StringIO()
+    fig.savefig(buf, format='svg', bbox_inches='tight')
+    svg = buf.getvalue()
+    return svg[svg.find('<svg'):]
+
+
+def _anchor(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def table_html(header, rows, fmt=str, highlight=None):
+    out = ['<table class="sortable"><thead><tr>']
+    out += [f'<th>{html.escape(h)}</th>' for h in header]
+    out.append('</tr></thead><tbody>')
+    for row in rows:
+        out.append('<tr>')
+        for name, value in zip(header, row):
+            cls = ' class="bad"' if highlight and highlight(name, value) else ''
+            out.append(f'<td{cls}>{html.escape(fmt(value))}</td>')
+        out.append('</tr>')
+    out.append('</tbody></table>')
+    return ''.join(out)
+
+
+# Write the report. meta is a list of (label, value); tables a list of
+# (title, html); figures an iterable of (title, factory) where factory returns a
+# matplotlib figure or None. Figures are rendered and closed one at a time.
+def write_report(path, title, meta, tables, figures, close=None):
+    sections = []
+    for table_title, body in tables:
+        sections.append((table_title, body))
+    for fig_title, factory in figures:
+        fig = factory()
+        if fig is None:
+            continue
+        body = f'<figure>{figure_svg(fig)}<figcaption>{html.escape(fig_title)}</figcaption></figure>'
+        if close is not None:
+            close(fig)
+        sections.append((fig_title, body))
+
+    generated = datetime.datetime.now().strftime('%Y-%m-%d %H:%M')
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8">',
+             f'<title>{html.escape(title)}</title><style>{CSS}</style></head><body>',
+             f'<h1>{html.escape(title)}</h1><dl>']
+    for label, value in list(meta) + [('Generated', generated)]:
+        parts.append(f'<dt>{html.escape(str(label))}</dt><dd>{html.escape(str(value))}</dd>')
+    parts.append('</dl><nav>')
+    parts += [f'<a href="#{_anchor(t)}">{html.escape(t)}</a>' for t, _ in sections]
+    parts.append('</nav>')
+    for section_title, body in sections:
+        parts.append(f'<h2 id="{_anchor(section_title)}">{html.escape(section_title)}</h2>{body}')
+    parts.append(f'<script>{SORT_JS}</script></body></html>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
+    return path
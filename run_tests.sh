@@ -9,14 +9,26 @@ PERF_PATH=/usr/lib/linux-tools/6.14.0-33-generic/perf
 RESULTS_DIR="./results/raw/"
 REPEATS=10
 RUNS=$((REPEATS+1))
-METRICS_ENERGY="power/energy-pkg/"
-METRICS_CACHE="ls_any_fills_from_sys.remote_cache,ls_dmnd_fills_from_sys.remote_cache,ls_bad_status2.stli_other,cache-misses"
-METRICS_L1="ls_dmnd_fills_from_sys.all,ls_dmnd_fills_from_sys.local_l2"
-METRICS_L2="l2_cache_req_stat.all,l2_cache_req_stat.ic_dc_hit_in_l2,l2_cache_req_stat.ic_dc_miss_in_l2"
-METRICS_L3="ls_dmnd_fills_from_sys.local_ccx,ls_dmnd_fills_from_sys.dram_io_all"
+# perf event groups are planned by perfplan.py from `perf list` on this host and its CPU's
+# counter limit, one execution per group. PERF_LIST plans from a list saved with
+# `perfplan.py save` instead (e.g. PERF_LIST="./perf_list.output"; its vendor is read from
+# perf_list.json). PLAN_ARGS narrows or overrides the plan,
+# e.g. PLAN_ARGS="--metrics time energy l2_miss_rate ipc" or "--counters 5".
+PERF_LIST=""
+PLAN_ARGS=""
 
 NUM_THREADS=(1 2 3 4 5 6 7 8 9 10)
 NUM_EXECUTIONS=(125000000 250000000 500000000 1000000000)
+# Counter allocation modes (see src/counter_storage.h): main, touch<W>, node<N>, interleave,
+# thp, hugetlb, perthread. Files of modes other than "main" get an _alloc<mode> suffix.
+# The counters fit in one page, so interleave puts them all on one node, like node<N>.
+ALLOC_MODES=(main)
+# Total increments per run of shm_bench.py (the Python loop is ~100x slower than the C++ one)
+PYTHON_EXECUTIONS=(1000000 2000000 5000000)
+# Shared counter designs of src/shared_counter.cpp (batched<B> flushes every B increments),
+# and the total increments per run of that suite
+COUNTER_IMPLS=(atomic sharded ccd batched64)
+COUNTER_EXECUTIONS=(100000000)
 TARGET_GOOD="./bin/good.exe"
 TARGET_BAD="./bin/bad.exe"
 
@@ -37,6 +49,33 @@ owner_group="$(id -gn "$owner_user" 2>/dev/null || echo "$owner_user")"
 sudo chown -R "$owner_user:$owner_group" "$RESULTS_DIR" 2>/dev/null || \
 chown -R "$owner_user:$owner_group" "$RESULTS_DIR" 2>/dev/null || true
 
+# Record the host topology next to the results (also refreshes thread_core_ccd_mapping.txt)
+printf "Reading CPU topology...\n"
+python3 ./topology.py generate --json "${RESULTS_DIR}/topology.json" || printf "Could not read the topology, using the CPU tables in src/*.cpp.\n"
+# Host metadata (CPU model, kernel, governor, microcode) so campaigns of several hosts can be merged
+# HOST_NAME overrides the key used for this host, e.g. HOST_NAME=epyc-9554 ./run_tests.sh
+python3 ./hostinfo.py "$RESULTS_DIR" ${HOST_NAME:+--name "$HOST_NAME"} || printf "Could not record the host metadata.\n"
+printf "\n"
+
+# Event groups that fit the core counters, as "name events" lines
+printf "Planning perf event groups...\n"
+PLAN_SOURCE=(--live)
+if [ -n "$PERF_LIST" ]; then
+    PLAN_SOURCE=(--perf-list "$PERF_LIST")
+fi
+python3 ./perfplan.py plan "${PLAN_SOURCE[@]}" --perf "$PERF_PATH" $PLAN_ARGS --shell "${RESULTS_DIR}/perf_groups.txt" || \
+    { echo "Could not plan the perf event groups."; exit 1; }
+mapfile -t PERF_GROUPS < "${RESULTS_DIR}/perf_groups.txt"
+# Runs where an event was multiplexed (scaled) or not counted
+MUX_LOG="${RESULTS_DIR}/multiplexing.log"
+> "$MUX_LOG"
+printf "\n"
+
+# Result file of the current configuration: result_file <kind> <variant>
+result_file() {
+    echo "${RESULTS_DIR}/${1}_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}${ALLOC_TAG}_${2}.txt"
+}
+
 # Configure perf_event_paranoid for perf access
 printf "Configuring perf permissions...\n"
 echo -1 | sudo tee /proc/sys/kernel/perf_event_paranoid > /dev/null
@@ -59,178 +98,101 @@ for THREADS in "${NUM_THREADS[@]}"; do
     for MODE in "${MODES[@]}"; do
             printf "Running tests with %d threads, mode %d...\n" "$THREADS" "$MODE"
 
-            # Output files
-            energy_bad_file="${RESULTS_DIR}/energy_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_bad.txt"
-            perf_cache_bad_file="${RESULTS_DIR}/perf_cache_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_bad.txt"
-            perf_l1_bad_file="${RESULTS_DIR}/perf_l1_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_bad.txt"
-            perf_l2_bad_file="${RESULTS_DIR}/perf_l2_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_bad.txt"
-            perf_l3_bad_file="${RESULTS_DIR}/perf_l3_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_bad.txt"
-            time_bad_file="${RESULTS_DIR}/time_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_bad.txt"
-            energy_good_file="${RESULTS_DIR}/energy_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_good.txt"
-            perf_cache_good_file="${RESULTS_DIR}/perf_cache_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_good.txt"
-            perf_l1_good_file="${RESULTS_DIR}/perf_l1_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_good.txt"
-            perf_l2_good_file="${RESULTS_DIR}/perf_l2_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_good.txt"
-            perf_l3_good_file="${RESULTS_DIR}/perf_l3_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_good.txt"
-            time_good_file="${RESULTS_DIR}/time_${THREADS}_${NUM_EXECUTIONS}_mode${MODE}_good.txt"
-
-            # Check if tests are already completed
-            if [ -f "$time_bad_file" ] && [ "$(wc -l < "$time_bad_file")" -ge "$RUNS" ] && \
-               [ -f "$time_good_file" ] && [ "$(wc -l < "$time_good_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_cache_bad_file" ] && [ "$(wc -l < "$perf_cache_bad_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_cache_good_file" ] && [ "$(wc -l < "$perf_cache_good_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_l1_bad_file" ] && [ "$(wc -l < "$perf_l1_bad_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_l1_good_file" ] && [ "$(wc -l < "$perf_l1_good_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_l2_bad_file" ] && [ "$(wc -l < "$perf_l2_bad_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_l2_good_file" ] && [ "$(wc -l < "$perf_l2_good_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_l3_bad_file" ] && [ "$(wc -l < "$perf_l3_bad_file")" -ge "$RUNS" ] && \
-               [ -f "$perf_l3_good_file" ] && [ "$(wc -l < "$perf_l3_good_file")" -ge "$RUNS" ]; then
-                printf "Tests already completed for %d threads, mode %d, %d executions. Skipping...\n" "$THREADS" "$MODE" "$NUM_EXECUTIONS"
+            # CPU placement from the host topology (falls back to the tables in src/*.cpp)
+            unset BENCH_CPUS
+            if [ "$MODE" -ne 0 ] && [ -f "${RESULTS_DIR}/topology.json" ] && \
+               mode_cpus=$(python3 ./topology.py cpus "$MODE" "$THREADS" --from-json "${RESULTS_DIR}/topology.json" 2>/dev/null); then
+                export BENCH_CPUS="$mode_cpus"
+                printf "  CPUs: %s\n" "$BENCH_CPUS"
+            fi
+
+    for ALLOC in "${ALLOC_MODES[@]}"; do
+            # touch<W> needs a worker W (src/counter_storage.h)
+            if [[ "$ALLOC" =~ ^touch([0-9]+)$ ]] && [ "${BASH_REMATCH[1]}" -ge "$THREADS" ]; then
+                printf "  Skipping allocation %s: the touch worker must be below the thread count\n" "$ALLOC"
                 continue
             fi
+            ALLOC_TAG=""
+            if [ "$ALLOC" != "main" ]; then
+                ALLOC_TAG="_alloc${ALLOC}"
+                printf "  Allocation: %s\n" "$ALLOC"
+            fi
 
-            # Initialize files
-            > "$energy_bad_file"
-            echo "ls_any_fills_from_sys.remote_cache,ls_dmnd_fills_from_sys.remote_cache,ls_bad_status2.stli_other,cache-misses" > "$perf_cache_bad_file"
-            echo "ls_dmnd_fills_from_sys.all,ls_dmnd_fills_from_sys.local_l2" > "$perf_l1_bad_file"
-            echo "l2_cache_req_stat.all,l2_cache_req_stat.ic_dc_hit_in_l2,l2_cache_req_stat.ic_dc_miss_in_l2" > "$perf_l2_bad_file"
-            echo "ls_dmnd_fills_from_sys.local_ccx,ls_dmnd_fills_from_sys.dram_io_all" > "$perf_l3_bad_file"
-            > "$time_bad_file"
-            > "$energy_good_file"
-            echo "ls_any_fills_from_sys.remote_cache,ls_dmnd_fills_from_sys.remote_cache,ls_bad_status2.stli_other,cache-misses" > "$perf_cache_good_file"
-            echo "ls_dmnd_fills_from_sys.all,ls_dmnd_fills_from_sys.local_l2" > "$perf_l1_good_file"
-            echo "l2_cache_req_stat.all,l2_cache_req_stat.ic_dc_hit_in_l2,l2_cache_req_stat.ic_dc_miss_in_l2" > "$perf_l2_good_file"
-            echo "ls_dmnd_fills_from_sys.local_ccx,ls_dmnd_fills_from_sys.dram_io_all" > "$perf_l3_good_file"
-            > "$time_good_file"
-
-            printf "  Running bad coherency test...\n"
-            
-            for ((r=1; r<=RUNS; r++)); do
-                # Run energy measurement
-                energy_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_ENERGY -- $TARGET_BAD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run cache measurement
-                cache_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_CACHE -- $TARGET_BAD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run L1 cache measurement
-                l1_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_L1 -- $TARGET_BAD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run L2 cache measurement
-                l2_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_L2 -- $TARGET_BAD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run L3 cache measurement
-                l3_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_L3 -- $TARGET_BAD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Extract energy from perf stderr
-                energy_val=$(echo "$energy_output" | awk '/power\/energy-pkg/ {gsub(",", "", $1); print $1; exit}' || echo "NaN")
-                echo "$energy_val" >> "$energy_bad_file"
-                
-                # Extract time from stdout (from energy_output since it contains the program output)
-                time_val=$(echo "$energy_output" | grep "Time for bad coherency" | sed 's/.*: \([0-9.]*\) ms/\1/' || echo "NaN")
-                echo "$time_val" >> "$time_bad_file"
-                
-                # Extract perf cache metrics
-                cache_vals=$(echo "$cache_output" | awk '
-                    /ls_any_fills_from_sys\.remote_cache/ {gsub(",", "", $1); remote=$1}
-                    /ls_dmnd_fills_from_sys\.remote_cache/ {gsub(",", "", $1); dmnd=$1}
-                    /ls_bad_status2\.stli_other/ {gsub(",", "", $1); stli=$1}
-                    /cache-misses/ {gsub(",", "", $1); misses=$1}
-                    END {print remote "," dmnd "," stli "," misses}
-                ' || echo "NaN,NaN,NaN,NaN")
-                echo "$cache_vals" >> "$perf_cache_bad_file"
-                
-                # Extract L1 cache metrics
-                l1_vals=$(echo "$l1_output" | awk '
-                    /ls_dmnd_fills_from_sys\.all/ {gsub(",", "", $1); l1_fills=$1}
-                    /ls_dmnd_fills_from_sys\.local_l2/ {gsub(",", "", $1); l1_l2_hits=$1}
-                    END {print l1_fills "," l1_l2_hits}
-                ' || echo "NaN,NaN")
-                echo "$l1_vals" >> "$perf_l1_bad_file"
-                
-                # Extract L2 cache metrics
-                l2_vals=$(echo "$l2_output" | awk '
-                    /l2_cache_req_stat\.all/ {gsub(",", "", $1); l2_all=$1}
-                    /l2_cache_req_stat\.ic_dc_hit_in_l2/ {gsub(",", "", $1); l2_hits=$1}
-                    /l2_cache_req_stat\.ic_dc_miss_in_l2/ {gsub(",", "", $1); l2_miss=$1}
-                    END {print l2_all "," l2_hits "," l2_miss}
-                ' || echo "NaN,NaN,NaN")
-                echo "$l2_vals" >> "$perf_l2_bad_file"
-                
-                # Extract L3 cache metrics
-                l3_vals=$(echo "$l3_output" | awk '
-                    /ls_dmnd_fills_from_sys\.local_ccx/ {gsub(",", "", $1); l3_access=$1}
-                    /ls_dmnd_fills_from_sys\.dram_io_all/ {gsub(",", "", $1); l3_miss=$1}
-                    END {print l3_access "," l3_miss}
-                ' || echo "NaN,NaN")
-                echo "$l3_vals" >> "$perf_l3_bad_file"
+            # Check if tests are already completed (perf files have a header line)
+            complete=1
+            for VARIANT in bad good; do
+                time_file=$(result_file time "$VARIANT")
+                [ -f "$time_file" ] && [ "$(wc -l < "$time_file")" -ge "$RUNS" ] || complete=0
+                for group in "${PERF_GROUPS[@]}"; do
+                    perf_file=$(result_file "perf_${group%% *}" "$VARIANT")
+                    [ -f "$perf_file" ] && [ "$(wc -l < "$perf_file")" -gt "$RUNS" ] || complete=0
+                done
             done
+            if [ "$complete" -eq 1 ]; then
+                printf "Tests already completed for %d threads, mode %d, alloc %s, %d executions. Skipping...\n" "$THREADS" "$MODE" "$ALLOC" "$NUM_EXECUTIONS"
+                continue
+            fi
 
-            printf "  Running good coherency test...\n"
-            
-            for ((r=1; r<=RUNS; r++)); do
-                # Run energy measurement
-                energy_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_ENERGY -- $TARGET_GOOD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run cache measurement
-                cache_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_CACHE -- $TARGET_GOOD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run L1 cache measurement
-                l1_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_L1 -- $TARGET_GOOD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run L2 cache measurement
-                l2_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_L2 -- $TARGET_GOOD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Run L3 cache measurement
-                l3_output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -e $METRICS_L3 -- $TARGET_GOOD $THREADS $NUM_EXECUTIONS $MODE 2>&1) || true
-                
-                # Extract energy from perf stderr
-                energy_val=$(echo "$energy_output" | awk '/power\/energy-pkg/ {gsub(",", "", $1); print $1; exit}' || echo "NaN")
-                echo "$energy_val" >> "$energy_good_file"
-                
-                # Extract time from stdout (from energy_output)
-                time_val=$(echo "$energy_output" | grep "Time for good coherency" | sed 's/.*: \([0-9.]*\) ms/\1/' || echo "NaN")
-                echo "$time_val" >> "$time_good_file"
-                
-                # Extract perf cache metrics
-                cache_vals=$(echo "$cache_output" | awk '
-                    /ls_any_fills_from_sys\.remote_cache/ {gsub(",", "", $1); remote=$1}
-                    /ls_dmnd_fills_from_sys\.remote_cache/ {gsub(",", "", $1); dmnd=$1}
-                    /ls_bad_status2\.stli_other/ {gsub(",", "", $1); stli=$1}
-                    /cache-misses/ {gsub(",", "", $1); misses=$1}
-                    END {print remote "," dmnd "," stli "," misses}
-                ' || echo "NaN,NaN,NaN,NaN")
-                echo "$cache_vals" >> "$perf_cache_good_file"
-                
-                # Extract L1 cache metrics
-                l1_vals=$(echo "$l1_output" | awk '
-                    /ls_dmnd_fills_from_sys\.all/ {gsub(",", "", $1); l1_fills=$1}
-                    /ls_dmnd_fills_from_sys\.local_l2/ {gsub(",", "", $1); l1_l2_hits=$1}
-                    END {print l1_fills "," l1_l2_hits}
-                ' || echo "NaN,NaN")
-                echo "$l1_vals" >> "$perf_l1_good_file"
-                
-                # Extract L2 cache metrics
-                l2_vals=$(echo "$l2_output" | awk '
-                    /l2_cache_req_stat\.all/ {gsub(",", "", $1); l2_all=$1}
-                    /l2_cache_req_stat\.ic_dc_hit_in_l2/ {gsub(",", "", $1); l2_hits=$1}
-                    /l2_cache_req_stat\.ic_dc_miss_in_l2/ {gsub(",", "", $1); l2_miss=$1}
-                    END {print l2_all "," l2_hits "," l2_miss}
-                ' || echo "NaN,NaN,NaN")
-                echo "$l2_vals" >> "$perf_l2_good_file"
-                
-                # Extract L3 cache metrics
-                l3_vals=$(echo "$l3_output" | awk '
-                    /ls_dmnd_fills_from_sys\.local_ccx/ {gsub(",", "", $1); l3_access=$1}
-                    /ls_dmnd_fills_from_sys\.dram_io_all/ {gsub(",", "", $1); l3_miss=$1}
-                    END {print l3_access "," l3_miss}
-                ' || echo "NaN,NaN")
-                echo "$l3_vals" >> "$perf_l3_good_file"
+            for VARIANT in bad good; do
+                printf "  Running %s coherency test...\n" "$VARIANT"
+                if [ "$VARIANT" = "bad" ]; then
+                    target=$TARGET_BAD
+                else
+                    target=$TARGET_GOOD
+                fi
+
+                # Initialize files: the header of a perf file is its event list
+                time_file=$(result_file time "$VARIANT")
+                > "$time_file"
+                for group in "${PERF_GROUPS[@]}"; do
+                    echo "${group#* }" > "$(result_file "perf_${group%% *}" "$VARIANT")"
+                done
+
+                for ((r=1; r<=RUNS; r++)); do
+                    # One execution per planned group
+                    for g in "${!PERF_GROUPS[@]}"; do
+                        group_name="${PERF_GROUPS[$g]%% *}"
+                        group_events="${PERF_GROUPS[$g]#* }"
+                        perf_file=$(result_file "perf_${group_name}" "$VARIANT")
+                        output=$(LD_LIBRARY_PATH=$LD_LIBRARY_PATH:/home/nathan/Documents/TRAB2-ARQ-AVAN/papi/install/lib $PERF_PATH stat -x, -e "$group_events" -- $target $THREADS $NUM_EXECUTIONS $MODE $ALLOC 2>&1) || true
+
+                        # Extract time from stdout (first group's execution)
+                        if [ "$g" -eq 0 ]; then
+                            time_val=$(echo "$output" | grep "Time for $VARIANT coherency" | sed 's/.*: \([0-9.]*\) ms/\1/' || echo "NaN")
+                            # A failed run is kept as NaN so line r stays run r in every file
+                            echo "${time_val:-NaN}" >> "$time_file"
+                        fi
+
+                        # Counter values in header order; scaled or uncounted events are logged
+                        echo "$output" | python3 ./perfplan.py parse "$group_events" --label "$(basename "$perf_file") run $r" \
+                            --log "$MUX_LOG" >> "$perf_file"
+                    done
+                done
             done
 
-            printf "Completed tests with %d threads, mode %d and %d executions.\n\n" "$THREADS" "$MODE" "$NUM_EXECUTIONS"
+            printf "Completed tests with %d threads, mode %d, alloc %s and %d executions.\n\n" "$THREADS" "$MODE" "$ALLOC" "$NUM_EXECUTIONS"
+    done
         done
     done
 done
 
+# Same grid with the Python shared_memory benchmark (time only, far fewer operations per run)
+printf "Running the Python shared_memory benchmark...\n"
+python3 ./shm_bench.py campaign "$RESULTS_DIR" --threads "${NUM_THREADS[@]}" --sizes "${PYTHON_EXECUTIONS[@]}" \
+    --alloc "${ALLOC_MODES[@]}" --runs "$RUNS" || printf "Python benchmark failed.\n"
+printf "\n"
+
+# One logical counter shared by every thread: write throughput and read cost per design
+printf "Running the shared counter suite...\n"
+python3 ./counter_suite.py campaign "$RESULTS_DIR" --impls "${COUNTER_IMPLS[@]}" --threads "${NUM_THREADS[@]}" \
+    --sizes "${COUNTER_EXECUTIONS[@]}" --runs "$RUNS" || \
+    printf "Shared counter suite failed.\n"
+printf "\n"
+
+if [ -s "$MUX_LOG" ]; then
+    printf "Warning: %d events were multiplexed or not counted, see %s\n\n" "$(wc -l < "$MUX_LOG")" "$MUX_LOG"
+fi
+
 # Restore perf_event_paranoid to original value
 printf "Restoring perf_event_paranoid to 4...\n"
 echo 4 | sudo tee /proc/sys/kernel/perf_event_paranoid > /dev/null
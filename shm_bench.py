@@ -0,0 +1,251 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import topology
+
+# Python counterpart of src/{bad,good}_coherency.cpp: pinned worker processes
+# increment int64 counters in a multiprocessing.shared_memory buffer, like
+# services sharing stats through NumPy arrays. The counter stride decides
+# whether neighbouring workers share a cache line.
+
+# Byte distance between the counters of consecutive workers, per variant:
+# packed like UnalignedCounter, or one cache line each like alignas(64) AlignedCounter
+STRIDES = {'bad': 8, 'good': 64}
+
+# Allocation modes of src/counter_storage.h that shared memory can reproduce.
+# mbind, interleave and huge pages need calls the standard library does not expose.
+ALLOC_KINDS = ('main', 'touch', 'perthread')
+
+# Implementation tag of the result files (see ingest.NAME_PARTS)
+IMPL = 'python'
+
+
+# Tag of a campaign's files: IMPL with the default strides, else the strides
+# are part of it (e.g. python-stride16-128) so campaigns are never pooled
+def impl_tag(strides):
+    if strides == STRIDES:
+        return IMPL
+    return f"{IMPL}-stride{strides['bad']}-{strides['good']}"
+
+
+def check_stride(stride):
+    if stride <= 0 or stride % 8:
+        raise ValueError('the stride must be a positive multiple of 8 bytes')
+
+
+def parse_alloc(alloc):
+    kind = alloc.rstrip('0123456789')
+    arg = alloc[len(kind):]
+    if kind not in ALLOC_KINDS or (kind == 'touch') != bool(arg):
+        raise ValueError(f"allocation mode '{alloc}' is not supported by the Python benchmark "
+                         f"(use {', '.join(ALLOC_KINDS[:2])}<W> or {ALLOC_KINDS[2]})")
+    return kind, int(arg) if arg else None
+
+
+def _pin(cpu):
+    os.sched_setaffinity(0, {cpu})
+
+
+# Strided int64 view with one counter per worker
+def counter_view(buf, num_threads, stride):
+    return np.ndarray((num_threads,), dtype=np.int64, buffer=buf, strides=(stride,))
+
+
+# Mirrors worker_func: pin, then increment one counter `iterations` times.
+# Loop start/end are reported so process start-up is not part of the time.
+def worker_func(wid, cpu, shm_name, index, slots, stride, iterations, touch, ready, go, times):
+    _pin(cpu)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        counters = counter_view(shm.buf, slots, stride)
+        if touch:
+            # First touch of the pages happens on this worker's CPU (and NUMA node)
+            counters[:] = 0
+        ready.release()
+        go.wait()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            counters[index] += 1
+        times[wid] = (start, time.perf_counter())
+        del counters
+    finally:
+        shm.close()
+
+
+class _Pairs:
+    """(start, end) view over a shared double array, picklable into forked workers."""
+
+    def __init__(self, array):
+        self.array = array
+
+    def __getitem__(self, i):
+        return self.array[2 * i], self.array[2 * i + 1]
+
+    def __setitem__(self, i, value):
+        self.array[2 * i], self.array[2 * i + 1] = value
+
+
+# Wait until every worker is pinned and attached, failing fast if one died
+def _wait_ready(procs, ready):
+    for _ in procs:
+        while not ready.acquire(timeout=0.1):
+            if any(p.exitcode is not None for p in procs):
+                for p in procs:
+                    p.terminate()
+                    p.join()
+                raise RuntimeError('a worker process failed before the start')
+
+
+# One run, returns the time in ms from the first worker start to the last worker end
+def run_test(num_threads, total_operations, cpus, stride, alloc='main'):
+    kind, touch_worker = parse_alloc(alloc)
+    if touch_worker is not None and touch_worker >= num_threads:
+        raise ValueError('touch worker must be below the thread count')
+    iterations = total_operations // num_threads
+    # perthread: one block per worker instead of one shared block
+    blocks = num_threads if kind == 'perthread' else 1
+    slots = 1 if kind == 'perthread' else num_threads
+    size = max(stride * slots, 8)
+    shms = [shared_memory.SharedMemory(create=True, size=size) for _ in range(blocks)]
+    ctx = mp.get_context('fork')
+    ready = ctx.Semaphore(0)
+    go = ctx.Event()
+    times = _Pairs(ctx.Array('d', 2 * num_threads, lock=False))
+    try:
+        if kind == 'main':
+            # The parent touches the pages, like the std::vector built by main()
+            counter_view(shms[0].buf, slots, stride)[:] = 0
+        procs = []
+        for i in range(num_threads):
+            shm = shms[i] if kind == 'perthread' else shms[0]
+            index = 0 if kind == 'perthread' else i
+            touch = kind == 'perthread' or i == touch_worker
+            procs.append(ctx.Process(target=worker_func, args=(
+                i, cpus[i], shm.name, index, slots, stride, iterations, touch, ready, go, times)))
+        for p in procs:
+            p.start()
+        _wait_ready(procs, ready)
+        go.set()
+        for p in procs:
+            p.join()
+        if any(p.exitcode != 0 for p in procs):
+            raise RuntimeError('a worker process failed')
+        spans = [times[i] for i in range(num_threads)]
+        return (max(end for _, end in spans) - min(start for start, _ in spans)) * 1000
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+# CPUs per mode, same placement as run_tests.sh gives the C++ binaries
+def mode_cpus(topo, mode, num_threads):
+    cpus = topology.placement(topo, mode, num_threads)
+    if len(cpus) < num_threads:
+        raise ValueError(f'mode {mode} places only {len(cpus)} threads')
+    unavailable = set(cpus) - os.sched_getaffinity(0)
+    if unavailable:
+        raise ValueError(f'CPUs {topology.format_cpu_list(unavailable)} are not available to this process')
+    return cpus
+
+
+def result_path(results_dir, num_threads, total_operations, mode, alloc, variant, impl=IMPL):
+    alloc_tag = '' if alloc == 'main' else f'_alloc{alloc}'
+    return os.path.join(results_dir, f'time_{num_threads}_{total_operations}_mode{mode}{alloc_tag}'
+                                     f'_impl{impl}_{variant}.txt')
+
+
+# Grid of runs written as time_* files the way run_tests.sh writes the C++ ones,
+# with the counter stride of each variant from `strides`
+def campaign(results_dir, threads, sizes, modes, allocs, runs, topo, strides=STRIDES):
+    os.makedirs(results_dir, exist_ok=True)
+    impl = impl_tag(strides)
+    for num_threads in threads:
+        for size in sizes:
+            for mode in modes:
+                if mode == 1 and num_threads != 2:
+                    continue
+                try:
+                    cpus = mode_cpus(topo, mode, num_threads)
+                except ValueError as e:
+                    print(f"Skipping mode {mode} with {num_threads} threads: {e}")
+                    continue
+                for alloc in allocs:
+                    _, touch_worker = parse_alloc(alloc)
+                    if touch_worker is not None and touch_worker >= num_threads:
+                        print(f"Skipping {alloc} with {num_threads} threads: the touch worker must be below the thread count")
+                        continue
+                    for variant in ('bad', 'good'):
+                        path = result_path(results_dir, num_threads, size, mode, alloc, variant, impl)
+                        if os.path.exists(path):
+                            with open(path) as f:
+                                if sum(1 for _ in f) >= runs:
+                                    print(f"Already completed: {os.path.basename(path)}")
+                                    continue
+                        # Written once every run succeeded, so a failure leaves no partial file
+                        times = [run_test(num_threads, size, cpus, strides[variant], alloc) for _ in range(runs)]
+                        with open(path, 'w') as f:
+                            f.writelines(f'{ms}\n' for ms in times)
+                        print(f"Completed {os.path.basename(path)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='False sharing benchmark on multiprocessing.shared_memory.')
+    parser.add_argument('--topology', metavar='JSON', help='topology.json for the CPU placement (default: sysfs)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help='one run, printed like the C++ binaries')
+    p.add_argument('variant', choices=sorted(STRIDES))
+    p.add_argument('threads', type=int)
+    p.add_argument('operations', type=int)
+    p.add_argument('mode', type=int, nargs='?', default=0)
+    p.add_argument('alloc', nargs='?', default='main')
+    p.add_argument('--stride', type=int, help='bytes between counters (default: 8 bad, 64 good)')
+
+    p = sub.add_parser('campaign', help='write time_* result files for a grid of runs')
+    p.add_argument('results_dir')
+    p.add_argument('--threads', type=int, nargs='+', default=list(range(1, 11)))
+    p.add_argument('--sizes', type=int, nargs='+', default=[1000000, 2000000, 5000000],
+                   help='total increments per run (the Python loop is ~100x slower than C++)')
+    p.add_argument('--modes', type=int, nargs='+', default=[0, 2, 3, 1])
+    p.add_argument('--alloc', nargs='+', default=['main'],
+                   help='allocation modes (modes the Python benchmark cannot reproduce are skipped)')
+    p.add_argument('--runs', type=int, default=11)
+    p.add_argument('--strides', type=int, nargs=2, metavar=('BAD', 'GOOD'),
+                   default=[STRIDES['bad'], STRIDES['good']],
+                   help='bytes between counters per variant (default: 8 64; other strides are '
+                        'recorded in the implementation tag of the file names)')
+
+    args = parser.parse_args(argv)
+    try:
+        topo = topology.load_json(args.topology) if args.topology else topology.read_topology()
+        if args.command == 'run':
+            stride = args.stride or STRIDES[args.variant]
+            check_stride(stride)
+            cpus = mode_cpus(topo, args.mode, args.threads)
+            ms = run_test(args.threads, args.operations, cpus, stride, args.alloc)
+            label = 'bad coherency' if args.variant == 'bad' else 'good coherency'
+            print(f"Time for {label} (mode {args.mode}): {ms} ms")
+        else:
+            allocs = []
+            for alloc in args.alloc:
+                try:
+                    parse_alloc(alloc)
+                    allocs.append(alloc)
+                except ValueError as e:
+                    print(f"Skipping: {e}")
+            strides = dict(zip(('bad', 'good'), args.strides))
+            for stride in args.strides:
+                check_stride(stride)
+            campaign(args.results_dir, args.threads, args.sizes, args.modes, allocs, args.runs, topo, strides)
+    except (OSError, ValueError, RuntimeError) as e:
+        sys.exit(f"error: {e}")
+
+
+if __name__ == '__main__':
+    main()
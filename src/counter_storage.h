@@ -0,0 +1,204 @@
+// Placement of the counter array shared by bad_coherency.cpp and good_coherency.cpp.
+//
+// The allocation mode is the optional 4th argument of both benchmarks:
+//   main        std::vector built by the main thread (original behaviour)
+//   touch<W>    first touched by worker W, so the pages live on W's NUMA node
+//   node<N>     bound to NUMA node N with mbind(); falls back to "main" if mbind fails
+//   interleave  pages interleaved over every online NUMA node (mbind MPOL_INTERLEAVE).
+//                 Interleaving is per page and the whole counter array fits in one,
+//                 so it lands on a single node like node<N> (the one the interleave
+//                 policy picks). Counters would only be spread over several nodes
+//                 with a page each, as in perthread (placed by first touch there).
+//   thp         2 MB aligned region with madvise(MADV_HUGEPAGE)
+//   hugetlb     explicit huge page (MAP_HUGETLB); falls back to "thp" without reserved pages
+//   perthread   one page per worker, allocated and touched by that worker
+//                 (no false sharing is possible: the control for placement-only effects)
+// mbind is called through syscall() so the benchmarks do not need libnuma.
+
+#ifndef COUNTER_STORAGE_H
+#define COUNTER_STORAGE_H
+
+#include <cerrno>
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <new>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <vector>
+#include <sched.h>
+#include <sys/mman.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+#ifndef MPOL_BIND
+#define MPOL_BIND 2
+#endif
+#ifndef MPOL_INTERLEAVE
+#define MPOL_INTERLEAVE 3
+#endif
+#ifndef MPOL_MF_MOVE
+#define MPOL_MF_MOVE (1 << 1)
+#endif
+
+static const size_t HUGE_PAGE_SIZE = 2 * 1024 * 1024;
+static const int MAX_NUMA_NODES = 1024;
+
+// Split an allocation mode such as "node1" into ("node", 1); arg is -1 without digits
+inline void parse_alloc_mode(const std::string& mode, std::string& kind, int& arg) {
+    size_t digits = mode.find_first_of("0123456789");
+    kind = mode.substr(0, digits);
+    arg = (digits == std::string::npos) ? -1 : std::stoi(mode.substr(digits));
+    bool with_arg = (kind == "touch" || kind == "node");
+    bool known = with_arg || kind == "main" || kind == "interleave" || kind == "thp" ||
+                 kind == "hugetlb" || kind == "perthread";
+    if (!known || with_arg != (arg >= 0)) {
+        throw std::invalid_argument("unknown allocation mode '" + mode + "'");
+    }
+}
+
+// Run fn on a thread pinned to cpu (used so the first touch happens on that CPU)
+template <typename Fn>
+void run_on_cpu(int cpu, Fn fn) {
+    std::thread t([cpu, &fn]() {
+        cpu_set_t cpuset;
+        CPU_ZERO(&cpuset);
+        CPU_SET(cpu, &cpuset);
+        sched_setaffinity(0, sizeof(cpu_set_t), &cpuset);
+        fn();
+    });
+    t.join();
+}
+
+// Online NUMA nodes from sysfs ("0-3" style list), {0} if unknown
+inline std::vector<int> online_numa_nodes() {
+    std::vector<int> nodes;
+    std::ifstream f("/sys/devices/system/node/online");
+    std::string list;
+    if (f >> list) {
+        size_t pos = 0;
+        while (pos < list.size()) {
+            size_t comma = list.find(',', pos);
+            std::string item = list.substr(pos, comma == std::string::npos ? std::string::npos : comma - pos);
+            size_t dash = item.find('-');
+            int first = std::stoi(item.substr(0, dash));
+            int last = (dash == std::string::npos) ? first : std::stoi(item.substr(dash + 1));
+            for (int n = first; n <= last; ++n) nodes.push_back(n);
+            if (comma == std::string::npos) break;
+            pos = comma + 1;
+        }
+    }
+    if (nodes.empty()) nodes.push_back(0);
+    return nodes;
+}
+
+inline bool bind_memory(void* addr, size_t len, int policy, const std::vector<int>& nodes) {
+    unsigned long mask[MAX_NUMA_NODES / (8 * sizeof(unsigned long))] = {};
+    const size_t bits = 8 * sizeof(unsigned long);
+    for (int n : nodes) {
+        if (n < 0 || n >= MAX_NUMA_NODES) return false;
+        mask[n / bits] |= 1UL << (n % bits);
+    }
+    return syscall(SYS_mbind, addr, len, policy, mask, (unsigned long)MAX_NUMA_NODES, MPOL_MF_MOVE) == 0;
+}
+
+template <typename Counter>
+class CounterStorage {
+public:
+    CounterStorage(const std::string& mode, int num_threads, const std::vector<int>& cpus)
+        : slots_(num_threads, nullptr) {
+        std::string kind;
+        int arg;
+        parse_alloc_mode(mode, kind, arg);
+        size_t bytes = num_threads * sizeof(Counter);
+
+        if (kind == "main") {
+            vector_.resize(num_threads);
+            for (int i = 0; i < num_threads; ++i) slots_[i] = &vector_[i];
+        } else if (kind == "perthread") {
+            for (int i = 0; i < num_threads; ++i) {
+                run_on_cpu(cpus[i], [&]() {
+                    Counter* block = static_cast<Counter*>(map(sizeof(Counter), 0));
+                    slots_[i] = new (block) Counter();
+                });
+            }
+        } else if (kind == "touch") {
+            if (arg >= num_threads) {
+                throw std::invalid_argument("touch worker must be below the thread count");
+            }
+            Counter* block = static_cast<Counter*>(map(bytes, 0));
+            run_on_cpu(cpus[arg], [&]() { construct(block, num_threads); });
+        } else if (kind == "node" || kind == "interleave") {
+            Counter* block = static_cast<Counter*>(map(bytes, 0));
+            std::vector<int> nodes = (kind == "node") ? std::vector<int>{arg} : online_numa_nodes();
+            int policy = (kind == "node") ? MPOL_BIND : MPOL_INTERLEAVE;
+            if (!bind_memory(block, maps_.back().second, policy, nodes)) {
+                std::cerr << "mbind failed (" << std::strerror(errno)
+                          << "), counters placed by first touch of the main thread" << std::endl;
+            }
+            construct(block, num_threads);
+        } else {
+            void* block = nullptr;
+            if (kind == "hugetlb") {
+                block = map(bytes, MAP_HUGETLB);
+                if (block == nullptr) {
+                    std::cerr << "MAP_HUGETLB failed (no reserved huge pages?), using transparent huge pages"
+                              << std::endl;
+                }
+            }
+            if (block == nullptr) {
+                block = map_transparent_huge(bytes);
+            }
+            construct(static_cast<Counter*>(block), num_threads);
+        }
+    }
+
+    ~CounterStorage() {
+        for (auto& m : maps_) munmap(m.first, m.second);
+    }
+
+    CounterStorage(const CounterStorage&) = delete;
+    CounterStorage& operator=(const CounterStorage&) = delete;
+
+    Counter& operator[](int i) { return *slots_[i]; }
+
+private:
+    std::vector<Counter> vector_;
+    std::vector<Counter*> slots_;
+    std::vector<std::pair<void*, size_t>> maps_;
+
+    void construct(Counter* block, int num_threads) {
+        for (int i = 0; i < num_threads; ++i) slots_[i] = new (block + i) Counter();
+    }
+
+    // Anonymous mapping rounded up to whole pages (huge pages for MAP_HUGETLB).
+    // Only MAP_HUGETLB may fail softly (nullptr), any other failure throws.
+    void* map(size_t bytes, int extra_flags) {
+        size_t page = (extra_flags & MAP_HUGETLB) ? HUGE_PAGE_SIZE : (size_t)sysconf(_SC_PAGESIZE);
+        size_t len = (bytes + page - 1) / page * page;
+        void* addr = mmap(nullptr, len, PROT_READ | PROT_WRITE, MAP_PRIVATE | MAP_ANONYMOUS | extra_flags, -1, 0);
+        if (addr == MAP_FAILED) {
+            if (extra_flags & MAP_HUGETLB) return nullptr;
+            throw std::bad_alloc();
+        }
+        maps_.emplace_back(addr, len);
+        return addr;
+    }
+
+    // Over-allocate so a 2 MB aligned huge page fits, then ask for THP backing
+    void* map_transparent_huge(size_t bytes) {
+        size_t len = (bytes + HUGE_PAGE_SIZE - 1) / HUGE_PAGE_SIZE * HUGE_PAGE_SIZE;
+        char* base = static_cast<char*>(map(len + HUGE_PAGE_SIZE, 0));
+        char* aligned = reinterpret_cast<char*>(
+            (reinterpret_cast<uintptr_t>(base) + HUGE_PAGE_SIZE - 1) & ~(uintptr_t)(HUGE_PAGE_SIZE - 1));
+        if (madvise(aligned, len, MADV_HUGEPAGE) != 0) {
+            std::cerr << "madvise(MADV_HUGEPAGE) failed (" << std::strerror(errno)
+                      << "), counters on regular pages" << std::endl;
+        }
+        return aligned;
+    }
+};
+
+#endif
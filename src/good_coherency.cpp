@@ -2,8 +2,13 @@
 #include <thread>
 #include <vector>
 #include <chrono>
+#include <cstdlib>
+#include <sstream>
+#include <string>
 #include <sched.h>
 
+#include "counter_storage.h"
+
 std::vector<int> cpus;
 
 struct AlignedCounter {
@@ -21,10 +26,10 @@ void worker_func(int id, volatile long long& counter, long long iterations) {
     }
 }
 
-double run_good_coherency_test(int num_threads, long long total_operations) {
+double run_good_coherency_test(int num_threads, long long total_operations, const std::string& alloc_mode) {
     if (num_threads <= 0) return 0.0;
     
-    std::vector<AlignedCounter> good_data(num_threads);
+    CounterStorage<AlignedCounter> good_data(alloc_mode, num_threads, cpus);
     long long iterations_per_thread = total_operations / num_threads;
 
     auto start = std::chrono::high_resolution_clock::now();
@@ -45,15 +50,17 @@ double run_good_coherency_test(int num_threads, long long total_operations) {
 }
 
 int main(int argc, char* argv[]) {
-    if (argc < 3 || argc > 4) {
-        std::cerr << "Usage: " << argv[0] << " <num_threads> <total_operations> [mode]" << std::endl;
+    if (argc < 3 || argc > 5) {
+        std::cerr << "Usage: " << argv[0] << " <num_threads> <total_operations> [mode] [alloc]" << std::endl;
         std::cerr << "Modes: 0=default, 1=same core (2 threads only), 2=same CCD different cores, 3=different CCDs" << std::endl;
+        std::cerr << "Alloc: main (default), touch<W>, node<N>, interleave, thp, hugetlb, perthread" << std::endl;
         return 1;
     }
 
     int num_threads = std::stoi(argv[1]);
     long long total_operations = std::stoll(argv[2]);
-    int mode = (argc == 4) ? std::stoi(argv[3]) : 0;
+    int mode = (argc >= 4) ? std::stoi(argv[3]) : 0;
+    std::string alloc_mode = (argc == 5) ? argv[4] : "main";
 
     // Define CPU mappings based on /sys topology (L3 cache sharing)
     std::vector<int> ccd0_cores = {0,1,2,3,4,5,12,13,14,15,16,17};
@@ -89,7 +96,28 @@ int main(int argc, char* argv[]) {
         return 1;
     }
 
-    double time = run_good_coherency_test(num_threads, total_operations);
+    // Optional CPU list from the host topology (python3 topology.py cpus <mode> <threads>)
+    if (const char* env = std::getenv("BENCH_CPUS")) {
+        std::vector<int> env_cpus;
+        std::stringstream ss(env);
+        std::string item;
+        while (std::getline(ss, item, ',')) {
+            if (!item.empty()) env_cpus.push_back(std::stoi(item));
+        }
+        if (env_cpus.size() < cpus.size()) {
+            std::cerr << "BENCH_CPUS must list at least " << cpus.size() << " CPUs" << std::endl;
+            return 1;
+        }
+        cpus = env_cpus;
+    }
+
+    double time;
+    try {
+        time = run_good_coherency_test(num_threads, total_operations, alloc_mode);
+    } catch (const std::exception& e) {
+        std::cerr << "Allocation failed: " << e.what() << std::endl;
+        return 1;
+    }
     std::cout << "Time for good coherency (mode " << mode << "): " << time << " ms" << std::endl;
 
     return 0;
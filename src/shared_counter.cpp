@@ -0,0 +1,299 @@
+// One logical counter incremented by every thread, implemented several ways:
+//   atomic       a single std::atomic on its own cache line (fetch_add)
+//   sharded      one padded shard per thread, summed on read
+//   ccd          one padded atomic shard per L3 domain (CCD), summed on read
+//   batched<B>   a local count per thread, added to the single atomic every B increments
+// Every run has two phases with fresh counters: the writers alone (write time),
+// then the writers again while a reader thread, pinned to a CPU none of them
+// use, reads the logical value in a loop (cost of one read under contention).
+// The L3 domain of each worker comes from BENCH_L3 (counter_suite.py sets it
+// from topology.py), or from the CCD tables below. BENCH_READER_CPU picks the
+// reader's CPU, by default the first allowed CPU that runs no writer.
+
+#include <atomic>
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <vector>
+#include <sched.h>
+
+std::vector<int> cpus;
+std::vector<int> domains;
+
+struct alignas(64) Shard {
+    std::atomic<long long> value{0};
+};
+
+std::vector<int> parse_list(const char* text) {
+    std::vector<int> values;
+    std::stringstream ss(text);
+    std::string item;
+    while (std::getline(ss, item, ',')) {
+        if (!item.empty()) values.push_back(std::stoi(item));
+    }
+    return values;
+}
+
+void pin(int cpu) {
+    cpu_set_t cpuset;
+    CPU_ZERO(&cpuset);
+    CPU_SET(cpu, &cpuset);
+    sched_setaffinity(0, sizeof(cpu_set_t), &cpuset);
+}
+
+struct Phase {
+    double write_ms;
+    double read_ns;
+    long long reads;
+};
+
+struct Result {
+    Phase writes;  // writers alone
+    Phase reads;   // writers with the reader
+};
+
+// Start the writers together and time them until all are done. With a reader,
+// this thread pins itself to reader_cpu (-1: unpinned) and reads until then.
+template <typename Worker, typename Read>
+Phase run_phase(int num_threads, Worker& worker, Read& read, bool with_reader, int reader_cpu) {
+    std::atomic<int> ready{0};
+    std::atomic<bool> go{false};
+    std::atomic<int> running{num_threads};
+    std::vector<std::thread> threads;
+    for (int i = 0; i < num_threads; ++i) {
+        threads.emplace_back([&, i]() {
+            pin(cpus[i]);
+            ready.fetch_add(1);
+            while (!go.load(std::memory_order_acquire)) {}
+            worker(i);
+            running.fetch_sub(1, std::memory_order_release);
+        });
+    }
+    if (with_reader && reader_cpu >= 0) pin(reader_cpu);
+    while (ready.load() < num_threads) {
+        std::this_thread::yield();
+    }
+
+    volatile long long sink = 0;
+    long long reads = 0;
+    auto start = std::chrono::high_resolution_clock::now();
+    go.store(true, std::memory_order_release);
+    if (with_reader) {
+        while (running.load(std::memory_order_acquire) > 0) {
+            sink = read();
+            ++reads;
+        }
+    }
+    auto read_end = std::chrono::high_resolution_clock::now();
+    for (auto& t : threads) {
+        t.join();
+    }
+    auto end = std::chrono::high_resolution_clock::now();
+    (void)sink;
+
+    std::chrono::duration<double, std::milli> write_ms = end - start;
+    std::chrono::duration<double, std::nano> read_ns = read_end - start;
+    return {write_ms.count(), reads > 0 ? read_ns.count() / reads : 0.0, reads};
+}
+
+// Both phases over the same shards, reset in between; throws on lost updates
+template <typename Worker, typename Read>
+Result run(int num_threads, long long expected, std::vector<Shard>& shards, Worker worker, Read read, int reader_cpu) {
+    Result result;
+    for (int phase = 0; phase < 2; ++phase) {
+        for (auto& s : shards) s.value.store(0);
+        Phase p = run_phase(num_threads, worker, read, phase == 1, reader_cpu);
+        if (read() != expected) {
+            throw std::runtime_error("lost updates: counter is " + std::to_string(read()) +
+                                     ", expected " + std::to_string(expected));
+        }
+        (phase == 0 ? result.writes : result.reads) = p;
+    }
+    return result;
+}
+
+long long sum(std::vector<Shard>& shards) {
+    long long total = 0;
+    for (auto& s : shards) total += s.value.load(std::memory_order_relaxed);
+    return total;
+}
+
+Result run_counter_test(const std::string& impl, int num_threads, long long iterations, int reader_cpu) {
+    std::string kind = impl.substr(0, impl.find_first_of("0123456789"));
+    long long batch = (kind.size() < impl.size()) ? std::stoll(impl.substr(kind.size())) : 0;
+    long long expected = iterations * num_threads;
+
+    if (impl == "atomic") {
+        std::vector<Shard> counter(1);
+        return run(num_threads, expected, counter,
+            [&](int) {
+                for (long long i = 0; i < iterations; ++i) counter[0].value.fetch_add(1, std::memory_order_relaxed);
+            },
+            [&]() { return counter[0].value.load(std::memory_order_relaxed); }, reader_cpu);
+    }
+    if (impl == "sharded") {
+        std::vector<Shard> shards(num_threads);
+        return run(num_threads, expected, shards,
+            [&](int id) {
+                // Single writer per shard: a plain load and store, no locked instruction
+                std::atomic<long long>& value = shards[id].value;
+                for (long long i = 0; i < iterations; ++i) {
+                    value.store(value.load(std::memory_order_relaxed) + 1, std::memory_order_relaxed);
+                }
+            },
+            [&]() { return sum(shards); }, reader_cpu);
+    }
+    if (impl == "ccd") {
+        // Compact shard index per distinct L3 domain
+        std::vector<int> ids;
+        std::vector<int> shard_of(num_threads);
+        for (int i = 0; i < num_threads; ++i) {
+            size_t j = 0;
+            while (j < ids.size() && ids[j] != domains[i]) ++j;
+            if (j == ids.size()) ids.push_back(domains[i]);
+            shard_of[i] = (int)j;
+        }
+        std::vector<Shard> shards(ids.size());
+        return run(num_threads, expected, shards,
+            [&](int id) {
+                std::atomic<long long>& value = shards[shard_of[id]].value;
+                for (long long i = 0; i < iterations; ++i) value.fetch_add(1, std::memory_order_relaxed);
+            },
+            [&]() { return sum(shards); }, reader_cpu);
+    }
+    if (kind == "batched" && batch > 0) {
+        std::vector<Shard> counter(1);
+        return run(num_threads, expected, counter,
+            [&](int) {
+                long long local = 0;
+                for (long long i = 0; i < iterations; ++i) {
+                    if (++local == batch) {
+                        counter[0].value.fetch_add(local, std::memory_order_relaxed);
+                        local = 0;
+                    }
+                }
+                counter[0].value.fetch_add(local, std::memory_order_relaxed);
+            },
+            [&]() { return counter[0].value.load(std::memory_order_relaxed); }, reader_cpu);
+    }
+    throw std::invalid_argument("unknown counter implementation '" + impl + "'");
+}
+
+// First CPU this process may use that runs no writer, -1 if there is none
+int free_cpu(int num_threads) {
+    cpu_set_t allowed;
+    CPU_ZERO(&allowed);
+    if (sched_getaffinity(0, sizeof(cpu_set_t), &allowed) != 0) return -1;
+    for (int c = 0; c < CPU_SETSIZE; ++c) {
+        bool used = false;
+        for (int i = 0; i < num_threads; ++i) used = used || cpus[i] == c;
+        if (CPU_ISSET(c, &allowed) && !used) return c;
+    }
+    return -1;
+}
+
+int main(int argc, char* argv[]) {
+    if (argc < 4 || argc > 5) {
+        std::cerr << "Usage: " << argv[0] << " <impl> <num_threads> <total_operations> [mode]" << std::endl;
+        std::cerr << "Impl: atomic, sharded, ccd, batched<B>" << std::endl;
+        std::cerr << "Modes: 0=default, 1=same core (2 threads only), 2=same CCD different cores, 3=different CCDs" << std::endl;
+        return 1;
+    }
+
+    std::string impl = argv[1];
+    int num_threads = std::stoi(argv[2]);
+    long long total_operations = std::stoll(argv[3]);
+    int mode = (argc == 5) ? std::stoi(argv[4]) : 0;
+    if (num_threads <= 0) {
+        std::cerr << "The thread count must be positive" << std::endl;
+        return 1;
+    }
+
+    // Define CPU mappings based on /sys topology (L3 cache sharing)
+    std::vector<int> ccd0_cores = {0,1,2,3,4,5,12,13,14,15,16,17};
+    std::vector<int> ccd1_cores = {6,7,8,9,10,11,18,19,20,21,22,23};
+
+    // Set CPUs based on mode
+    cpus.clear();
+    if (mode == 0) {
+        for (int i = 0; i < num_threads; ++i) cpus.push_back(i);
+    } else if (mode == 1) {
+        if (num_threads != 2) {
+            std::cerr << "Mode 1 only supported for 2 threads" << std::endl;
+            return 1;
+        }
+        cpus = {9, 21};
+    } else if (mode == 2) {
+        for (int i = 0; i < num_threads; ++i) {
+            cpus.push_back(ccd1_cores[i % ccd1_cores.size()]);
+        }
+    } else if (mode == 3) {
+        for (int i = 0; i < num_threads; ++i) {
+            if (i % 2 == 0) {
+                cpus.push_back(ccd1_cores[(i / 2) % ccd1_cores.size()]);
+            } else {
+                cpus.push_back(ccd0_cores[(i / 2) % ccd0_cores.size()]);
+            }
+        }
+    } else {
+        std::cerr << "Invalid mode" << std::endl;
+        return 1;
+    }
+
+    // Optional CPU list and L3 domains from the host topology
+    if (const char* env = std::getenv("BENCH_CPUS")) {
+        std::vector<int> env_cpus = parse_list(env);
+        if (env_cpus.size() < cpus.size()) {
+            std::cerr << "BENCH_CPUS must list at least " << cpus.size() << " CPUs" << std::endl;
+            return 1;
+        }
+        cpus = env_cpus;
+    }
+    domains.clear();
+    if (const char* env = std::getenv("BENCH_L3")) {
+        domains = parse_list(env);
+        if ((int)domains.size() < num_threads) {
+            std::cerr << "BENCH_L3 must list the L3 domain of " << num_threads << " CPUs" << std::endl;
+            return 1;
+        }
+    } else {
+        for (int i = 0; i < num_threads; ++i) {
+            bool ccd1 = false;
+            for (int c : ccd1_cores) ccd1 = ccd1 || c == cpus[i];
+            domains.push_back(ccd1 ? 1 : 0);
+        }
+    }
+
+    int reader_cpu = free_cpu(num_threads);
+    if (const char* env = std::getenv("BENCH_READER_CPU")) {
+        reader_cpu = std::stoi(env);
+    }
+    for (int i = 0; i < num_threads; ++i) {
+        if (reader_cpu >= 0 && cpus[i] == reader_cpu) {
+            std::cerr << "The reader CPU " << reader_cpu << " also runs a writer" << std::endl;
+            return 1;
+        }
+    }
+    if (reader_cpu < 0) {
+        std::cerr << "No CPU left for the reader, it runs unpinned" << std::endl;
+    }
+
+    long long iterations_per_thread = total_operations / num_threads;
+    Result result;
+    try {
+        result = run_counter_test(impl, num_threads, iterations_per_thread, reader_cpu);
+    } catch (const std::exception& e) {
+        std::cerr << "error: " << e.what() << std::endl;
+        return 1;
+    }
+    std::cout << "Time for " << impl << " counter (mode " << mode << "): " << result.writes.write_ms << " ms" << std::endl;
+    std::cout << "Read cost for " << impl << " counter (mode " << mode << "): " << result.reads.read_ns
+              << " ns over " << result.reads.reads << " reads on CPU " << reader_cpu
+              << ", writers took " << result.reads.write_ms << " ms" << std::endl;
+
+    return 0;
+}
@@ -0,0 +1,148 @@
+import warnings
+import numpy as np
+from collections import namedtuple
+
+# Summary of one configuration: point estimate, confidence interval and how many
+# runs were used / thrown away by the outlier filter
+Summary = namedtuple('Summary', ['mean', 'lo', 'hi', 'n', 'excluded'])
+RatioSummary = namedtuple('RatioSummary', ['ratio', 'lo', 'hi'])
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+# Upper bound on the number of floats materialized per bootstrap chunk
+# (resamples x configurations x runs). Keeps memory flat for thousands of resamples.
+CHUNK_ELEMENTS = 8_000_000
+
+
+# Turn {key: [values]} into a NaN-padded matrix (one row per configuration)
+def pad_groups(groups):
+    keys = list(groups.keys())
+    counts = np.array([len(groups[k]) for k in keys], dtype=np.int64)
+    width = int(counts.max()) if len(keys) else 0
+    values = np.full((len(keys), max(width, 1)), np.nan)
+    for row, key in enumerate(keys):
+        values[row, :counts[row]] = groups[key]
+    return keys, values
+
+
+# Flag runs whose robust z-score (|x - median| / (1.4826 * MAD)) exceeds threshold.
+# Rows with a MAD of zero (mostly constant counters) have no usable scale and
+# keep all their runs.
+def mad_outlier_mask(values, threshold=3.5):
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # empty rows
+        median = np.nanmedian(values, axis=1, keepdims=True)
+        deviation = np.abs(values - median)
+        mad = np.nanmedian(deviation, axis=1, keepdims=True) * MAD_SCALE
+        score = np.where(mad > 0, deviation / mad, 0.0)
+    return np.isfinite(values) & (score > threshold)
+
+
+# Move the valid (finite) runs of every row to the front so that the first
+# counts[row] columns hold the data. Order inside a row is irrelevant for resampling.
+def _compact(values):
+    values = np.sort(values, axis=1)  # NaNs sort last
+    counts = np.isfinite(values).sum(axis=1)
+    return values, counts
+
+
+# Bootstrap distribution of the mean for every row at once: returns an array of
+# shape (n_resamples, n_rows). Rows with no data produce NaN.
+def bootstrap_means(values, counts, n_resamples=2000, rng=None):
+    rng = np.random.default_rng(rng)
+    n_rows, width = values.shape
+    filled = np.nan_to_num(values)
+    col = np.arange(width)
+    # Resampled column j only counts when j < n, so every resample has size n
+    weights = (col[None, :] < counts[:, None]).astype(float)
+    safe_counts = np.where(counts > 0, counts, 1)
+
+    out = np.empty((n_resamples, n_rows))
+    step = max(1, CHUNK_ELEMENTS // max(1, n_rows * width))
+    for start in range(0, n_resamples, step):
+        stop = min(n_resamples, start + step)
+        u = rng.random((stop - start, n_rows, width))
+        idx = (u * safe_counts[None, :, None]).astype(np.int64)
+        picked = np.take_along_axis(filled[None, :, :], idx, axis=2)
+        out[start:stop] = (picked * weights[None]).sum(axis=2) / safe_counts[None, :]
+    out[:, counts == 0] = np.nan
+    return out
+
+
+# Percentile CI of every column in one vectorized call. Columns of configurations
+# without runs are all NaN and stay NaN; only columns with some NaN resamples
+# (ratios over a zero mean) need the much slower nanpercentile.
+def _percentile_ci(samples, confidence):
+    alpha = (1.0 - confidence) / 2.0
+    q = [100 * alpha, 100 * (1 - alpha)]
+    missing = np.isnan(samples)
+    partial = missing.any(axis=0) & ~missing.all(axis=0)
+    bounds = np.percentile(samples, q, axis=0)
+    if partial.any():
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            bounds[:, partial] = np.nanpercentile(samples[:, partial], q, axis=0)
+    return bounds[0], bounds[1]
+
+
+# Apply the optional outlier filter and compact the rows
+def _prepare(groups, outlier_threshold):
+    keys, values = pad_groups(groups)
+    valid = np.isfinite(values)
+    if outlier_threshold is not None:
+        outliers = mad_outlier_mask(values, outlier_threshold)
+        values = np.where(outliers, np.nan, values)
+    else:
+        outliers = np.zeros_like(valid)
+    values, counts = _compact(values)
+    return keys, values, counts, outliers.sum(axis=1)
+
+
+# Mean and bootstrap percentile CI for every configuration in {key: [values]}.
+# All configurations are resampled together in a single vectorized pass.
+def summarize(groups, n_resamples=2000, confidence=0.95, outlier_threshold=None, seed=0):
+    if not groups:
+        return {}
+    keys, values, counts, excluded = _prepare(groups, outlier_threshold)
+    with np.errstate(all='ignore'):
+        means = np.nansum(values, axis=1) / np.where(counts > 0, counts, 1)
+    means[counts == 0] = np.nan
+    boot = bootstrap_means(values, counts, n_resamples, rng=seed)
+    lo, hi = _percentile_ci(boot, confidence)
+    return {key: Summary(means[i], lo[i], hi[i], int(counts[i]), int(excluded[i]))
+            for i, key in enumerate(keys)}
+
+
+# Bad/good ratio of means with a bootstrap CI. Both sides are resampled
+# independently and the ratio is taken per resample. Keys present on only one
+# side are ignored.
+def bootstrap_ratio(bad_groups, good_groups, n_resamples=2000, confidence=0.95,
+                    outlier_threshold=None, seed=0):
+    keys = [k for k in bad_groups if k in good_groups]
+    if not keys:
+        return {}
+    _, bad_values, bad_counts, _ = _prepare({k: bad_groups[k] for k in keys}, outlier_threshold)
+    _, good_values, good_counts, _ = _prepare({k: good_groups[k] for k in keys}, outlier_threshold)
+    rng = np.random.default_rng(seed)
+    bad_boot = bootstrap_means(bad_values, bad_counts, n_resamples, rng=rng)
+    good_boot = bootstrap_means(good_values, good_counts, n_resamples, rng=rng)
+    with np.errstate(all='ignore'):
+        bad_mean = np.nansum(bad_values, axis=1) / bad_counts
+        good_mean = np.nansum(good_values, axis=1) / good_counts
+        point = np.where(good_mean > 0, bad_mean / good_mean, np.nan)
+        ratios = np.where(good_boot > 0, bad_boot / good_boot, np.nan)
+    lo, hi = _percentile_ci(ratios, confidence)
+    return {key: RatioSummary(point[i], lo[i], hi[i]) for i, key in enumerate(keys)}
+
+
+# Asymmetric errorbar half-widths (for matplotlib's yerr) from a list of Summary
+def yerr(summaries):
+    lower = [max(0.0, s.mean - s.lo) if s is not None and np.isfinite(s.lo) else 0 for s in summaries]
+    upper = [max(0.0, s.hi - s.mean) if s is not None and np.isfinite(s.hi) else 0 for s in summaries]
+    return [lower, upper]
+
+
+# Rows of (key, n, excluded) for every configuration that lost runs to the filter
+def exclusion_report(summaries):
+    return [(key, s.n, s.excluded) for key, s in summaries.items() if s.excluded]
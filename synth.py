@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+import ingest
+
+# Synthetic campaigns in the raw format run_tests.sh writes (time_*, energy_*,
+# perf_* files), for exercising the analysis path without perf, sudo or the
+# benchmark machine. The numbers follow the shape of real runs (bad/good ratios
+# growing with the distance between the threads, counters proportional to the
+# operations) but are not measurements.
+
+# Header line of each perf file, as written by run_tests.sh
+PERF_HEADERS = {
+    'cache': 'ls_any_fills_from_sys.remote_cache,ls_dmnd_fills_from_sys.remote_cache,'
+             'ls_bad_status2.stli_other,cache-misses',
+    'l1': 'ls_dmnd_fills_from_sys.all,ls_dmnd_fills_from_sys.local_l2',
+    'l2': 'l2_cache_req_stat.all,l2_cache_req_stat.ic_dc_hit_in_l2,l2_cache_req_stat.ic_dc_miss_in_l2',
+    'l3': 'ls_dmnd_fills_from_sys.local_ccx,ls_dmnd_fills_from_sys.dram_io_all',
+    'core': 'cycles,instructions',
+}
+
+# Today's run_tests.sh grid
+THREADS = list(range(1, 11))
+SIZES = [125000000, 250000000, 500000000, 1000000000]
+MODES = [0, 2, 3, 1]
+RUNS = 11
+
+# Time per increment of one uncontended thread (1 ns, in ms like the binaries
+# print) and the bad/good slowdown per mode once a second thread shares the line
+MS_PER_OP = 1e-6
+SLOWDOWN = {0: 3.0, 1: 1.6, 2: 3.0, 3: 7.5}
+# Share of the increments that miss to another core's cache in the bad variant
+SHARED_MISS_RATE = {0: 0.02, 1: 0.001, 2: 0.02, 3: 0.05}
+# Lognormal noise of every value, and how often a run is a slow outlier
+NOISE = 0.03
+OUTLIER_RATE = 0.02
+
+
+# Grid scaled by factor: the same threads and modes with `factor` times as
+# many execution counts (geometric steps between today's sizes)
+def grid(factor=1):
+    sizes = sorted({int(SIZES[0] * 2 ** (i / factor)) for i in range(len(SIZES) * factor)})
+    return {'threads': THREADS, 'sizes': sizes, 'modes': MODES, 'runs': RUNS}
+
+
+def _noisy(rng, mean, runs):
+    values = mean * rng.lognormal(0.0, NOISE, runs)
+    slow = rng.random(runs) < OUTLIER_RATE
+    values[slow] *= rng.uniform(1.5, 3.0, slow.sum())
+    return values
+
+
+# {kind: values} for one configuration: 1-D arrays for time/energy, (runs, counters) for perf groups
+def configuration(rng, threads, size, mode, variant, runs):
+    contended = variant == 'bad' and threads > 1
+    slowdown = 1 + (SLOWDOWN[mode] - 1) * min(1.0, 0.8 + 0.02 * threads) if contended else 1.0
+    time_ms = _noisy(rng, size / threads * MS_PER_OP * slowdown, runs)
+    # Package power grows with the busy cores
+    energy = time_ms / 1000 * (25 + 4 * threads) * rng.lognormal(0.0, NOISE, runs)
+    miss = SHARED_MISS_RATE[mode] if contended else 1e-6
+    remote = _noisy(rng, size * miss, runs)
+    l1_fills = _noisy(rng, size * (miss * 1.2 + 1e-5), runs)
+    l2_requests = l1_fills * rng.uniform(1.05, 1.2, runs)
+    l2_miss_rate = rng.uniform(0.6, 0.9, runs) if contended else rng.uniform(0.05, 0.2, runs)
+    l2_misses = l2_requests * l2_miss_rate
+    l3_accesses = _noisy(rng, size * miss * 0.4 + 1e4, runs)
+    # Every thread busy at ~3 GHz for the whole run, ~4 instructions per increment
+    cycles = time_ms / 1000 * 3e9 * threads * rng.lognormal(0.0, NOISE, runs)
+    return {
+        'time': time_ms,
+        'energy': energy,
+        'cache': np.column_stack([remote * rng.uniform(1.0, 1.1, runs), remote,
+                                  _noisy(rng, size * miss * 0.1 + 1e3, runs), l1_fills * 0.3]),
+        'l1': np.column_stack([l1_fills, l1_fills * rng.uniform(0.2, 0.5, runs)]),
+        'l2': np.column_stack([l2_requests, l2_requests - l2_misses, l2_misses]),
+        'l3': np.column_stack([l3_accesses, l3_accesses * rng.uniform(0.01, 0.1, runs)]),
+        'core': np.column_stack([cycles, _noisy(rng, size * 4.0, runs)]),
+    }
+
+
+def _file_name(kind, threads, size, mode, variant, parts):
+    prefix = f'perf_{kind}' if kind in PERF_HEADERS else kind
+    tags = ''.join(f'_{key}{value}' for key, value in parts.items() if value != ingest.NAME_PARTS[key])
+    return f'{prefix}_{threads}_{size}_mode{mode}{tags}_{variant}.txt'
+
+
+def write_configuration(results_dir, values, threads, size, mode, variant, parts):
+    for kind, data in values.items():
+        path = os.path.join(results_dir, _file_name(kind, threads, size, mode, variant, parts))
+        with open(path, 'w') as f:
+            if kind in PERF_HEADERS:
+                f.write(PERF_HEADERS[kind] + '\n')
+                f.writelines(','.join(str(int(v)) for v in row) + '\n' for row in data)
+            else:
+                f.writelines(f'{v}\n' for v in data)
+
+
+# Write a whole campaign, returns the number of files written
+def generate(results_dir, threads=THREADS, sizes=SIZES, modes=MODES, runs=RUNS,
+             allocs=('main',), impl='cpp', host=None, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(results_dir, exist_ok=True)
+    files = 0
+    for thread in threads:
+        for size in sizes:
+            for mode in modes:
+                # Mode 1 (same core) only runs with 2 threads, like run_tests.sh
+                if mode == 1 and thread != 2:
+                    continue
+                for alloc in allocs:
+                    parts = {'alloc': alloc, 'impl': impl}
+                    for variant in ('bad', 'good'):
+                        values = configuration(rng, thread, size, mode, variant, runs)
+                        write_configuration(results_dir, values, thread, size, mode, variant, parts)
+                        files += len(values)
+    if host:
+        with open(os.path.join(results_dir, 'host.json'), 'w') as f:
+            json.dump({'host': host, 'cpu_model': 'synthetic'}, f, indent=1)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic results campaign in the run_tests.sh format.')
+    parser.add_argument('results_dir')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='multiply the number of execution counts of the run_tests.sh grid')
+    parser.add_argument('--threads', type=int, nargs='+', help='thread counts (default: the run_tests.sh grid)')
+    parser.add_argument('--sizes', type=int, nargs='+', help='execution counts (default: the scaled grid)')
+    parser.add_argument('--modes', type=int, nargs='+', help='CPU placement modes')
+    parser.add_argument('--runs', type=int, help=f'runs per configuration (default: {RUNS})')
+    parser.add_argument('--alloc', nargs='+', default=['main'], help='allocation modes')
+    parser.add_argument('--impl', default='cpp', choices=['cpp', 'python'])
+    parser.add_argument('--host', help='also write a host.json with this host key')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sweep = grid(args.scale)
+    for name in ('threads', 'sizes', 'modes', 'runs'):
+        if getattr(args, name):
+            sweep[name] = getattr(args, name)
+    if os.path.isdir(args.results_dir) and any(ingest.parse_name(n) for n in os.listdir(args.results_dir)):
+        sys.exit(f"error: {args.results_dir} already holds results")
+    files = generate(args.results_dir, allocs=args.alloc, impl=args.impl, host=args.host, seed=args.seed, **sweep)
+    print(f"Wrote {files} files to {args.results_dir}")
+
+
+if __name__ == '__main__':
+    main()
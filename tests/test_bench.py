@@ -0,0 +1,22 @@
+import bench
+
+
+def _results(medians, **env):
+    environment = dict({'scales': [1], 'resamples': 2000, 'host': 'hostA', 'cpu_model': 'cpu'}, **env)
+    return {'environment': environment,
+            'results': [{'scale': 1, 'stage': stage, 'median_s': s} for stage, s in medians.items()]}
+
+
+# Millisecond stages are not flagged for noise, real slowdowns are
+def test_regressions_use_medians_and_an_absolute_floor():
+    baseline = _results({'derive': 0.005, 'aggregate': 0.6, 'render': 2.0})
+    current = _results({'derive': 0.006, 'aggregate': 0.9, 'render': 2.1})
+    assert bench.regressions(current, baseline) == [(1, 'aggregate', 0.6, 0.9)]
+
+
+def test_incomparable_baselines():
+    current = _results({})['environment']
+    assert bench.incomparable(current, dict(current)) == []
+    assert bench.incomparable(current, dict(current, resamples=500, host='hostB')) == [
+        ('resamples', 500, 2000), ('host', 'hostB', 'hostA')]
+    assert [key for key, _, _ in bench.incomparable(current, {'resamples': 2000})] == ['scales', 'host', 'cpu_model']
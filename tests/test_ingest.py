@@ -0,0 +1,63 @@
+import numpy as np
+
+import synth
+import ingest
+import derived
+
+GRID = {'threads': [1, 2], 'sizes': [125000000], 'modes': [0, 2], 'runs': 5}
+
+
+def _runs_per_config(table, metric):
+    return sorted({len(v) for v in table.select(metric=metric).groups(('threads', 'size', 'mode', 'variant')).values()})
+
+
+# Two campaigns of the same host keep all their runs in every derived metric
+def test_merge_same_host_keeps_derived_runs(tmp_path):
+    dirs = []
+    for seed in (0, 1):
+        results_dir = str(tmp_path / f'campaign{seed}')
+        synth.generate(results_dir, host='hostA', seed=seed, **GRID)
+        dirs.append(results_dir)
+    merged = derived.evaluate(ingest.load_many(dirs, use_cache=False))
+    assert merged.unique('host') == ['hostA']
+    for metric in ('time', 'remote_cache_fills', 'ipc', 'l1_miss_rate', 'l2_miss_rate'):
+        assert _runs_per_config(merged, metric) == [2 * GRID['runs']], metric
+
+    # Each merged run is computed from one campaign's counters only
+    single = [derived.evaluate(ingest.load(d, use_cache=False)) for d in dirs]
+    expected = np.sort(np.concatenate([t.select(metric='ipc')['value'] for t in single]))
+    assert np.allclose(np.sort(merged.select(metric='ipc')['value']), expected)
+
+
+# Campaigns without host.json are keyed by their directory when merged
+def test_merge_unlabelled_campaigns_keeps_hosts_apart(tmp_path):
+    dirs = []
+    for name in ('a', 'b'):
+        results_dir = str(tmp_path / name / 'raw')
+        synth.generate(results_dir, seed=len(dirs), **GRID)
+        dirs.append(results_dir)
+    assert ingest.load(dirs[0], use_cache=False).unique('host') == [ingest.UNKNOWN_HOST]
+    merged = ingest.load_many(dirs, use_cache=False)
+    hosts = merged.unique('host')
+    assert len(hosts) == 2
+    for host in hosts:
+        assert _runs_per_config(merged.select(host=host), 'time') == [GRID['runs']]
+
+
+# A failed run stays in place, so later runs of different files stay paired
+def test_failed_runs_keep_run_numbers(tmp_path):
+    files = {'time_1_1000_mode0_good.txt': '1.0\n\n3.0\n',
+             'perf_group1_1_1000_mode0_good.txt': 'ls_dmnd_fills_from_sys.remote_cache\n10\n5,7\n30\n',
+             'perf_group2_1_1000_mode0_good.txt': 'ls_dmnd_fills_from_sys.all\n100\n200\n300\n'}
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    table = derived.evaluate(ingest.load(str(tmp_path), use_cache=False))
+    for metric, expected in (('time', [1.0, np.nan, 3.0]), ('remote_fill_share', [10.0, np.nan, 10.0])):
+        part = table.select(metric=metric)
+        values = part['value'][np.argsort(part['run'])]
+        assert np.allclose(values, expected, equal_nan=True), metric
+
+
+def test_rate_of_a_missing_denominator_is_nan():
+    values = derived.rate(np.array([1.0, 1.0, 1.0]), np.array([4.0, 0.0, np.nan]))
+    assert np.allclose(values, [25.0, 0.0, np.nan], equal_nan=True)
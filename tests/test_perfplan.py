@@ -0,0 +1,31 @@
+import os
+import shutil
+import json
+
+import pytest
+
+import perfplan
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _groups(path):
+    with open(path) as f:
+        return [line.split()[1].split(',') for line in f]
+
+
+# A saved list is planned for the CPU it was taken on, whatever the local CPU is
+def test_saved_list_uses_its_own_vendor(tmp_path):
+    perf_list = str(tmp_path / 'perf_list.output')
+    shutil.copy(os.path.join(ROOT, perfplan.PERF_LIST), perf_list)
+    with pytest.raises(SystemExit):
+        perfplan.main(['plan', '--perf-list', perf_list])
+
+    with open(perfplan.list_host_path(perf_list), 'w') as f:
+        json.dump({'vendor': 'AuthenticAMD', 'nmi_watchdog': False}, f)
+    shell = str(tmp_path / 'groups.txt')
+    perfplan.main(['plan', '--perf-list', perf_list, '--shell', shell])
+    events = perfplan.read_perf_list(perf_list)
+    core = [[e for e in group if perfplan.event_pmu(events, e) in perfplan.CORE_PMUS] for group in _groups(shell)]
+    assert max(len(group) for group in core) == perfplan.GP_COUNTERS['AuthenticAMD']
+    assert any('cycles' in group for group in core)
@@ -0,0 +1,15 @@
+import os
+
+import plot
+import topology
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+# Topology labels are per host and never leak into the shared mode names
+def test_topology_labels_leave_mode_names_alone():
+    base = dict(plot.mode_names)
+    labels = plot.topology_labels(topology.load_json(os.path.join(DATA, 'topology_2ccd.json')))
+    assert labels[2] == 'Same CCD (CCD 1)' and labels[3] == 'Different CCDs (CCD 0-1)'
+    assert plot.topology_labels(None) == base
+    assert plot.mode_names == base
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import stats
+
+
+def _naive_bootstrap(groups, n_resamples, confidence, seed):
+    # One group at a time, drawing from the same stream as bootstrap_means
+    keys, values = stats.pad_groups(groups)
+    values, counts = stats._compact(values)
+    u = np.random.default_rng(seed).random((n_resamples,) + values.shape)
+    alpha = (1.0 - confidence) / 2.0
+    result = {}
+    for row, key in enumerate(keys):
+        n = counts[row]
+        means = [values[row, (u[b, row, :n] * n).astype(np.int64)].mean() for b in range(n_resamples)]
+        result[key] = tuple(np.percentile(means, [100 * alpha, 100 * (1 - alpha)]))
+    return result
+
+
+GROUPS = {
+    ('a', 1): [1.0, 2.0, 3.0, 4.0, 5.0],
+    ('a', 2): [10.0, 10.5, 9.5],
+    ('b', 1): [0.2, 0.4, 0.3, 0.1, 0.25, 0.35, 0.3],
+}
+
+
+@pytest.mark.parametrize('chunk', [stats.CHUNK_ELEMENTS, 7])
+def test_summarize_matches_naive_bootstrap(monkeypatch, chunk):
+    monkeypatch.setattr(stats, 'CHUNK_ELEMENTS', chunk)
+    summary = stats.summarize(GROUPS, n_resamples=500, seed=3)
+    naive = _naive_bootstrap(GROUPS, 500, 0.95, seed=3)
+    for key, values in GROUPS.items():
+        assert summary[key].mean == pytest.approx(np.mean(values))
+        assert (summary[key].lo, summary[key].hi) == pytest.approx(naive[key])
+        assert summary[key].n == len(values) and summary[key].excluded == 0
+
+
+def test_summarize_outliers_and_empty_groups():
+    summary = stats.summarize({'x': [1.0, 1.1, 0.9, 1.05, 0.95, 50.0], 'none': [np.nan, np.nan]},
+                              n_resamples=200, outlier_threshold=3.5)
+    assert summary['x'].n == 5 and summary['x'].excluded == 1
+    assert summary['x'].mean == pytest.approx(1.0)
+    assert summary['none'].n == 0 and np.isnan(summary['none'].mean) and np.isnan(summary['none'].lo)
+
+
+def test_mad_outlier_mask():
+    values = np.array([[1.0, 1.1, 0.9, 1.05, 20.0],
+                       [2.0, 2.0, 2.0, 2.0, 3.0],  # MAD of zero: nothing is rejected
+                       [5.0, np.nan, 5.0, 5.0, 5.0]])
+    mask = stats.mad_outlier_mask(values, 3.5)
+    assert mask.tolist() == [[False, False, False, False, True], [False] * 5, [False] * 5]
+
+
+def test_percentile_ci_handles_nan_columns():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(size=(400, 3))
+    samples[:50, 1] = np.nan
+    samples[:, 2] = np.nan
+    lo, hi = stats._percentile_ci(samples, 0.9)
+    assert lo[0] == pytest.approx(np.percentile(samples[:, 0], 5))
+    assert hi[1] == pytest.approx(np.percentile(samples[50:, 1], 95))
+    assert np.isnan(lo[2]) and np.isnan(hi[2])
+
+
+def test_bootstrap_ratio():
+    bad = {'x': [4.0, 4.2, 3.8, 4.1], 'y': [1.0, 1.0], 'only_bad': [1.0]}
+    good = {'x': [2.0, 2.1, 1.9, 2.0], 'y': [0.0, 0.0]}
+    ratio = stats.bootstrap_ratio(bad, good, n_resamples=500)
+    assert set(ratio) == {'x', 'y'}
+    assert ratio['x'].ratio == pytest.approx(np.mean(bad['x']) / np.mean(good['x']))
+    assert ratio['x'].lo <= ratio['x'].ratio <= ratio['x'].hi
+    assert np.isnan(ratio['y'].ratio) and np.isnan(ratio['y'].lo)
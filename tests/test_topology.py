@@ -0,0 +1,44 @@
+import os
+import re
+import json
+
+import pytest
+
+import topology
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SYSFS = os.path.join(DATA, 'sysfs_2ccd')
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ccd0_cores / ccd1_cores tables of a benchmark source
+def _cpp_tables(source):
+    with open(os.path.join(REPO, 'src', source)) as f:
+        text = f.read()
+    return [[int(c) for c in re.search(rf'{name}\s*=\s*\{{([^}}]*)\}}', text).group(1).split(',')]
+            for name in ('ccd0_cores', 'ccd1_cores')]
+
+
+@pytest.fixture
+def topo():
+    return topology.read_topology(SYSFS)
+
+
+# The recorded 2-CCD host (24 CPUs, 12 cores with SMT) reads back as the saved JSON
+def test_recorded_tree_matches_json(topo):
+    with open(os.path.join(DATA, 'topology_2ccd.json')) as f:
+        assert json.loads(json.dumps(topo.to_dict())) == json.load(f)
+    assert [d.cpus for d in topo.l3_domains] == [(0, 1, 2, 3, 4, 5, 12, 13, 14, 15, 16, 17),
+                                                 (6, 7, 8, 9, 10, 11, 18, 19, 20, 21, 22, 23)]
+    with open(os.path.join(REPO, 'thread_core_ccd_mapping.txt')) as f:
+        assert topology.format_mapping(topo).strip() == f.read().strip()
+
+
+# Modes 2 and 3 place threads like the tables in src/*.cpp
+@pytest.mark.parametrize('source', ['bad_coherency.cpp', 'good_coherency.cpp', 'shared_counter.cpp'])
+def test_placement_matches_cpp_tables(topo, source):
+    ccd0, ccd1 = _cpp_tables(source)
+    for threads in range(1, 13):
+        assert topology.placement(topo, 2, threads) == [ccd1[i % len(ccd1)] for i in range(threads)]
+        mode3 = [ccd1[(i // 2) % len(ccd1)] if i % 2 == 0 else ccd0[(i // 2) % len(ccd0)] for i in range(threads)]
+        assert topology.placement(topo, 3, threads) == mode3
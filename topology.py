@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+from collections import namedtuple
+
+# CPU topology of the host read from sysfs: packages, NUMA nodes, L3 domains
+# (CCDs on AMD parts), cores and SMT siblings. Replaces generate_mapping.sh.
+
+SYSFS_ROOT = '/sys/devices/system'
+JSON_PATH = 'topology.json'
+TEXT_PATH = 'thread_core_ccd_mapping.txt'
+
+Cache = namedtuple('Cache', ['level', 'type', 'size_kb', 'cpus'])
+Cpu = namedtuple('Cpu', ['id', 'core', 'smt', 'package', 'numa_node', 'l3'])
+Core = namedtuple('Core', ['id', 'core_id', 'package', 'l3', 'cpus'])
+L3Domain = namedtuple('L3Domain', ['id', 'size_kb', 'cores', 'cpus', 'numa_nodes'])
+NumaNode = namedtuple('NumaNode', ['id', 'cpus'])
+Package = namedtuple('Package', ['id', 'cpus'])
+
+
+class Topology:
+    """Host topology. Cores and L3 domains are numbered 0..N-1 by their lowest CPU,
+    so the numbering only depends on the hardware, never on iteration order."""
+
+    def __init__(self, cpus, cores, l3_domains, numa_nodes, packages, caches):
+        self.cpus = cpus              # [Cpu], indexed by logical CPU id order
+        self.cores = cores            # [Core]
+        self.l3_domains = l3_domains  # [L3Domain]
+        self.numa_nodes = numa_nodes  # [NumaNode]
+        self.packages = packages      # [Package]
+        self.caches = caches          # [Cache], the distinct caches of CPU 0 (L1d, L1i, L2, L3)
+
+    def cpu(self, cpu_id):
+        for cpu in self.cpus:
+            if cpu.id == cpu_id:
+                return cpu
+        raise KeyError(cpu_id)
+
+    # CPUs of an L3 domain, first SMT thread of every core first
+    # (e.g. 6..11 then 18..23), which is the order the benchmarks fill them in
+    def l3_cpus(self, l3):
+        cpus = [self.cpu(c) for c in self.l3_domains[l3].cpus]
+        return [c.id for c in sorted(cpus, key=lambda c: (c.smt, c.core))]
+
+    def to_dict(self):
+        return {
+            'packages': [p._asdict() for p in self.packages],
+            'numa_nodes': [n._asdict() for n in self.numa_nodes],
+            'l3_domains': [d._asdict() for d in self.l3_domains],
+            'cores': [c._asdict() for c in self.cores],
+            'cpus': [c._asdict() for c in self.cpus],
+            'caches': [c._asdict() for c in self.caches],
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        def load(kind, key):
+            return [kind(**{k: tuple(v) if isinstance(v, list) else v for k, v in item.items()})
+                    for item in d.get(key, [])]
+        return cls(load(Cpu, 'cpus'), load(Core, 'cores'), load(L3Domain, 'l3_domains'),
+                   load(NumaNode, 'numa_nodes'), load(Package, 'packages'), load(Cache, 'caches'))
+
+
+# Expand a sysfs CPU list such as "0-5,12-17" into [0, 1, ..., 17]
+def parse_cpu_list(text):
+    cpus = set()
+    for item in text.strip().split(','):
+        if not item:
+            continue
+        if '-' in item:
+            start, end = item.split('-')
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(item))
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus):
+    cpus = sorted(cpus)
+    ranges = []
+    for cpu in cpus:
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(f'{a}' if a == b else f'{a}-{b}' for a, b in ranges)
+
+
+def _read(path, default=None):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def _size_kb(text):
+    if not text:
+        return 0
+    units = {'K': 1, 'M': 1024, 'G': 1024 * 1024}
+    if text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text) // 1024
+
+
+def _cpu_ids(sysfs_root):
+    cpu_dir = os.path.join(sysfs_root, 'cpu')
+    names = [n for n in os.listdir(cpu_dir) if n.startswith('cpu') and n[3:].isdigit()]
+    cpus = sorted(int(n[3:]) for n in names)
+    # Offline CPUs have no topology directory
+    return [c for c in cpus if os.path.isdir(os.path.join(cpu_dir, f'cpu{c}', 'topology'))]
+
+
+def _caches(sysfs_root, cpu):
+    caches = []
+    cache_dir = os.path.join(sysfs_root, 'cpu', f'cpu{cpu}', 'cache')
+    if not os.path.isdir(cache_dir):
+        return caches
+    for name in sorted(os.listdir(cache_dir)):
+        if not name.startswith('index'):
+            continue
+        path = os.path.join(cache_dir, name)
+        level = _read(os.path.join(path, 'level'))
+        if level is None:
+            continue
+        caches.append(Cache(int(level), _read(os.path.join(path, 'type'), 'Unified'),
+                            _size_kb(_read(os.path.join(path, 'size'))),
+                            tuple(parse_cpu_list(_read(os.path.join(path, 'shared_cpu_list'), str(cpu))))))
+    return caches
+
+
+# Build the topology from a sysfs tree (the live one or a recorded copy)
+def read_topology(sysfs_root=SYSFS_ROOT):
+    cpu_ids = _cpu_ids(sysfs_root)
+
+    # NUMA nodes (absent on kernels without NUMA: everything is node 0)
+    numa_of = {}
+    numa_nodes = []
+    node_dir = os.path.join(sysfs_root, 'node')
+    if os.path.isdir(node_dir):
+        for name in sorted(os.listdir(node_dir), key=lambda n: int(n[4:]) if n[4:].isdigit() else -1):
+            if name.startswith('node') and name[4:].isdigit():
+                cpus = [c for c in parse_cpu_list(_read(os.path.join(node_dir, name, 'cpulist'), '')) if c in cpu_ids]
+                if cpus:
+                    numa_nodes.append(NumaNode(int(name[4:]), tuple(cpus)))
+                    for c in cpus:
+                        numa_of[c] = int(name[4:])
+    if not numa_nodes:
+        numa_nodes = [NumaNode(0, tuple(cpu_ids))]
+        numa_of = {c: 0 for c in cpu_ids}
+
+    package_of, siblings_of, core_id_of, l3_of_cpu = {}, {}, {}, {}
+    caches = []
+    for cpu in cpu_ids:
+        topo = os.path.join(sysfs_root, 'cpu', f'cpu{cpu}', 'topology')
+        package_of[cpu] = int(_read(os.path.join(topo, 'physical_package_id'), '0'))
+        core_id_of[cpu] = int(_read(os.path.join(topo, 'core_id'), str(cpu)))
+        siblings_of[cpu] = tuple(parse_cpu_list(_read(os.path.join(topo, 'thread_siblings_list'), str(cpu))))
+        cpu_caches = _caches(sysfs_root, cpu)
+        l3 = [c for c in cpu_caches if c.level == 3]
+        # Without an L3 every package is treated as one cache domain
+        l3_of_cpu[cpu] = (l3[0].cpus if l3 else tuple(c for c in cpu_ids if package_of.get(c) == package_of[cpu]),
+                          l3[0].size_kb if l3 else 0)
+        if cpu == cpu_ids[0]:
+            caches = cpu_caches
+
+    # L3 domains numbered by their lowest CPU
+    domain_keys = sorted({l3_of_cpu[c] for c in cpu_ids}, key=lambda k: min(k[0]))
+    l3_index = {key[0]: i for i, key in enumerate(domain_keys)}
+
+    # Cores numbered by their lowest CPU
+    core_keys = sorted({siblings_of[c] for c in cpu_ids}, key=min)
+    core_index = {key: i for i, key in enumerate(core_keys)}
+    cores = []
+    for i, key in enumerate(core_keys):
+        cpus = tuple(c for c in key if c in cpu_ids)
+        first = cpus[0]
+        cores.append(Core(i, core_id_of[first], package_of[first], l3_index[l3_of_cpu[first][0]], cpus))
+
+    cpus = []
+    for cpu in cpu_ids:
+        core = cores[core_index[siblings_of[cpu]]]
+        cpus.append(Cpu(cpu, core.id, core.cpus.index(cpu), package_of[cpu], numa_of.get(cpu, 0), core.l3))
+
+    l3_domains = []
+    for i, (shared, size_kb) in enumerate(domain_keys):
+        members = tuple(c for c in shared if c in cpu_ids)
+        l3_domains.append(L3Domain(i, size_kb, tuple(core.id for core in cores if core.l3 == i), members,
+                                   tuple(sorted({numa_of.get(c, 0) for c in members}))))
+
+    packages = [Package(p, tuple(c for c in cpu_ids if package_of[c] == p))
+                for p in sorted(set(package_of.values()))]
+    return Topology(cpus, cores, l3_domains, numa_nodes, packages, caches)
+
+
+def write_json(topo, path=JSON_PATH):
+    with open(path, 'w') as f:
+        json.dump(topo.to_dict(), f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def load_json(path=JSON_PATH):
+    with open(path) as f:
+        return Topology.from_dict(json.load(f))
+
+
+# Topology from the JSON if it exists, else None (plot.py uses it for labels only)
+def load_optional(path=JSON_PATH):
+    try:
+        return load_json(path)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+# Same layout as the old generate_mapping.sh output, with stable CCD numbering
+def format_mapping(topo):
+    lines = []
+    for domain in topo.l3_domains:
+        lines.append(f'CCD {domain.id}:')
+        for core_index in domain.cores:
+            core = topo.cores[core_index]
+            lines.append(f'  Core {core.core_id}:')
+            lines += [f'    Thread {cpu}' for cpu in core.cpus]
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+# ============================================================================
+# Placement: CPUs for each benchmark mode
+# ============================================================================
+
+# CPU list for `threads` threads in a benchmark mode, the generic version of the
+# tables hardcoded in src/*.cpp:
+#   0: no specific affinity, CPUs 0..threads-1
+#   1: two SMT siblings of one core (in the last L3 domain)
+#   2: different cores of the same L3 domain (the last one)
+#   3: alternate between L3 domains, starting from the last one
+def placement(topo, mode, threads):
+    last = len(topo.l3_domains) - 1
+    if mode == 0:
+        return [topo.cpus[i % len(topo.cpus)].id for i in range(threads)]
+    if mode == 1:
+        smt_cores = [c for c in topo.cores if c.l3 == last and len(c.cpus) > 1]
+        if not smt_cores:
+            raise ValueError('mode 1 needs a core with SMT siblings')
+        return list(smt_cores[0].cpus[:2])
+    if mode == 2:
+        domain = topo.l3_cpus(last)
+        return [domain[i % len(domain)] for i in range(threads)]
+    if mode == 3:
+        if len(topo.l3_domains) < 2:
+            raise ValueError('mode 3 needs at least two L3 domains')
+        order = list(range(last, -1, -1))
+        domains = [topo.l3_cpus(d) for d in order]
+        cpus = []
+        for i in range(threads):
+            domain = domains[i % len(domains)]
+            cpus.append(domain[(i // len(domains)) % len(domain)])
+        return cpus
+    raise ValueError(f'invalid mode {mode}')
+
+
+# L3 domains touched by a mode, for labels such as "Same CCD (CCD 1)"
+def placement_domains(topo, mode, threads):
+    return sorted({topo.cpu(c).l3 for c in placement(topo, mode, threads)})
+
+
+# ============================================================================
+# Recording a sysfs tree (for reproducing another host's topology offline)
+# ============================================================================
+
+RECORD_FILES = ['topology/physical_package_id', 'topology/core_id', 'topology/thread_siblings_list']
+RECORD_CACHE_FILES = ['level', 'type', 'size', 'shared_cpu_list']
+
+
+def record(dest, sysfs_root=SYSFS_ROOT):
+    def copy(rel):
+        src = os.path.join(sysfs_root, rel)
+        if os.path.isfile(src):
+            os.makedirs(os.path.dirname(os.path.join(dest, rel)), exist_ok=True)
+            shutil.copyfile(src, os.path.join(dest, rel))
+
+    for cpu in _cpu_ids(sysfs_root):
+        for rel in RECORD_FILES:
+            copy(os.path.join('cpu', f'cpu{cpu}', rel))
+        cache_dir = os.path.join(sysfs_root, 'cpu', f'cpu{cpu}', 'cache')
+        if os.path.isdir(cache_dir):
+            for index in os.listdir(cache_dir):
+                for rel in RECORD_CACHE_FILES:
+                    copy(os.path.join('cpu', f'cpu{cpu}', 'cache', index, rel))
+    node_dir = os.path.join(sysfs_root, 'node')
+    if os.path.isdir(node_dir):
+        for name in os.listdir(node_dir):
+            copy(os.path.join('node', name, 'cpulist'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Host CPU topology from sysfs.')
+    parser.add_argument('--sysfs', default=SYSFS_ROOT, help='sysfs root (default: %(default)s)')
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('generate', help='write the topology JSON and the text mapping')
+    p.add_argument('--json', default=JSON_PATH)
+    p.add_argument('--text', default=TEXT_PATH)
+
+    p = sub.add_parser('cpus', help='print the CPU list of a benchmark mode')
+    p.add_argument('mode', type=int)
+    p.add_argument('threads', type=int)
+    p.add_argument('--from-json', metavar='PATH', help='use a saved topology instead of sysfs')
+
+    p = sub.add_parser('record', help='copy the sysfs files read by this module into a directory')
+    p.add_argument('dest')
+
+    args = parser.parse_args(argv)
+    command = args.command or 'generate'
+    if command == 'record':
+        record(args.dest, args.sysfs)
+        print(f"sysfs topology recorded in {args.dest}")
+        return
+    if command == 'cpus':
+        topo = load_json(args.from_json) if args.from_json else read_topology(args.sysfs)
+        try:
+            print(','.join(str(c) for c in placement(topo, args.mode, args.threads)))
+        except ValueError as e:
+            sys.exit(f"error: {e}")
+        return
+
+    topo = read_topology(args.sysfs)
+    json_path = getattr(args, 'json', JSON_PATH)
+    text_path = getattr(args, 'text', TEXT_PATH)
+    write_json(topo, json_path)
+    with open(text_path, 'w') as f:
+        f.write(format_mapping(topo))
+    print(f"Mapping generated in {text_path} and {json_path}")
+
+
+if __name__ == '__main__':
+    main()